@@ -97,6 +97,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
+    '_excel.admission.ExportAdmissionMiddleware',
 ]
 
 ROOT_URLCONF = '_config.urls'
@@ -332,3 +333,21 @@ APP_ORDER = [
     'accounts',
     'book',
 ]
+
+# 엑셀/PDF 내보내기 동시 실행 제어 (_excel.admission.ExportAdmissionMiddleware)
+EXPORT_CONCURRENCY = {
+    'default': 2,  # 개별 지정이 없는 내보내기별 동시 실행 수
+    'total': 4,  # 전체 내보내기 동시 실행 수 - uWSGI 작업자 수보다 작게 설정
+    'excel:paid-by-cont': 1,
+    'pdf:bill': 1,
+}
+EXPORT_ADMISSION_TIMEOUT = 30  # 동일 요청 완료 또는 실행 슬롯을 기다리는 최대 시간(초) - 초과 시 503 응답
+EXPORT_RETRY_AFTER = 5  # 대기 시간 안에 실행하지 못했을 때 503 응답의 Retry-After (초)
+EXPORT_WATERMARK_OVERLAP = 300  # 증분 내보내기(?since=) 다음 기준 시점을 앞당기는 겹침 구간(초) - 저장 후 늦게 커밋된 행 누락 방지
+
+# PDF 고지서 병렬 변환 (_pdf.render)
+PDF_RENDER_WORKERS = None  # 변환 작업 프로세스 수 - None 이면 CPU 코어 수 / EXPORT_CONCURRENCY['total'] (최소 1)
+PDF_POOL_IDLE_TIMEOUT = 300  # 마지막 사용 후 작업 프로세스 풀을 종료할 때까지 대기 시간(초)
+PDF_RENDER_CHUNK_SIZE = 20  # 작업 프로세스 하나가 한 번에 변환할 고지서 건수
+PDF_WARM_UP = True  # 웹 작업자 시작 시(wsgi) 글꼴 설정, 스타일시트, 템플릿 미리 로드
+PDF_RENDER_PYTHON = None  # 작업 프로세스 python 실행 파일 - None 이면 현재 환경(venv)의 python 자동 검색
@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', '_config.settings')
 
 application = get_wsgi_application()
+
+# PDF 내보내기 글꼴 설정, 스타일시트, 템플릿 미리 로드 - 작업자마다 첫 PDF 요청 전에 한 번 수행
+from _pdf.render import PDF_WARM_UP, warm_up  # noqa: E402
+
+if PDF_WARM_UP:
+    warm_up()
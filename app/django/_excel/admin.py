@@ -1,3 +1,17 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import ExportJob, DeletionLog
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'export', 'user', 'status', 'file_name', 'created', 'started', 'finished')
+    list_display_links = ('export',)
+    list_filter = ('status', 'export')
+    readonly_fields = ('worker', 'created', 'started', 'finished', 'error')
+
+
+@admin.register(DeletionLog)
+class DeletionLogAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'model', 'object_id', 'project', 'company', 'deleted')
+    list_filter = ('model', 'project', 'company')
@@ -0,0 +1,242 @@
+import fcntl
+import os
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse, FileResponse
+from django.urls import resolve, Resolver404
+
+from .cache import REPORT_CACHE_DIR, ReportCache, cached_file_response, get_cached_headers, get_data_version
+from .jobs import JOB_NAMESPACES
+
+# 내보내기별 동시 실행 수 - 'default': 개별 지정이 없는 내보내기, 'total': 전체 내보내기 합계
+EXPORT_CONCURRENCY = dict({'default': 2, 'total': 4}, **getattr(settings, 'EXPORT_CONCURRENCY', {}))
+EXPORT_ADMISSION_TIMEOUT = getattr(settings, 'EXPORT_ADMISSION_TIMEOUT', 30)  # 동일 요청 완료 또는 실행 슬롯 대기 시간(초)
+EXPORT_RETRY_AFTER = getattr(settings, 'EXPORT_RETRY_AFTER', 5)  # 503 응답 Retry-After (초)
+EXPORT_LOCK_DIR = Path(getattr(settings, 'EXPORT_LOCK_DIR', REPORT_CACHE_DIR / 'locks'))
+LOCK_POLL_INTERVAL = 0.2  # 잠금 대기 중 재시도 간격(초)
+
+
+def try_lock(path):
+    """
+    파일 잠금 시도 (non-blocking) - 프로세스가 종료되면 OS 가 잠금을 해제하므로 잠금이 남지 않는다.
+    :return: 잠금에 성공하면 열린 파일 객체, 실패하면 None
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    file = open(path, 'a')
+    try:
+        fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        file.close()
+        return None
+    return file
+
+
+def wait_lock(path, deadline):
+    """
+    deadline(time.monotonic 기준)까지 LOCK_POLL_INTERVAL 간격으로 파일 잠금 시도
+    :return: 잠금에 성공하면 열린 파일 객체, 시간 초과 시 None
+    """
+    while True:
+        file = try_lock(path)
+        if file is not None or time.monotonic() >= deadline:
+            return file
+        time.sleep(LOCK_POLL_INTERVAL)
+
+
+def unlock(file):
+    fcntl.flock(file, fcntl.LOCK_UN)
+    file.close()
+
+
+class FileSemaphore:
+    """
+    파일 잠금 기반 세마포어 - limit 개의 슬롯 파일 중 하나를 잠그면 실행 권한을 얻는다.
+    - 여러 uWSGI 프로세스 사이에서 동작하며 DB 커넥션을 점유하지 않는다.
+    """
+
+    def __init__(self, name, limit, directory=EXPORT_LOCK_DIR):
+        self.paths = [Path(directory) / f'{name}.{slot}.slot' for slot in range(max(limit, 1))]
+        self.file = None
+
+    def acquire(self, deadline=0):
+        """
+        빈 슬롯 잠금 - deadline(time.monotonic 기준)까지 빈 슬롯이 없으면 False
+        - deadline 미지정 시 기다리지 않는다.
+        """
+        while True:
+            for path in self.paths:
+                self.file = try_lock(path)
+                if self.file is not None:
+                    return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(LOCK_POLL_INTERVAL)
+
+    def release(self):
+        if self.file is not None:
+            unlock(self.file)
+            self.file = None
+
+
+class ResultTee:
+    """
+    스트리밍 응답 본문을 내보내면서 같은 블록을 결과 임시 파일에 기록하는 이터레이터
+    - 끝까지 내보낸 경우에만 close() 에서 결과 파일로 저장하고, 중간에 연결이 끊기면 임시 파일을 버린다.
+    - 응답의 streaming_content 로 지정하면 응답 종료(response.close()) 시 close() 가 호출되며
+      저장 여부와 관계없이 마지막에 on_close 를 호출한다.
+    """
+
+    def __init__(self, blocks, cache, key, headers, on_close):
+        self.blocks = blocks
+        self.cache = cache
+        self.key = key
+        self.headers = headers
+        self.on_close = on_close
+        self.file, self.tmp_path = cache.create()
+        self.completed = False
+        self.closed = False
+
+    def __iter__(self):
+        for block in self.blocks:
+            if self.file is not None:
+                try:
+                    self.file.write(block)
+                except OSError:  # 결과 파일 기록 실패 시 공유만 포기하고 응답은 계속 내보낸다.
+                    self.discard()
+            yield block
+        self.completed = True
+
+    def discard(self):
+        self.file.close()
+        self.file = None
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            if self.file is not None:
+                if not self.completed:
+                    self.discard()
+                else:
+                    self.file.close()
+                    self.file = None
+                    self.cache.commit(self.key, self.tmp_path, self.headers)
+                    self.cache.evict()
+        finally:
+            self.on_close()
+
+
+class ExportAdmissionMiddleware:
+    """
+    엑셀/PDF 내보내기 실행 제어 미들웨어
+    - 동일 요청 합치기(single-flight): 같은 내보내기 + 같은 파라미터 + 같은 사용자 + 같은 프로젝트 데이터 버전 요청은
+      한 번에 하나만 실행하고, 그동안 도착한 동일 요청은 최대 EXPORT_ADMISSION_TIMEOUT 초 동안 기다렸다가
+      실행한 요청의 결과 파일을 받는다. 기다리기 시작하기 전에 완료된 결과는 다시 사용하지 않는다.
+    - 실행 요청의 스트리밍 응답은 그대로 내보내면서 결과 파일에 함께 기록(ResultTee)하므로 첫 바이트가 늦어지지 않으며,
+      실행 슬롯과 동일 요청 잠금은 응답 전송이 끝나(response.close()) 결과 파일이 저장된 후 해제한다.
+    - 동시 실행 제한: 내보내기별(EXPORT_CONCURRENCY) 및 전체('total') 실행 수를 넘는 요청은 슬롯이 날 때까지 기다리고,
+      EXPORT_ADMISSION_TIMEOUT 초가 지나도록 동일 요청이 끝나지 않거나 슬롯이 나지 않으면 503(Retry-After) 으로 응답한다.
+      대기가 긴 대용량 보고서는 백그라운드 내보내기 작업(ExportJob)으로 요청한다.
+    """
+    results = ReportCache(directory=EXPORT_LOCK_DIR / 'results')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        export = self.get_export(request)
+        if export is None:
+            return self.get_response(request)
+
+        arrived = time.time()
+        deadline = time.monotonic() + EXPORT_ADMISSION_TIMEOUT
+        user = getattr(request, 'user', None)
+        version = [get_data_version(request.GET.get('project')), getattr(user, 'pk', None)]
+        key = self.results.make_key(export, request.GET, version)
+
+        flight = wait_lock(EXPORT_LOCK_DIR / f'{key}.flight', deadline)
+        if flight is None:
+            return self.busy_response()  # 동일 요청이 대기 시간 안에 끝나지 않음
+        try:
+            cached = self.get_result(key, arrived)  # 기다리는 동안 완료된 동일 요청 결과
+            if cached is not None:
+                unlock(flight)
+                return cached_file_response(*cached)
+            return self.run(request, export, key, flight, deadline)
+        except Exception:
+            if not flight.closed:
+                unlock(flight)
+            raise
+
+    @staticmethod
+    def get_export(request):
+        """제어 대상 내보내기 이름 ('네임스페이스:URL 이름') - 대상이 아니면 None"""
+        if request.method != 'GET':
+            return None
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return None
+        if match.namespace not in JOB_NAMESPACES:
+            return None
+        return f'{match.namespace}:{match.url_name}'
+
+    def get_result(self, key, since):
+        """
+        since(time.time 기준) 이후에 완료된 결과 파일만 사용
+        - 조회 시 결과 파일(.bin)의 수정 시각은 LRU 용도로 갱신되므로 저장 시에만 기록되는 헤더 파일(.json)로 판단한다.
+        """
+        try:
+            if os.stat(self.results.directory / f'{key}.json').st_mtime < since:
+                return None
+        except OSError:
+            return None
+        return self.results.get(key)
+
+    def run(self, request, export, key, flight, deadline):
+        """
+        실행 슬롯을 얻어 내보내기 실행 - 동일 요청 잠금(flight)과 슬롯은 결과 저장 후 해제한다.
+        - 스트리밍 응답은 ResultTee 로 감싸 바로 반환하고 응답 종료 시 해제한다.
+        """
+        limit = EXPORT_CONCURRENCY.get(export, EXPORT_CONCURRENCY['default'])
+        semaphores = (FileSemaphore(export.replace(':', '-'), limit),
+                      FileSemaphore('total', EXPORT_CONCURRENCY['total']))
+
+        def release():
+            for semaphore in semaphores:
+                semaphore.release()
+            unlock(flight)
+
+        try:
+            for semaphore in semaphores:
+                if not semaphore.acquire(deadline):
+                    release()
+                    return self.busy_response()
+            response = self.get_response(request)
+            if response.status_code != 200 or isinstance(response, FileResponse):
+                release()
+                return response  # 오류 응답 또는 보고서 캐시에 이미 파일로 저장된 결과
+            if not response.streaming:
+                cached = self.results.set(key, response)
+                release()
+                return cached_file_response(*cached)
+            response.streaming_content = ResultTee(response.streaming_content, self.results, key,
+                                                   get_cached_headers(response), release)
+            return response
+        except Exception:
+            release()
+            raise
+
+    @staticmethod
+    def busy_response():
+        response = HttpResponse('보고서 생성 요청이 많아 처리하지 못했습니다. 잠시 후 다시 시도하여 주십시오.',
+                                status=503, content_type='text/plain; charset=utf-8')
+        response['Retry-After'] = EXPORT_RETRY_AFTER
+        return response
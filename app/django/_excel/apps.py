@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ExcelConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = '_excel'
+
+    def ready(self):
+        import _excel.signals
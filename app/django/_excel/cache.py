@@ -0,0 +1,177 @@
+import datetime
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.db.models import F
+from django.http import FileResponse, HttpResponseNotModified
+
+from .models import ReportDataVersion
+
+REPORT_CACHE_DIR = Path(getattr(settings, 'REPORT_CACHE_DIR', Path(tempfile.gettempdir()) / 'rebs-report-cache'))
+REPORT_CACHE_MAX_SIZE = getattr(settings, 'REPORT_CACHE_MAX_SIZE', 512 * 1024 * 1024)  # 캐시 디렉토리 최대 용량 (bytes)
+CACHED_HEADERS = ('Content-Type', 'Content-Disposition', 'ETag', 'Cache-Control', 'X-Export-Watermark')  # 결과와 함께 저장할 응답 헤더
+
+
+def get_data_version(project):
+    """프로젝트 데이터 버전 (변경 이력이 없으면 0)"""
+    if not project:
+        return 0
+    version = ReportDataVersion.objects.filter(project_id=project).values_list('version', flat=True).first()
+    return version or 0
+
+
+def bump_data_version(project):
+    """
+    프로젝트 데이터 버전 증가 - 해당 프로젝트로 생성된 보고서 캐시는 모두 무효화된다.
+    :param project: 프로젝트 pk
+    """
+    if not project:
+        return
+    if not ReportDataVersion.objects.filter(project_id=project).update(version=F('version') + 1):
+        obj, created = ReportDataVersion.objects.get_or_create(project_id=project, defaults={'version': 1})
+        if not created:
+            ReportDataVersion.objects.filter(pk=obj.pk).update(version=F('version') + 1)
+
+
+class ReportCache:
+    """
+    로컬 디스크 보고서 결과 캐시
+    - 결과 파일(<key>.bin)과 응답 헤더(<key>.json)를 저장하고 조회 시 수정 시각을 갱신하여
+      최대 용량을 넘으면 가장 오래 사용하지 않은 항목부터 삭제(LRU)한다.
+    """
+
+    def __init__(self, directory=REPORT_CACHE_DIR, max_size=REPORT_CACHE_MAX_SIZE):
+        self.directory = Path(directory)
+        self.max_size = max_size
+
+    @staticmethod
+    def make_key(export, params, version):
+        """
+        캐시 키 - (내보내기 이름, 정렬된 요청 파라미터, 데이터 버전, 당일 날짜)의 해시
+        - 기준일 미지정 시 당일 기준으로 생성되는 보고서가 있으므로 날짜가 바뀌면 새로 생성한다.
+        """
+        normalized = sorted((key, sorted(values)) for key, values in params.lists() if any(values))
+        raw = json.dumps([export, normalized, version, datetime.date.today().isoformat()], ensure_ascii=False)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key):
+        """캐시 항목 조회 - (열린 결과 파일, 헤더 dict) 또는 None"""
+        path, meta_path = self.directory / f'{key}.bin', self.directory / f'{key}.json'
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                headers = json.load(f)
+            file = open(path, 'rb')  # 열어 둔 파일은 이후 LRU 삭제와 무관하게 끝까지 읽을 수 있다.
+        except (OSError, ValueError):
+            return None
+        os.utime(path)  # LRU 사용 시각 갱신
+        return file, headers
+
+    def create(self):
+        """결과를 나누어 기록할 임시 파일 생성 - (쓰기용 파일 객체, 임시 파일 경로)"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        return os.fdopen(fd, 'wb'), tmp_path
+
+    def commit(self, key, tmp_path, headers):
+        """기록을 마친 임시 파일을 결과 파일로 교체하고 헤더 저장 후 결과 파일 경로 반환"""
+        path, meta_path = self.directory / f'{key}.bin', self.directory / f'{key}.json'
+        os.replace(tmp_path, path)  # 동시 요청이 불완전한 파일을 읽지 않도록 원자적 교체
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(headers, f)
+        return path
+
+    def set(self, key, response):
+        """응답 본문과 헤더를 캐시에 저장 후 (열린 결과 파일, 헤더 dict) 반환"""
+        headers = get_cached_headers(response)
+        f, tmp_path = self.create()
+        try:
+            with f:
+                try:
+                    if response.streaming:
+                        for block in response.streaming_content:
+                            f.write(block)
+                    else:
+                        f.write(response.content)
+                finally:
+                    response.close()
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+        file = open(self.commit(key, tmp_path, headers), 'rb')
+        self.evict()
+        return file, headers
+
+    def evict(self):
+        """최대 용량 초과 시 사용 시각이 오래된 항목부터 삭제"""
+        entries = []
+        total = 0
+        for path in self.directory.glob('*.bin'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        for mtime, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            for target in (path, path.with_suffix('.json')):
+                try:
+                    target.unlink()
+                except OSError:
+                    pass
+            total -= size
+
+
+def get_cached_headers(response):
+    """결과와 함께 저장할 응답 헤더 dict"""
+    return {header: response[header] for header in CACHED_HEADERS if response.has_header(header)}
+
+
+def cached_file_response(file, headers):
+    """저장된 결과 파일과 헤더로 응답 생성"""
+    response = FileResponse(file, content_type=headers.get('Content-Type'))
+    for header, value in headers.items():
+        if header != 'Content-Type':
+            response[header] = value
+    return response
+
+
+class ReportCacheMixin:
+    """
+    보고서 캐시 뷰 믹스인
+    - 같은 파라미터와 같은 프로젝트 데이터 버전의 요청은 저장된 결과를 그대로 내려주고
+      ETag / If-None-Match 가 일치하면 304 응답을 반환한다.
+    """
+    cache_export = None  # 캐시 키에 사용할 내보내기 이름
+    cache_project_param = 'project'
+    report_cache = ReportCache()
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET':
+            return super().dispatch(request, *args, **kwargs)
+
+        version = get_data_version(request.GET.get(self.cache_project_param))
+        key = self.report_cache.make_key(self.cache_export or type(self).__name__, request.GET, version)
+        etag = f'"{key}"'
+
+        if etag in [tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')]:
+            return HttpResponseNotModified(headers={'ETag': etag})
+
+        cached = self.report_cache.get(key)
+        if cached is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            cached = self.report_cache.set(key, response)
+
+        response = cached_file_response(*cached)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'  # 매번 ETag 로 재검증
+        return response
@@ -0,0 +1,123 @@
+import os
+import re
+import socket
+import tempfile
+import traceback
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.files import File
+from django.http import HttpRequest, QueryDict
+from django.urls import reverse, resolve, NoReverseMatch
+from django.utils import timezone
+
+from .models import ExportJob
+
+JOB_NAMESPACES = ('excel', 'pdf')  # 작업으로 실행할 수 있는 내보내기 URL 네임스페이스
+
+FILENAME_RE = re.compile(r'filename="?([^";]+)"?')
+
+
+def get_export_view(export):
+    """
+    내보내기 URL 이름으로 뷰 함수 조회
+    :param export: '네임스페이스:URL 이름' (예: excel:paid-by-cont)
+    :return: (뷰 함수, URL 경로)
+    """
+    if export.split(':')[0] not in JOB_NAMESPACES:
+        raise ValueError(f'지원하지 않는 내보내기 종류입니다. ({export})')
+    try:
+        path = reverse(export)
+    except NoReverseMatch:
+        raise ValueError(f'존재하지 않는 내보내기 종류입니다. ({export})')
+    return resolve(path).func, path
+
+
+def build_request(job, path):
+    """
+    작업 요청자와 저장된 파라미터로 내보내기 뷰에 전달할 GET 요청 생성
+    - 뷰가 절대 URL 을 만들 수 있도록 서비스 도메인(DOMAIN_HOST)을 요청 호스트로 사용한다.
+    """
+    domain = urlsplit(settings.DOMAIN_HOST)
+    request = HttpRequest()
+    request.method = 'GET'
+    request.path = request.path_info = path
+    request.META = {'SERVER_NAME': domain.hostname, 'HTTP_HOST': domain.netloc, 'REQUEST_METHOD': 'GET',
+                    'SERVER_PORT': str(domain.port or (443 if domain.scheme == 'https' else 80)),
+                    'wsgi.url_scheme': domain.scheme}
+    request.GET = QueryDict(mutable=True)
+    for key, value in job.params.items():
+        request.GET.setlist(key, [str(v) for v in value] if isinstance(value, list) else [str(value)])
+    request.user = job.user
+    return request
+
+
+def set_status(job, **fields):
+    """작업 상태 갱신 - 폴링 요청과 경합하지 않도록 변경 필드만 저장"""
+    for key, value in fields.items():
+        setattr(job, key, value)
+    ExportJob.objects.filter(pk=job.pk).update(**fields)
+
+
+def claim_next_job(worker):
+    """
+    대기 중인 가장 오래된 작업을 선점
+    - 상태 조건부 update 로 선점하므로 여러 작업자 프로세스가 동시에 실행되어도 한 작업은 한 번만 처리된다.
+    :return: 선점한 작업 (대기 작업이 없으면 None)
+    """
+    pending = ExportJob.objects.filter(status='1').order_by('created', 'id').values_list('pk', flat=True)
+    for pk in pending[:10]:
+        claimed = ExportJob.objects.filter(pk=pk, status='1') \
+            .update(status='2', worker=worker, started=timezone.now())
+        if claimed:
+            return ExportJob.objects.select_related('user').get(pk=pk)
+    return None
+
+
+def fail_stale_jobs(timeout):
+    """시작 후 timeout(초) 이상 끝나지 않은 작업(작업자 비정상 종료 등)을 실패 처리"""
+    limit = timezone.now() - timedelta(seconds=timeout)
+    return ExportJob.objects.filter(status='2', started__lt=limit) \
+        .update(status='4', error='작업 제한 시간 초과', finished=timezone.now())
+
+
+def run_job(job):
+    """
+    내보내기 작업 실행
+    - 기존 _excel / _pdf 뷰를 그대로 호출하고 응답 본문을 결과 파일로 저장한다.
+    """
+    try:
+        view, path = get_export_view(job.export)
+        response = view(build_request(job, path))
+        if response.status_code != 200:
+            raise ValueError(f'내보내기 응답 오류 (status {response.status_code})')
+
+        match = FILENAME_RE.search(response.get('Content-Disposition', ''))
+        file_name = match.group(1) if match else f'export-{job.pk}'
+
+        with tempfile.TemporaryFile() as f:
+            try:
+                if response.streaming:
+                    for block in response.streaming_content:
+                        f.write(block)
+                else:
+                    f.write(response.content)
+            finally:
+                response.close()
+
+            f.seek(0)
+            job.file.save(file_name, File(f), save=False)
+
+        job.file_name = file_name
+        job.file_type = response.get('Content-Type', '')
+        job.file_size = job.file.size
+        job.status, job.finished = '3', timezone.now()
+        job.save(update_fields=['file', 'file_name', 'file_type', 'file_size', 'status', 'finished'])
+    except Exception:
+        set_status(job, status='4', error=traceback.format_exc(), finished=timezone.now())
+    return job
+
+
+def get_worker_name():
+    return f'{socket.gethostname()}-{os.getpid()}'
@@ -0,0 +1,89 @@
+import os
+import tempfile
+import time
+import tracemalloc
+
+import xlsxwriter
+from django.core.management.base import BaseCommand
+
+from _excel.utils import FormatRegistry
+
+
+class Command(BaseCommand):
+    help = ('셀마다 add_format() 을 호출하는 방식과 FormatRegistry 서식 공유 방식의 엑셀 생성 성능 비교\n'
+            '예) python manage.py bench_formats --rows 5000 --cols 30 --memory')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000, help='본문 행 수')
+        parser.add_argument('--cols', type=int, default=30, help='컬럼 수')
+        parser.add_argument('--constant-memory', action='store_true', help='constant_memory 모드 워크북으로 측정')
+        parser.add_argument('--memory', action='store_true',
+                            help='tracemalloc 으로 최대 메모리 사용량 측정 (한 번 더 실행하며 측정 오버헤드가 크다)')
+
+    def handle(self, *args, **options):
+        self.rows = options['rows']
+        self.cols = options['cols']
+        self.options = {'constant_memory': options['constant_memory']}
+        self.memory = options['memory']
+
+        results = [self.measure('add_format (per cell)', self.per_cell_format),
+                   self.measure('FormatRegistry', self.shared_format)]
+
+        self.stdout.write(f'{self.rows:,} x {self.cols} 시트')
+        self.stdout.write(f'{"mode":<24}{"formats":>9}{"seconds":>10}{"peak MB":>10}{"bytes":>14}')
+        for mode, formats, seconds, peak, size in results:
+            peak = f'{peak / 1024 / 1024:.1f}' if peak is not None else '-'
+            self.stdout.write(f'{mode:<24}{formats:>9,}{seconds:>10.2f}{peak:>10}{size:>14,}')
+
+    def measure(self, mode, func):
+        """실행 시간을 측정하고 --memory 지정 시 다시 실행하여 최대 메모리 사용량 측정"""
+        start = time.perf_counter()
+        formats, size = self.build(func)
+        seconds = time.perf_counter() - start
+
+        peak = None
+        if self.memory:
+            tracemalloc.start()
+            try:
+                self.build(func)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        return mode, formats, seconds, peak, size
+
+    def build(self, get_format):
+        """계약자 리스트 형태의 시트 생성 후 (생성된 서식 수, 파일 크기) 반환"""
+        fd, path = tempfile.mkstemp(prefix='rebs-bench-', suffix='.xlsx')
+        os.close(fd)
+        try:
+            workbook = xlsxwriter.Workbook(path, self.options)
+            get_format = get_format(workbook)
+            worksheet = workbook.add_worksheet()
+            for row_num in range(self.rows):
+                for col_num in range(self.cols):
+                    properties = self.get_properties(col_num)
+                    value = row_num * col_num if 'num_format' in properties else f'{row_num}-{col_num}'
+                    worksheet.write(row_num, col_num, value, get_format(properties))
+            formats = len(workbook.formats)
+            workbook.close()
+            return formats, os.path.getsize(path)
+        finally:
+            os.remove(path)
+
+    @staticmethod
+    def get_properties(col_num):
+        """본문 셀 서식 - 텍스트, 일자, 금액 컬럼이 섞인 계약자 리스트 본문과 같은 구성"""
+        properties = {'border': True, 'valign': 'vcenter', 'align': 'center'}
+        if col_num % 3 == 1:
+            properties['num_format'] = 'yyyy-mm-dd'
+        elif col_num % 3 == 2:
+            properties.update(align='right', num_format=41)
+        return properties
+
+    @staticmethod
+    def per_cell_format(workbook):
+        return workbook.add_format
+
+    @staticmethod
+    def shared_format(workbook):
+        return FormatRegistry(workbook).get
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from _excel.jobs import claim_next_job, fail_stale_jobs, run_job, get_worker_name
+from payment.utils import run_payment_rebuilds
+
+
+class Command(BaseCommand):
+    help = '백그라운드 내보내기 작업(ExportJob) 및 프로젝트 납부 현황 재계산(PaymentStatusRebuild) 처리 작업자'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='대기 작업을 모두 처리한 후 종료')
+        parser.add_argument('--sleep', type=float, default=2.0, help='대기 작업이 없을 때 폴링 간격(초)')
+        parser.add_argument('--timeout', type=int, default=1800,
+                            help='이 시간(초) 이상 진행중인 작업은 실패 처리')
+
+    def handle(self, *args, **options):
+        worker = get_worker_name()
+        self.stdout.write(f'export worker started: {worker}')
+
+        while True:
+            close_old_connections()
+            fail_stale_jobs(options['timeout'])
+
+            try:
+                rebuilt = run_payment_rebuilds()
+            except Exception as e:  # 실패한 프로젝트는 대기열에 다시 들어가 다음 차례에 재시도
+                self.stderr.write(f'payment status rebuild failed: {e!r}')
+            else:
+                if rebuilt:
+                    self.stdout.write(f'rebuilt payment status of {rebuilt} projects')
+
+            job = claim_next_job(worker)
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+                continue
+
+            job = run_job(job)
+            self.stdout.write(f'[{job.get_status_display()}] #{job.pk} {job.export} {job.params}')
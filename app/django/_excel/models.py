@@ -1,3 +1,75 @@
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+
+class ExportJob(models.Model):
+    """
+    백그라운드 내보내기 작업
+    - 대용량 엑셀/PDF 보고서를 요청 처리 중에 생성하지 않고 DB 큐에 등록한 후
+      export_worker 프로세스가 순서대로 생성하여 MEDIA_ROOT 에 저장한다.
+    """
+    STATUS_CHOICES = (('1', '대기'), ('2', '진행중'), ('3', '완료'), ('4', '실패'))
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, verbose_name='요청자',
+                             related_name='export_jobs')
+    export = models.CharField('내보내기 종류', max_length=50, help_text='URL 이름 (예: excel:paid-by-cont, pdf:bill)')
+    params = models.JSONField('요청 파라미터', default=dict, blank=True)
+    status = models.CharField('상태', max_length=1, choices=STATUS_CHOICES, default='1', db_index=True)
+    file = models.FileField(upload_to='export/%Y/%m/%d/', null=True, blank=True, verbose_name='결과 파일')
+    file_name = models.CharField('파일명', max_length=255, blank=True)
+    file_type = models.CharField('타입', max_length=100, blank=True)
+    file_size = models.PositiveBigIntegerField('사이즈', blank=True, null=True)
+    error = models.TextField('오류 내용', blank=True)
+    worker = models.CharField('처리 작업자', max_length=100, blank=True)
+    created = models.DateTimeField('요청일시', auto_now_add=True)
+    started = models.DateTimeField('시작일시', null=True, blank=True)
+    finished = models.DateTimeField('종료일시', null=True, blank=True)
+
+    def __str__(self):
+        return f'{self.export} - {self.get_status_display()}'
+
+    class Meta:
+        ordering = ['-created', '-id']
+        verbose_name = '01. 내보내기 작업'
+        verbose_name_plural = '01. 내보내기 작업'
+
+
+class ReportDataVersion(models.Model):
+    """
+    프로젝트 보고서 데이터 버전
+    - 수납/계약 데이터가 변경될 때마다 증가하며 보고서 결과 캐시 키에 포함되어 이전 캐시를 무효화한다.
+    """
+    project = models.OneToOneField('project.Project', on_delete=models.CASCADE, verbose_name='프로젝트',
+                                   related_name='report_version')
+    version = models.PositiveBigIntegerField('데이터 버전', default=0)
+    updated = models.DateTimeField('변경일시', auto_now=True)
+
+    def __str__(self):
+        return f'{self.project} - v{self.version}'
+
+    class Meta:
+        verbose_name = '02. 보고서 데이터 버전'
+        verbose_name_plural = '02. 보고서 데이터 버전'
+
+
+class DeletionLog(models.Model):
+    """
+    삭제 기록
+    - 증분(변경분) 내보내기에서 기준 시점 이후 삭제된 행 목록(tombstone)을 내려주기 위해
+      삭제된 객체의 모델과 pk 만 기록한다.
+    """
+    model = models.CharField('모델', max_length=100, help_text='app_label.model_name (예: cash.projectcashbook)')
+    object_id = models.PositiveBigIntegerField('객체 ID')
+    project = models.ForeignKey('project.Project', on_delete=models.CASCADE, null=True, blank=True,
+                                verbose_name='프로젝트', related_name='+', db_constraint=False)
+    company = models.ForeignKey('company.Company', on_delete=models.CASCADE, null=True, blank=True,
+                                verbose_name='회사', related_name='+', db_constraint=False)
+    deleted = models.DateTimeField('삭제일시', auto_now_add=True)
+
+    def __str__(self):
+        return f'{self.model} #{self.object_id}'
+
+    class Meta:
+        ordering = ['deleted', 'id']
+        indexes = [models.Index(fields=['model', 'deleted'])]
+        verbose_name = '03. 삭제 기록'
+        verbose_name_plural = '03. 삭제 기록'
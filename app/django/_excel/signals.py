@@ -0,0 +1,70 @@
+from django.dispatch import receiver
+from django.db.models.signals import post_save, post_delete
+
+from cash.models import CashBook, ProjectBankAccount, ProjectCashBook
+from contract.models import OrderGroup, Contract, ContractPrice, Contractor
+from items.models import UnitType, UnitFloorType, KeyUnit, HouseUnit
+from payment.models import SalesPriceByGT, InstallmentPaymentOrder, DownPayment
+from project.models import Project, ProjectIncBudget
+
+from .cache import bump_data_version
+from .models import DeletionLog
+
+# 보고서가 읽는 프로젝트 소속 모델 - 변경 시 해당 프로젝트 보고서 캐시 무효화
+PROJECT_MODELS = (ProjectCashBook, ProjectBankAccount, Contract, OrderGroup, UnitType, UnitFloorType, KeyUnit,
+                  SalesPriceByGT, InstallmentPaymentOrder, DownPayment, ProjectIncBudget)
+
+
+def get_project_id(instance):
+    """보고서 데이터 버전을 증가시킬 프로젝트 pk"""
+    if isinstance(instance, PROJECT_MODELS):
+        return instance.project_id
+    if isinstance(instance, HouseUnit):
+        return instance.unit_type.project_id
+    contract = instance.contract if instance.contract_id else None  # ContractPrice, Contractor
+    return contract.project_id if contract else None
+
+
+@receiver(post_save, sender=ProjectCashBook)
+@receiver(post_delete, sender=ProjectCashBook)
+@receiver(post_save, sender=ProjectBankAccount)
+@receiver(post_delete, sender=ProjectBankAccount)
+@receiver(post_save, sender=Contract)
+@receiver(post_delete, sender=Contract)
+@receiver(post_save, sender=ContractPrice)
+@receiver(post_delete, sender=ContractPrice)
+@receiver(post_save, sender=Contractor)
+@receiver(post_delete, sender=Contractor)
+@receiver(post_save, sender=OrderGroup)
+@receiver(post_delete, sender=OrderGroup)
+@receiver(post_save, sender=UnitType)
+@receiver(post_delete, sender=UnitType)
+@receiver(post_save, sender=UnitFloorType)
+@receiver(post_delete, sender=UnitFloorType)
+@receiver(post_save, sender=KeyUnit)
+@receiver(post_delete, sender=KeyUnit)
+@receiver(post_save, sender=HouseUnit)
+@receiver(post_delete, sender=HouseUnit)
+@receiver(post_save, sender=SalesPriceByGT)
+@receiver(post_delete, sender=SalesPriceByGT)
+@receiver(post_save, sender=InstallmentPaymentOrder)
+@receiver(post_delete, sender=InstallmentPaymentOrder)
+@receiver(post_save, sender=DownPayment)
+@receiver(post_delete, sender=DownPayment)
+@receiver(post_save, sender=ProjectIncBudget)
+@receiver(post_delete, sender=ProjectIncBudget)
+def report_data_changed(sender, instance, **kwargs):
+    origin = kwargs.get('origin')
+    if origin is not None and getattr(origin, 'model', type(origin)) is Project:
+        return  # 프로젝트 삭제에 따른 연쇄 삭제 - 데이터 버전도 함께 삭제된다.
+    bump_data_version(get_project_id(instance))
+
+
+@receiver(post_delete, sender=ProjectCashBook)
+@receiver(post_delete, sender=CashBook)
+@receiver(post_delete, sender=Contract)
+def log_deletion(sender, instance, **kwargs):
+    """증분 내보내기 삭제 목록(tombstone) 기록"""
+    DeletionLog.objects.create(model=sender._meta.label_lower, object_id=instance.pk,
+                               project_id=getattr(instance, 'project_id', None),
+                               company_id=getattr(instance, 'company_id', None))
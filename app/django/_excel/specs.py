@@ -0,0 +1,314 @@
+import datetime
+import os
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db.models import Q, F, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.http import HttpResponseBadRequest
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.views.generic import View
+from django_filters import BooleanFilter
+from xlsxwriter.utility import xl_col_to_name
+
+from company.models import Company
+from project.models import Project
+
+from .models import DeletionLog
+from .utils import StreamingWorkbook, FormatRegistry, iter_values_list, write_merged_cells, csv_response
+
+NUM_FORMATS = {
+    'text': None,
+    'number': '#,##0',
+    'amount': 41,
+    'date': 'yyyy-mm-dd',
+    'datetime': 'yyyy-mm-dd hh:mm:ss',
+}
+
+BOOLEAN_PARAMS = {'1': 'true', '0': 'false'}  # 여부 요청 파라미터 값 -> BooleanFilter 입력 값
+
+# 증분 내보내기 기준 시점 겹침 구간 - updated_at 은 커밋 시각이 아닌 저장 시각이므로
+# 조회 직전에 저장되었으나 조회 이후 커밋된 행이 다음 증분 요청에서 빠지지 않도록 기준 시점을 앞당긴다.
+WATERMARK_OVERLAP = datetime.timedelta(seconds=getattr(settings, 'EXPORT_WATERMARK_OVERLAP', 300))
+
+
+def to_local(value):
+    """aware datetime -> 현지 시각 naive datetime (엑셀은 시간대 정보를 기록할 수 없음)"""
+    return timezone.localtime(value).replace(tzinfo=None) if value else value
+
+
+class Column:
+    """
+    내보내기 컬럼 정의
+    :param title: 헤더 제목
+    :param field: values_list 로 추출할 ORM 경로 (annotate 이름 포함)
+    :param width: 컬럼 넓이
+    :param kind: 'text' | 'number' | 'amount' | 'date' - 셀 표시 형식
+    :param align: 셀 정렬
+    :param choices: 값 치환 dict (choices 코드 -> 표시명)
+    :param display: 값 변환 함수 (choices 적용 후 호출)
+    :param group: 상위 헤더 제목 - 연속된 같은 group 컬럼은 2단 헤더로 병합
+    """
+
+    def __init__(self, title, field, width=12, kind='text', align='center',
+                 choices=None, display=None, group=None):
+        self.title = title
+        self.field = field
+        self.width = width
+        self.kind = kind
+        self.align = align
+        self.choices = dict(choices) if choices else None
+        self.display = display
+        self.group = group
+
+    def get_value(self, value):
+        if self.choices is not None:
+            value = self.choices.get(value, '')
+        if self.display is not None:
+            value = self.display(value)
+        return value
+
+    def get_format(self):
+        properties = {'border': True, 'valign': 'vcenter', 'align': self.align}
+        num_format = NUM_FORMATS[self.kind]
+        if num_format is not None:
+            properties['num_format'] = num_format
+        return properties
+
+
+# 증분 내보내기 변경 구분 컬럼 - 삭제 목록(tombstone) 행은 이 컬럼만 채운다.
+CHANGE_COLUMNS = (
+    Column('구분', 'change_type', 6),
+    Column('ID', 'pk', 8, kind='number'),
+    Column('변경일시', 'changed_at', 19, kind='datetime', display=to_local),
+)
+
+
+class ExportSpec(View):
+    """
+    선언형 엑셀 내보내기 기반 뷰
+    - 컬럼, 쿼리셋, 필터 정의만 선언하면 제목/헤더/본문 기록, 청크 조회,
+      서식 캐시, constant_memory 스트리밍 응답을 공통으로 처리한다.
+    - 필터는 apiV1 의 FilterSet 을 재사용하고 filter_params 로 요청 파라미터명을 매핑한다.
+    - ?format=csv 요청 시 같은 컬럼 정의로 제목 없이 헤더와 본문만 CSV 로 스트리밍한다. (기본값: xlsx)
+    - changed_fields 가 지정된 경우 ?since=<일시> 요청 시 그 이후 변경된 행과 삭제된 행(DeletionLog)만 내보내고
+      다음 요청에 사용할 기준 시점을 X-Export-Watermark 응답 헤더로 전달한다. (증분 내보내기)
+      기준 시점은 WATERMARK_OVERLAP 만큼 앞당겨지므로 겹침 구간의 행은 다음 요청에 다시 포함될 수 있으며,
+      받는 쪽에서 ID 가 같은 행은 변경일시가 가장 늦은 행만 반영한다.
+    """
+    scope_model = Project  # 요청 파라미터로 조회하는 상위 객체 (Project | Company)
+    scope_param = 'project'  # 상위 객체 pk 요청 파라미터
+    scope_field = 'project'  # 상위 객체로 쿼리셋을 한정하는 필드
+
+    queryset = None
+    columns = ()
+    numbering = True  # 순번(No) 컬럼 추가 여부
+    ordering = None
+
+    filterset_class = None
+    filter_params = {}  # {요청 파라미터: FilterSet 필드}
+    search_param = None  # 검색어 요청 파라미터
+    search_fields = ()  # icontains 검색 대상 필드
+
+    title = ''  # 제목 (상위 객체 이름 뒤에 표시)
+    sheet_name = 'Sheet1'
+    filename = ''  # 파일명 ({date} 치환)
+    format_param = 'format'  # 출력 형식 요청 파라미터 (xlsx | csv)
+
+    since_param = 'since'  # 증분 내보내기 기준 시점 요청 파라미터 (ISO 8601 일시 또는 일자)
+    changed_fields = ()  # 변경 일시 필드 - 첫 번째는 대상 모델의 updated_at, 나머지는 함께 출력되는 관련 모델의 updated_at
+
+    def get(self, request):
+        watermark = timezone.now() - WATERMARK_OVERLAP  # 다음 증분 요청 기준 시점 - 조회 시작 전 시각에서 겹침 구간만큼 이전
+        scope = self.get_scope(request)
+        queryset = self.filter_queryset(request, self.get_queryset(request, scope))
+        columns = self.get_columns(request, scope)
+        date = self.get_date(request)
+        filename = self.get_filename(request, date)
+
+        tombstones = ()
+        if self.changed_fields and request.GET.get(self.since_param):
+            try:
+                since = self.get_since(request)
+            except ValueError as e:
+                return HttpResponseBadRequest(str(e))
+            queryset = self.filter_changed(queryset, since)
+            columns = list(CHANGE_COLUMNS) + columns
+            tombstones = self.get_tombstones(queryset.model, scope, since)
+
+        if request.GET.get(self.format_param) == 'csv':
+            filename = f'{os.path.splitext(filename)[0]}.csv'
+            response = csv_response(self.iter_rows(columns, queryset, tombstones), filename)
+        else:
+            workbook = StreamingWorkbook()
+            self.write(workbook, columns, queryset, title=f'{self.get_scope_name(scope)} {self.title}', date=date,
+                       tombstones=tombstones)
+            response = workbook.response(filename)
+
+        if self.changed_fields:
+            response['X-Export-Watermark'] = watermark.isoformat()
+        return response
+
+    def get_scope(self, request):
+        return self.scope_model.objects.get(pk=request.GET.get(self.scope_param))
+
+    @staticmethod
+    def get_scope_name(scope):
+        if isinstance(scope, Company):
+            return scope.name.replace('주식회사 ', '(주)')
+        return str(scope)
+
+    def get_date(self, request):
+        """기준일 - 제목 옆 'OOOO-OO-OO 현재' 및 파일명에 표시"""
+        return datetime.date.today().strftime('%Y-%m-%d')
+
+    def get_since(self, request):
+        """증분 내보내기 기준 시점 (aware datetime) - 형식이 잘못되면 ValueError"""
+        value = request.GET.get(self.since_param)
+        since = parse_datetime(value)
+        if since is None:
+            day = parse_date(value)
+            if day is None:
+                raise ValueError(f'기준 시점({self.since_param}) 형식이 올바르지 않습니다. (예: 2024-01-31T18:00:00+09:00)')
+            since = datetime.datetime.combine(day, datetime.time())
+        return timezone.make_aware(since) if timezone.is_naive(since) else since
+
+    def filter_changed(self, queryset, since):
+        """기준 시점 이후 변경된 행 - 관련 모델 변경 포함, 구분/변경일시 컬럼 annotate"""
+        own, *related = self.changed_fields
+        changed_at = Greatest(F(own), *[Coalesce(field, own) for field in related]) if related else F(own)
+        return queryset.annotate(change_type=Value('변경'), changed_at=changed_at).filter(changed_at__gt=since)
+
+    def get_tombstones(self, model, scope, since):
+        """기준 시점 이후 삭제된 행 [(pk, 삭제일시), ...] - 삭제된 행에는 조회 필터를 적용할 수 없어 상위 객체 전체 기준"""
+        return DeletionLog.objects.filter(model=model._meta.label_lower, deleted__gt=since,
+                                          **{self.scope_model._meta.model_name: scope}) \
+            .values_list('object_id', 'deleted')
+
+    def get_filename(self, request, date):
+        return self.filename.format(date=date)
+
+    def get_columns(self, request, scope):
+        return list(self.columns)
+
+    def get_queryset(self, request, scope):
+        return self.queryset.filter(**{self.scope_field: scope})
+
+    def get_filter_data(self, request):
+        """
+        FilterSet 입력 데이터 - 요청 파라미터명을 FilterSet 필드명으로 매핑
+        - 프론트엔드의 '1'/'0' 여부 파라미터는 BooleanFilter 가 해석하는 'true'/'false' 로 변환한다.
+          (변환하지 않으면 BooleanFilter 가 값을 무시하여 필터가 적용되지 않는다.)
+        """
+        filters = self.filterset_class.base_filters
+        data = {}
+        for param, field in self.filter_params.items():
+            value = request.GET.get(param)
+            if not value:
+                continue
+            if isinstance(filters.get(field), BooleanFilter):
+                value = BOOLEAN_PARAMS.get(value, value)
+            data[field] = value
+        return data
+
+    def filter_queryset(self, request, queryset):
+        if self.filterset_class is not None:
+            queryset = self.filterset_class(self.get_filter_data(request), queryset=queryset).qs
+
+        search = request.GET.get(self.search_param) if self.search_param else None
+        if search and self.search_fields:
+            queryset = queryset.filter(reduce(or_, (Q(**{f'{field}__icontains': search})
+                                                   for field in self.search_fields)))
+
+        return queryset.order_by(*self.ordering) if self.ordering else queryset
+
+    @staticmethod
+    def iter_values(columns, queryset, tombstones=()):
+        """본문 행 값 이터레이터 - 청크 단위로 읽는 대로 표시값으로 변환 후 삭제 목록 행을 이어서 반환"""
+        fields = [column.field for column in columns if column.field is not None]
+        num = 0
+        for num, row in enumerate(iter_values_list(queryset, *fields), start=1):
+            values = iter(row)
+            yield [num if column.field is None else column.get_value(next(values)) for column in columns]
+
+        for num, (object_id, deleted) in enumerate(tombstones, start=num + 1):
+            cells = dict(zip(CHANGE_COLUMNS, ('삭제', object_id, deleted)))
+            yield [num if column.field is None else column.get_value(cells[column]) if column in cells else None
+                   for column in columns]
+
+    def iter_rows(self, columns, queryset, tombstones=()):
+        """CSV 행 이터레이터 - 헤더 행 후 본문 행을 청크 단위로 읽는 대로 반환"""
+        if self.numbering:
+            columns = [Column('No', None)] + columns
+
+        yield [column.title for column in columns]
+        yield from self.iter_values(columns, queryset, tombstones)
+
+    def write(self, workbook, columns, queryset, title, date, tombstones=()):
+        """워크시트 기록 - 제목, 기준일, 헤더, 본문 순으로 행 순서대로 기록"""
+        formats = FormatRegistry(workbook)
+        worksheet = workbook.add_worksheet(self.sheet_name)
+        worksheet.set_default_row(20)
+
+        if self.numbering:
+            columns = [Column('No', None, 7, kind='number')] + columns
+        last_col = len(columns) - 1
+
+        # 1. Title
+        row_num = 0
+        worksheet.set_row(row_num, 50)
+        title_format = formats.get({'bold': True, 'font_size': 18, 'valign': 'vcenter'})
+        worksheet.merge_range(row_num, 0, row_num, last_col, title, title_format)
+
+        # 2. Pre Header - Date
+        row_num = 1
+        worksheet.set_row(row_num, 18)
+        worksheet.write(row_num, last_col, date + ' 현재', formats.get({'align': 'right'}))
+
+        # 3. Header
+        row_num = 2
+        h_format = formats.get({'bold': True, 'border': True, 'align': 'center',
+                                'valign': 'vcenter', 'bg_color': '#eeeeee'})
+        for col_num, column in enumerate(columns):
+            worksheet.set_column(col_num, col_num, column.width)
+        row_num = self.write_header(worksheet, row_num, columns, h_format)
+
+        # 4. Body
+        worksheet.ignore_errors({'number_stored_as_text': f'A:{xl_col_to_name(last_col)}'})
+        body_formats = [formats.get(column.get_format()) for column in columns]
+
+        for row in self.iter_values(columns, queryset, tombstones):
+            row_num += 1
+            for col_num, cell_data in enumerate(row):
+                worksheet.write(row_num, col_num, cell_data, body_formats[col_num])
+
+        return row_num
+
+    @staticmethod
+    def write_header(worksheet, row_num, columns, h_format):
+        """헤더 기록 - group 이 지정된 컬럼이 있으면 2단 헤더로 병합 후 마지막 헤더 행 번호 반환"""
+        if not any(column.group for column in columns):
+            worksheet.set_row(row_num, 20)
+            for col_num, column in enumerate(columns):
+                worksheet.write(row_num, col_num, column.title, h_format)
+            return row_num
+
+        cells = []
+        col_num = 0
+        while col_num < len(columns):
+            group = columns[col_num].group
+            if group:
+                last = col_num
+                while last + 1 < len(columns) and columns[last + 1].group == group:
+                    last += 1
+                cells.append((row_num, col_num, row_num, last, group, h_format))
+                for sub in range(col_num, last + 1):
+                    cells.append((row_num + 1, sub, row_num + 1, sub, columns[sub].title, h_format))
+                col_num = last + 1
+            else:
+                cells.append((row_num, col_num, row_num + 1, col_num, columns[col_num].title, h_format))
+                col_num += 1
+        write_merged_cells(worksheet, cells)
+        return row_num + 1
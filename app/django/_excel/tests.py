@@ -1,3 +1,250 @@
-from django.test import TestCase
+import csv
+import io
+import threading
+import time
+import uuid
+from datetime import date, timedelta
+from functools import partial
+from unittest import mock
 
-# Create your tests here.
+from django.http import FileResponse, StreamingHttpResponse
+from django.test import SimpleTestCase, TestCase, RequestFactory
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from contract.models import OrderGroup, Contract, Contractor
+from ibs.models import AccountSort, AccountSubD1, ProjectAccountD2, ProjectAccountD3
+from items.models import UnitType, UnitFloorType, KeyUnit, BuildingUnit, HouseUnit
+from payment.models import SalesPriceByGT, InstallmentPaymentOrder, DownPayment
+from project.models import ProjectIncBudget
+from project.testing import create_test_project
+from .admission import EXPORT_CONCURRENCY, LOCK_POLL_INTERVAL, ExportAdmissionMiddleware, FileSemaphore
+from .cache import get_data_version
+from .models import ReportDataVersion
+from .specs import WATERMARK_OVERLAP
+from .utils import get_keyset_ordering, iter_values_list
+
+
+class ExportContractsFilterTests(TestCase):
+    """계약자 리스트 내보내기 요청 파라미터 필터 적용 확인"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, cls.project = user, project = create_test_project()
+
+        order_group = OrderGroup.objects.create(project=project, order_number=1, order_group_name='일반분양')
+        unit_type = UnitType.objects.create(project=project, sort='1', name='84A', color='#ffffff',
+                                            num_unit=10, average_price=500000000)
+        floor_type = UnitFloorType.objects.create(project=project, sort='1', start_floor=1, end_floor=30,
+                                                  alias_name='기준층')
+        building = BuildingUnit.objects.create(project=project, name='101')
+
+        for i in range(4):
+            contract = Contract.objects.create(project=project, order_group=order_group, unit_type=unit_type,
+                                               serial_number=f'TEST-{i:02d}', user=user)
+            Contractor.objects.create(contract=contract, name=f'계약자{i}', status='2',
+                                      contract_date=date(2023, 1, 10 + i))
+            if i % 2:  # 홀수 번째 계약 건만 동호 지정
+                key_unit = KeyUnit.objects.create(project=project, unit_type=unit_type, unit_code=f'{i}',
+                                                  contract=contract)
+                HouseUnit.objects.create(unit_type=unit_type, floor_type=floor_type, building_unit=building,
+                                         name=f'{i + 1}01', key_unit=key_unit, bldg_line=1, floor_no=i + 1)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def get_serials(self, **params):
+        response = self.client.get(reverse('excel:contracts'),
+                                   {'project': self.project.pk, 'col': '1', 'format': 'csv', **params})
+        self.assertEqual(response.status_code, 200)
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        return [row[1] for row in list(csv.reader(io.StringIO(content)))[1:]]
+
+    def test_is_null_flag(self):
+        self.assertEqual(self.get_serials(is_null='1'), ['TEST-00', 'TEST-02'])
+        self.assertEqual(self.get_serials(is_null='0'), ['TEST-01', 'TEST-03'])
+        self.assertEqual(self.get_serials(), ['TEST-00', 'TEST-01', 'TEST-02', 'TEST-03'])
+
+    def test_watermark_overlap(self):
+        before = timezone.now()
+        since = (before - timedelta(days=1)).isoformat()  # 이전 실행 결과 파일과 겹치지 않는 요청
+        response = self.client.get(reverse('excel:contracts'),
+                                   {'project': self.project.pk, 'col': '1', 'format': 'csv', 'since': since})
+        after = timezone.now()
+        response.close()
+        watermark = parse_datetime(response['X-Export-Watermark'])
+        self.assertGreaterEqual(watermark, before - WATERMARK_OVERLAP)
+        self.assertLessEqual(watermark, after - WATERMARK_OVERLAP)
+
+        # 조회 직전에 저장되었으나 조회 이후 커밋된 행도 다음 증분 요청에 포함된다.
+        Contract.objects.update(updated_at=before - timedelta(days=2))
+        Contractor.objects.update(updated_at=before - timedelta(days=2))
+        Contract.objects.filter(serial_number='TEST-00').update(updated_at=before - timedelta(seconds=1))
+        response = self.client.get(reverse('excel:contracts'), {'project': self.project.pk, 'col': '1',
+                                                                'format': 'csv', 'since': watermark.isoformat()})
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        rows = list(csv.reader(io.StringIO(content)))[1:]
+        self.assertEqual([row[1] for row in rows], ['변경'])
+        self.assertEqual(rows[0][4], 'TEST-00')
+
+    def test_rows_fetched_in_chunks(self):
+        with mock.patch('_excel.specs.iter_values_list', partial(iter_values_list, chunk_size=1)):
+            self.assertEqual(self.get_serials(), ['TEST-00', 'TEST-01', 'TEST-02', 'TEST-03'])
+
+    def test_keyset_ordering_ends_at_pk(self):
+        contracts = Contract.objects.all()
+        self.assertEqual(get_keyset_ordering(contracts.order_by('-id', 'serial_number')), [('id', True)])
+        self.assertEqual(get_keyset_ordering(contracts.order_by('serial_number')),
+                         [('serial_number', False), ('pk', False)])
+
+
+class ReportDataVersionTests(TestCase):
+    """보고서가 읽는 모델 변경 시 프로젝트 데이터 버전(보고서 캐시 키) 증가 확인"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = create_test_project()[1]
+
+    def assertBumped(self, create):
+        version = get_data_version(self.project.pk)
+        obj = create()
+        self.assertEqual(get_data_version(self.project.pk), version + 1)
+        obj.delete()
+        self.assertEqual(get_data_version(self.project.pk), version + 2)
+
+    def test_bumped_by_payment_and_budget_models(self):
+        project = self.project
+        order_group = OrderGroup.objects.create(project=project, order_number=1, order_group_name='일반분양')
+        unit_type = UnitType.objects.create(project=project, sort='1', name='84A', color='#ffffff',
+                                            num_unit=10, average_price=500000000)
+        floor_type = UnitFloorType.objects.create(project=project, sort='1', start_floor=1, end_floor=30,
+                                                  alias_name='기준층')
+        d1 = AccountSubD1.objects.create(code='1', name='분양수입', description='분양수입')
+        d2 = ProjectAccountD2.objects.create(d1=d1, code='1', name='분양대금')
+        d3 = ProjectAccountD3.objects.create(sort=AccountSort.objects.create(name='입금'), d2=d2, code='1',
+                                             name='분양대금')
+
+        self.assertBumped(lambda: InstallmentPaymentOrder.objects.create(project=project, pay_sort='1', pay_code=1,
+                                                                         pay_time=1, pay_name='1회차'))
+        self.assertBumped(lambda: DownPayment.objects.create(project=project, order_group=order_group,
+                                                             unit_type=unit_type, payment_amount=10000000))
+        self.assertBumped(lambda: SalesPriceByGT.objects.create(project=project, order_group=order_group,
+                                                                unit_type=unit_type, unit_floor_type=floor_type,
+                                                                price=500000000))
+        self.assertBumped(lambda: ProjectIncBudget.objects.create(project=project, account_d2=d2, account_d3=d3,
+                                                                  order_group=order_group, unit_type=unit_type,
+                                                                  quantity=10, budget=5000000000))
+
+    def test_bumped_by_unit_models(self):
+        project = self.project
+        unit_type = UnitType.objects.create(project=project, sort='1', name='84A', color='#ffffff',
+                                            num_unit=10, average_price=500000000)
+        floor_type = UnitFloorType.objects.create(project=project, sort='1', start_floor=1, end_floor=30,
+                                                  alias_name='기준층')
+        building = BuildingUnit.objects.create(project=project, name='101')
+
+        self.assertBumped(lambda: UnitFloorType.objects.create(project=project, sort='1', start_floor=31,
+                                                               end_floor=35, alias_name='최상층'))
+        self.assertBumped(lambda: KeyUnit.objects.create(project=project, unit_type=unit_type, unit_code='1'))
+        self.assertBumped(lambda: HouseUnit.objects.create(unit_type=unit_type, floor_type=floor_type,
+                                                           building_unit=building, name='101',
+                                                           bldg_line=1, floor_no=1))
+
+    def test_project_deletion(self):
+        project = self.project
+        InstallmentPaymentOrder.objects.create(project=project, pay_sort='1', pay_code=1, pay_time=1, pay_name='1회차')
+        ReportDataVersion.objects.filter(project=project).delete()
+        project.delete()  # 연쇄 삭제되는 하위 객체가 삭제 중인 프로젝트의 데이터 버전을 새로 만들지 않는다.
+        self.assertFalse(ReportDataVersion.objects.exists())
+
+
+class ExportAdmissionTests(SimpleTestCase):
+    """내보내기 실행 제어 미들웨어 동일 요청 합치기 및 동시 실행 제한 확인"""
+
+    def setUp(self):
+        self.calls = []
+        self.params = {'col': '1', 'test': uuid.uuid4().hex}  # 이전 실행 결과 파일과 겹치지 않는 요청
+
+    def view(self, request):
+        self.calls.append(request)
+
+        def blocks():
+            yield b'a'
+            yield b'b'
+
+        return StreamingHttpResponse(blocks(), content_type='text/csv')
+
+    def get(self, middleware):
+        return middleware(RequestFactory().get('/excel/contracts/', self.params))
+
+    def get_waiting(self, middleware):
+        """다른 스레드에서 동일 요청 - 대기를 시작한 후 반환하며 join() 후 thread.response 로 응답 확인"""
+        thread = threading.Thread(target=lambda: setattr(thread, 'response', self.get(middleware)))
+        thread.start()
+        time.sleep(LOCK_POLL_INTERVAL * 2)
+        return thread
+
+    def test_streamed_without_buffering(self):
+        response = self.get(ExportAdmissionMiddleware(self.view))
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertNotIsInstance(response, FileResponse)
+        self.assertEqual(b''.join(response.streaming_content), b'ab')
+        response.close()
+
+    def test_waiter_gets_streamed_result(self):
+        middleware = ExportAdmissionMiddleware(self.view)
+        response = self.get(middleware)
+        thread = self.get_waiting(middleware)
+        self.assertEqual(next(response.streaming_content), b'a')  # 전송 중에도 동일 요청 잠금 유지
+        self.assertTrue(thread.is_alive())
+        self.assertEqual(next(response.streaming_content), b'b')
+        self.assertRaises(StopIteration, next, response.streaming_content)
+        response.close()
+        thread.join()
+        self.assertEqual(thread.response.status_code, 200)
+        self.assertEqual(b''.join(thread.response.streaming_content), b'ab')
+        thread.response.close()
+        self.assertEqual(len(self.calls), 1)  # 기다린 요청은 첫 요청이 저장한 결과 파일을 받는다.
+
+    def test_incomplete_stream_not_shared(self):
+        middleware = ExportAdmissionMiddleware(self.view)
+        response = self.get(middleware)
+        thread = self.get_waiting(middleware)
+        next(response.streaming_content)
+        response.close()  # 전송 중 연결 종료
+        thread.join()
+        self.assertEqual(b''.join(thread.response.streaming_content), b'ab')
+        thread.response.close()
+        self.assertEqual(len(self.calls), 2)
+
+    def test_earlier_result_not_reused(self):
+        middleware = ExportAdmissionMiddleware(self.view)
+        for _ in range(2):
+            response = self.get(middleware)
+            self.assertEqual(b''.join(response.streaming_content), b'ab')
+            response.close()
+        self.assertEqual(len(self.calls), 2)  # 도착 전에 완료된 결과는 다시 사용하지 않는다.
+
+    @mock.patch('_excel.admission.EXPORT_ADMISSION_TIMEOUT', LOCK_POLL_INTERVAL)
+    def test_same_request_wait_timeout(self):
+        middleware = ExportAdmissionMiddleware(self.view)
+        response = self.get(middleware)
+        try:
+            self.assertEqual(self.get(middleware).status_code, 503)
+        finally:
+            response.close()
+        self.assertEqual(len(self.calls), 1)
+
+    @mock.patch('_excel.admission.EXPORT_ADMISSION_TIMEOUT', LOCK_POLL_INTERVAL)
+    def test_no_free_slot(self):
+        slots = [FileSemaphore('total', EXPORT_CONCURRENCY['total']) for _ in range(EXPORT_CONCURRENCY['total'])]
+        for slot in slots:
+            self.assertTrue(slot.acquire())
+        try:
+            response = self.get(ExportAdmissionMiddleware(self.view))
+        finally:
+            for slot in slots:
+                slot.release()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.calls, [])
@@ -0,0 +1,225 @@
+import csv
+import os
+import tempfile
+from functools import reduce
+from operator import or_
+
+import xlsxwriter
+from django.db.models import F, Q, OrderBy
+from django.http import StreamingHttpResponse
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+CSV_CONTENT_TYPE = 'text/csv; charset=utf-8'
+
+ROW_CHUNK_SIZE = 2000  # 키셋 조회 한 번에 가져올 행 수
+FILE_BLOCK_SIZE = 64 * 1024  # 응답으로 내보낼 파일 블록 크기
+
+
+def get_keyset_ordering(queryset):
+    """
+    키셋 조회 정렬 기준 [(필드 경로, 내림차순 여부), ...]
+    - 쿼리셋 정렬(없으면 모델 기본 정렬) 뒤에 pk 를 더해 행 순서를 유일하게 한다.
+    - pk 이후의 정렬 조건은 순서에 영향이 없으므로 버린다. (pk 만으로 정렬하면 기본키 인덱스 범위 조회)
+    - 관계 필드로 정렬한 경우 관계 모델의 기본 정렬이 아닌 외래키 값 순서로 조회한다.
+    """
+    query = queryset.query
+    ordering = query.order_by or (queryset.model._meta.ordering if query.default_ordering else ())
+    keys = []
+    for item in ordering:
+        if isinstance(item, str):
+            if item == '?':
+                continue
+            key = (item.lstrip('-'), item.startswith('-'))
+        elif isinstance(item, F):
+            key = (item.name, False)
+        elif isinstance(item, OrderBy) and isinstance(item.expression, F):
+            key = (item.expression.name, item.descending)
+        else:
+            raise TypeError(f'키셋 조회에 사용할 수 없는 정렬 조건입니다: {item!r}')
+        keys.append(key)
+        if key[0] in ('pk', queryset.model._meta.pk.name):
+            return keys
+    keys.append(('pk', False))
+    return keys
+
+
+def get_keyset_filter(keys, values):
+    """
+    직전 청크 마지막 행 이후의 행 조건 - (k1 >= v1) & ((k1 > v1) | (k1 = v1 & k2 > v2) | ...)
+    - NULL 은 오름차순에서 처음, 내림차순에서 마지막으로 정렬한다. (MariaDB 기본 정렬과 동일)
+    - 앞의 k1 범위 조건은 결과에 영향이 없으나 OR 조건만으로는 인덱스 범위 조회를 못하는 경우를 위해 둔다.
+    """
+    terms = []
+    equal = Q()
+    for (alias, descending), value in zip(keys, values):
+        if value is None:
+            after = None if descending else Q(**{f'{alias}__isnull': False})
+        elif descending:
+            after = Q(**{f'{alias}__lt': value}) | Q(**{f'{alias}__isnull': True})
+        else:
+            after = Q(**{f'{alias}__gt': value})
+        if after is not None:
+            terms.append(equal & after)
+        equal &= Q(**{f'{alias}__isnull': True}) if value is None else Q(**{alias: value})
+    if not terms:
+        return None
+    (alias, descending), value = keys[0], values[0]
+    if value is None:
+        return reduce(or_, terms)
+    bound = Q(**{f'{alias}__lte': value}) | Q(**{f'{alias}__isnull': True}) if descending \
+        else Q(**{f'{alias}__gte': value})
+    return bound & reduce(or_, terms)
+
+
+def iter_values_list(queryset, *fields, chunk_size=ROW_CHUNK_SIZE):
+    """
+    쿼리셋 결과 캐시 없이 values_list 행을 키셋 페이지네이션으로 chunk_size 행씩 조회하여 순회
+    - mysqlclient 는 QuerySet.iterator() 사용 시에도 결과 전체를 클라이언트 메모리에 받으므로
+      정렬 기준 값이 직전 청크의 마지막 행보다 큰 행을 LIMIT 으로 나누어 조회한다.
+    - 정렬 순서는 쿼리셋 정렬과 같고, 행 수와 무관하게 한 청크만 메모리에 유지한다.
+    :param queryset: 추출 대상 쿼리셋 (슬라이스하지 않은 쿼리셋)
+    :param fields: values_list 추출 필드
+    :param chunk_size: 한 번에 조회할 행 수
+    :return: tuple 행 이터레이터
+    """
+    ordering = get_keyset_ordering(queryset)
+    keys = [(f'_keyset_{i}', descending) for i, (_, descending) in enumerate(ordering)]
+    queryset = queryset.annotate(**{f'_keyset_{i}': F(name) for i, (name, _) in enumerate(ordering)}) \
+        .order_by(*[F(alias).desc(nulls_last=True) if descending else F(alias).asc(nulls_first=True)
+                    for alias, descending in keys]) \
+        .values_list(*fields, *[alias for alias, _ in keys])
+
+    size = len(fields)
+    condition = None
+    while True:
+        chunk = queryset.filter(condition) if condition is not None else queryset
+        rows = list(chunk[:chunk_size])
+        for row in rows:
+            yield row[:size]
+        if len(rows) < chunk_size:
+            return
+        condition = get_keyset_filter(keys, rows[-1][size:])
+        if condition is None:  # 마지막 행 이후 행이 없는 정렬 값
+            return
+
+
+def iter_file_blocks(path, block_size=FILE_BLOCK_SIZE):
+    """완성된 파일을 블록 단위로 읽어 내보낸 후 삭제"""
+    try:
+        with open(path, 'rb') as f:
+            while True:
+                block = f.read(block_size)
+                if not block:
+                    break
+                yield block
+    finally:
+        os.remove(path)
+
+
+class StreamingWorkbook(xlsxwriter.Workbook):
+    """
+    constant_memory 모드 워크북
+    - 행 단위로 임시 파일에 기록하므로 행 수와 무관하게 메모리 사용량이 일정하다.
+    - 한 번 넘어간 행에는 다시 쓸 수 없으므로 반드시 위에서 아래 순서로 기록해야 한다.
+    """
+
+    def __init__(self, options=None):
+        fd, self.path = tempfile.mkstemp(prefix='rebs-', suffix='.xlsx')
+        os.close(fd)
+        options = dict(options or {}, constant_memory=True)
+        super().__init__(self.path, options)
+
+    def response(self, filename, content_type=XLSX_CONTENT_TYPE):
+        """워크북을 닫고 파일 블록을 스트리밍하는 응답 반환"""
+        try:
+            self.close()
+            size = os.path.getsize(self.path)
+        except Exception:
+            os.remove(self.path)
+            raise
+
+        response = StreamingHttpResponse(iter_file_blocks(self.path), content_type=content_type)
+        response['Content-Length'] = size
+        response['Content-Disposition'] = f'attachment; filename={filename}'
+        return response
+
+
+class Echo:
+    """csv.writer 가 기록한 행을 버퍼에 쌓지 않고 그대로 반환하는 의사(pseudo) 파일 객체"""
+
+    @staticmethod
+    def write(value):
+        return value
+
+
+def iter_csv_lines(rows):
+    """
+    RFC 4180 CSV 행 이터레이터 - 행 구분자 CRLF, 필요한 값만 큰따옴표로 감싼다.
+    - 엑셀에서 한글이 깨지지 않도록 첫 블록에 UTF-8 BOM 을 붙인다.
+    :param rows: 값 목록 행 이터레이터 (헤더 행 포함)
+    """
+    writer = csv.writer(Echo(), lineterminator='\r\n')
+    yield '\ufeff'
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def csv_response(rows, filename):
+    """
+    CSV 스트리밍 응답 - 행을 읽는 즉시 내보내므로 파일 전체를 메모리나 디스크에 만들지 않는다.
+    :param rows: 값 목록 행 이터레이터 (헤더 행 포함) - DB 행은 iter_values_list 로 청크 단위 조회
+    :param filename: 다운로드 파일명
+    """
+    response = StreamingHttpResponse(iter_csv_lines(rows), content_type=CSV_CONTENT_TYPE)
+    response['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
+
+
+def write_merged_cells(worksheet, cells):
+    """
+    병합 셀이 포함된 헤더 영역을 행 순서대로 기록
+    - constant_memory 모드에서는 지나간 행에 기록할 수 없으므로 세로 병합을 행 단위로 나누어 처리한다.
+    :param worksheet: 대상 워크시트
+    :param cells: [(first_row, first_col, last_row, last_col, data, cell_format), ...]
+    """
+    rows = sorted({row for cell in cells for row in range(cell[0], cell[2] + 1)})
+    for row in rows:
+        for first_row, first_col, last_row, last_col, data, cell_format in cells:
+            if first_row == row:
+                if (first_row, first_col) != (last_row, last_col):
+                    # 서식 없이 병합 영역만 등록하면 아래 행에 빈 셀을 미리 기록하지 않는다.
+                    worksheet.merge_range(first_row, first_col, last_row, last_col, data)
+                worksheet.write(row, first_col, data, cell_format)
+                for col in range(first_col + 1, last_col + 1):
+                    worksheet.write_blank(row, col, None, cell_format)
+            elif first_row < row <= last_row:
+                for col in range(first_col, last_col + 1):
+                    worksheet.write_blank(row, col, None, cell_format)
+
+
+class FormatRegistry:
+    """
+    워크북 단위 셀 서식 레지스트리
+    - 셀마다 add_format()을 호출하면 셀 수만큼 Format 객체가 생성되므로
+      속성 dict 를 키로 하여 같은 서식은 워크북당 한 번만 생성한다.
+    - 반환된 서식은 공유되므로 set_* 메서드로 수정하지 않는다.
+    """
+
+    def __init__(self, workbook):
+        self.workbook = workbook
+        self._formats = {}
+
+    def get(self, properties=None):
+        """
+        :param properties: add_format() 속성 dict (호출 시점의 값으로 키 생성)
+        :return: 해당 속성의 Format 객체
+        """
+        properties = properties or {}
+        key = frozenset(properties.items())
+        cell_format = self._formats.get(key)
+        if cell_format is None:
+            cell_format = self._formats[key] = self.workbook.add_format(properties)
+        return cell_format
+
+    def __len__(self):
+        return len(self._formats)
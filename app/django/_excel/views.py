@@ -6,686 +6,176 @@
 # Copyright 2013-2020, John McNamara, jmcnamara@cpan.org
 #
 import io
-import json
 import datetime
 
 import xlsxwriter
-import xlwt
-from django.core import serializers
-from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import Q, F, Max, Sum, Count, When, Case, PositiveBigIntegerField
+from django.db.models import Q, F, Sum, When, Case
 from django.http import HttpResponse
 from django.views.generic import View
 
-from cash.models import CashBook, ProjectCashBook
-from company.models import Company, Staff, Department, JobGrade, Position, DutyTitle
-from contract.models import Contract, Succession, ContractorRelease, OrderGroup
-from docs.models import LawsuitCase
-from items.models import UnitType, BuildingUnit, HouseUnit
-from payment.models import SalesPriceByGT, InstallmentPaymentOrder, DownPayment
-from project.models import Project, ProjectIncBudget, ProjectOutBudget, Site, SiteOwner, SiteContract
-
-TODAY = datetime.date.today().strftime('%Y-%m-%d')
-
-
-class ExportContracts(View):
-    """계약자 리스트"""
-
-    @staticmethod
-    def get(request):
-
-        # Create an in-memory output file for the new workbook.
-        output = io.BytesIO()
-
-        # Even though the final file will be in memory the module uses temp
-        # files during assembly for efficiency. To avoid this on servers that
-        # don't allow temp files, for example the Google APP Engine, set the
-        # 'in_memory' Workbook() constructor option as shown in the docs.
-        t_name = '계약' if request.GET.get('status') == '2' else '청약'
-
-        workbook = xlsxwriter.Workbook(output)
-        worksheet = workbook.add_worksheet(f'{t_name}목록_정보')
-
-        worksheet.set_default_row(20)
-
-        project = Project.objects.get(pk=request.GET.get('project'))
-        cols = sorted(list(map(int, request.GET.get('col').split('-'))))
-
-        # 1. Title
-        row_num = 0
-        title_format = workbook.add_format()
-        worksheet.set_row(row_num, 50)
-        title_format.set_font_size(18)
-        title_format.set_align('vcenter')
-        title_format.set_bold()
-        worksheet.merge_range(row_num, 0, row_num, len(cols), str(project) + f' {t_name}자 리스트', title_format)
-
-        # 2. Pre Header - Date
-        row_num = 1
-        worksheet.set_row(row_num, 18)
-        worksheet.write(row_num, len(cols), TODAY + ' 현재', workbook.add_format({'align': 'right'}))
-
-        # 3. Header
-        row_num = 2
-        worksheet.set_row(row_num, 23, workbook.add_format({'bold': True}))
-
-        h_format = workbook.add_format()
-        h_format.set_bold()
-        h_format.set_border()
-        h_format.set_align('center')
-        h_format.set_align('vcenter')
-        h_format.set_bg_color('#eeeeee')
-
-        # title_list
-        header_src = [[],
-                      ['일련번호', 'serial_number', 10],
-                      ['등록상태', 'contractor__qualification', 8],
-                      ['차수', 'order_group__order_group_name', 10],
-                      ['타입', 'keyunit__unit_type__name', 7],
-                      [f'{t_name}자', 'contractor__name', 10],
-                      ['동', 'keyunit__houseunit__building_unit__name', 7],
-                      ['호수', 'keyunit__houseunit__name', 7],
-                      [f'{t_name}일자', 'contractor__contract_date', 12],
-                      ['건물가', 'contractor__contract__contractprice__price_build', 12],
-                      ['대지가', 'contractor__contract__contractprice__price_land', 12],
-                      ['부가세', 'contractor__contract__contractprice__price_tax', 11],
-                      ['공급가액', 'contractor__contract__contractprice__price', 12],
-                      ['납입금합계', '', 12],
-                      ['회당계약금', 'contractor__contract__contractprice__down_pay', 11],
-                      ['회당중도금', 'contractor__contract__contractprice__middle_pay', 11],
-                      ['회당잔금', 'contractor__contract__contractprice__remain_pay', 12],
-                      ['생년월일', 'contractor__birth_date', 12],
-                      ['연락처[1]', 'contractor__contractorcontact__cell_phone', 14],
-                      ['연락처[2]', 'contractor__contractorcontact__home_phone', 14],
-                      ['연락처[3]', 'contractor__contractorcontact__other_phone', 14],
-                      ['이메일', 'contractor__contractorcontact__email', 15],
-                      ['주소[등본]', 'contractor__contractoraddress__id_zipcode', 7],
-                      ['', 'contractor__contractoraddress__id_address1', 35],
-                      ['', 'contractor__contractoraddress__id_address2', 20],
-                      ['', 'contractor__contractoraddress__id_address3', 40],
-                      ['주소[우편]', 'contractor__contractoraddress__dm_zipcode', 7],
-                      ['', 'contractor__contractoraddress__dm_address1', 35],
-                      ['', 'contractor__contractoraddress__dm_address2', 20],
-                      ['', 'contractor__contractoraddress__dm_address3', 40],
-                      ['비고', 'contractor__note', 45]]
-
-        titles = ['No']
-        params = ['pk']
-        widths = [7]
-
-        for n in cols:  # 요청된 컬럼 개수 만큼 반복 (1-2-3... -> i)
-            titles.append(header_src[n][0])  # 일련번호
-            params.append(header_src[n][1])  # serial_number
-            widths.append(header_src[n][2])  # 10
-
-        while '' in params:
-            params.remove('')
-
-        # Adjust the column width.
-        for i, cw in enumerate(widths):  # 각 컬럼 넙이 세팅
-            worksheet.set_column(i, i, cw)
-
-        # Write header
-        for col_num, col in enumerate(titles):  # 헤더 줄 제목 세팅
-            if '주소' in col:
-                worksheet.merge_range(row_num, col_num, row_num, col_num + 3, titles[col_num], h_format)
-            else:
-                worksheet.write(row_num, col_num, titles[col_num], h_format)
-
-        # 4. Body
-        b_format = workbook.add_format()
-        b_format.set_border()
-        b_format.set_align('vcenter')
-        b_format.set_num_format('yyyy-mm-dd')
-        b_format.set_align('center')
-
-        body_format = {
-            'border': True,
-            'valign': 'vcenter',
-            'num_format': '#,##0',
-            'align': 'center',
-        }
-
-        # Turn off some of the warnings:
-        worksheet.ignore_errors({'number_stored_as_text': 'B:G'})
-
-        # ----------------- get_queryset start ----------------- #
-        # Get some data to write to the spreadsheet.
-        queryset = Contract.objects.filter(project=project,
-                                           activation=True,
-                                           contractor__status='2').order_by('contractor__contract_date')
-        status = request.GET.get('status')
-        group = request.GET.get('group')
-        type = request.GET.get('type')
-        dong = request.GET.get('dong')
-        is_null = request.GET.get('is_null')
-        quali = request.GET.get('quali')
-        sup = request.GET.get('sup')
-        sdate = request.GET.get('sdate')
-        edate = request.GET.get('edate')
-        q = request.GET.get('q')
-
-        queryset = queryset.filter(contractor__status=status) if status else queryset
-        queryset = queryset.filter(order_group=group) if group else queryset
-        queryset = queryset.filter(unit_type=type) if type else queryset
-        queryset = queryset.filter(keyunit__houseunit__building_unit=dong) if dong else queryset
-        null_qry = True if is_null == '1' else False
-        queryset = queryset.filter(keyunit__houseunit__isnull=null_qry) if is_null else queryset
-        queryset = queryset.filter(contractor__qualification=quali) if quali else queryset
-        sup_qry = True if sup == 'true' else False
-        queryset = queryset.filter(is_sup_cont=sup_qry) if sup else queryset
-        queryset = queryset.filter(contractor__contract_date__gte=sdate) if sdate else queryset
-        queryset = queryset.filter(contractor__contract_date__lte=edate) if edate else queryset
-        queryset = queryset.filter(
-            Q(serial_number__icontains=q) |
-            Q(contractor__name__icontains=q) |
-            Q(contractor__note__icontains=q) |
-            Q(contractor__contractorcontact__cell_phone__icontains=q)) if q else queryset
-
-        order_qry = request.GET.get('order')
-        order_list = ['-created_at', 'created_at', '-contractor__contract_date',
-                      'contractor__contract_date', '-serial_number',
-                      'serial_number', '-contractor__name', 'contractor__name']
-        queryset = queryset.order_by(order_list[int(order_qry)]) if order_qry else queryset
-
-        # ----------------- get_queryset finish ----------------- #
-        data = queryset.values_list(*params)
-
-        is_date = []  # ('생년월일', '계약일자')
-        is_left = []  # ('주소', '비고')
-        is_num = []  # ('공급가액', '납입금합계', '회당계약금', '회당중도금', '회장잔금')
-        reg_col = None  # ('등록상태',)
-        sum_col = None  # 납입금합계 컬럼 위치
-
-        # Write body
-        for col_num, title in enumerate(titles):
-            if title in ('생년월일', f'{t_name}일자'):
-                is_date.append(col_num)
-            if title == '등록상태':
-                reg_col = col_num
-            if title in ('건물가', '대지가', '부가세', '공급가액', '납입금합계', '회당계약금', '회당중도금', '회당잔금'):
-                is_num.append(col_num)
-                if title == '납입금합계':
-                    sum_col = col_num
-            if title in ('', '비고'):
-                is_left.append(col_num)
-
-        paid_params = ['contract', 'income']
-        paid_data = ProjectCashBook.objects.filter(project_account_d3__in=(1, 4),
-                                                   income__isnull=False,
-                                                   contract__activation=True)
-        paid_dict = paid_data.values_list(*paid_params)
-
-        quali_str = {'1': '일반분양', '2': '미인가', '3': '인가', '4': '부적격', }
-
-        for i, row in enumerate(data):
-            row_num += 1
-            row = list(row)
-
-            if sum_col is not None:
-                paid_sum = sum([ps[1] for ps in paid_dict if ps[0] == row[0]])
-                row.insert(sum_col, paid_sum)  # 순서 삽입
-
-            row[0] = i + 1  # pk 대신 순서 삽입
-
-            for col_num, cell_data in enumerate(row):
-                # css 설정
-                if col_num == 0:
-                    body_format['align'] = 'center'
-                    body_format['num_format'] = '#,##0'
-                elif col_num in is_num:
-                    body_format['num_format'] = 41
-                elif col_num in is_left:
-                    body_format['align'] = 'left'
-                else:
-                    body_format['align'] = 'center'
-                    body_format['num_format'] = 'yyyy-mm-dd'
-
-                # 인가 여부 데이터 치환
-                cell_value = quali_str.get(cell_data, '') if reg_col == col_num else cell_data
-
-                bf = workbook.add_format(body_format)
-
-                worksheet.write(row_num, col_num, cell_value, bf)
-
-        # Close the workbook before sending the data.
-        workbook.close()
-
-        # Rewind the buffer.
-        output.seek(0)
-
-        # Set up the Http response.
-        filename = '{date}-contracts.xlsx'.format(date=TODAY)
-        file_format = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        response = HttpResponse(output, content_type=file_format)
-        response['Content-Disposition'] = 'attachment; filename=%s' % filename
-
-        return response
-
-
-class ExportApplicants(View):
-    """청약자 리스트"""
-
-    @staticmethod
-    def get(request):
-
-        # Create an in-memory output file for the new workbook.
-        output = io.BytesIO()
-
-        # Even though the final file will be in memory the module uses temp
-        # files during assembly for efficiency. To avoid this on servers that
-        # don't allow temp files, for example the Google APP Engine, set the
-        # 'in_memory' Workbook() constructor option as shown in the docs.
-        workbook = xlsxwriter.Workbook(output)
-        worksheet = workbook.add_worksheet('청약목록_정보')
-
-        worksheet.set_default_row(20)
-
-        project = Project.objects.get(pk=request.GET.get('project'))
-
-        # title_list
-        header_src = [[],
-                      ['일련번호', 'serial_number', 10],
-                      ['차수', 'order_group__order_group_name', 10],
-                      ['타입', 'keyunit__unit_type__name', 7],
-                      ['청약자', 'contractor__name', 10],
-                      ['청약일자', 'contractor__reservation_date', 12],
-                      ['연락처[1]', 'contractor__contractorcontact__cell_phone', 14],
-                      ['연락처[2]', 'contractor__contractorcontact__home_phone', 14],
-                      ['연락처[3]', 'contractor__contractorcontact__other_phone', 14],
-                      ['이메일', 'contractor__contractorcontact__email', 15],
-                      ['비고', 'contractor__note', 45]]
-
-        if project.is_unit_set:
-            header_src.append(
-                ['동', 'keyunit__houseunit__building_unit', 7],
-                ['호수', 'keyunit__houseunit__name', 7]
-            )
-
-        # 1. Title
-        row_num = 0
-        worksheet.set_row(row_num, 50)
-        title_format = workbook.add_format()
-        title_format.set_bold()
-        title_format.set_font_size(18)
-        title_format.set_align('vcenter')
-        worksheet.merge_range(row_num, 0, row_num, len(header_src) - 1, str(project) + ' 청약자 리스트', title_format)
-
-        # 2. Pre Header - Date
-        row_num = 1
-        worksheet.set_row(row_num, 18)
-        worksheet.write(row_num, len(header_src) - 1, TODAY + ' 현재', workbook.add_format({'align': 'right'}))
-
-        # 3. Header
-        row_num = 2
-        worksheet.set_row(row_num, 25, workbook.add_format({'bold': True}))
-
-        titles = ['No']  # header titles
-        params = []  # ORM 추출 field
-        widths = [7]  # No. 컬럼 넓이
-
-        for ds in header_src:
-            if ds:
-                titles.append(ds[0])
-                params.append(ds[1])
-                widths.append(ds[2])
-
-        h_format = workbook.add_format()
-        h_format.set_bold()
-        h_format.set_border()
-        h_format.set_align('center')
-        h_format.set_align('vcenter')
-        h_format.set_bg_color('#eeeeee')
-
-        # Adjust the column width.
-        for i, col_width in enumerate(widths):
-            worksheet.set_column(i, i, col_width)
-
-        # Write header
-        for col_num, col in enumerate(titles):
-            worksheet.write(row_num, col_num, titles[col_num], h_format)
-
-        # 4. Body
-        # Get some data to write to the spreadsheet.
-        data = Contract.objects.filter(project=project,
-                                       keyunit__contract__isnull=False,
-                                       contractor__status='1')
-
-        data = data.values_list(*params)
-
-        b_format = workbook.add_format()
-        b_format.set_border()
-        b_format.set_align('center')
-        b_format.set_align('vcenter')
-        b_format.set_num_format('yyyy-mm-dd')
-
-        body_format = {
-            'border': True,
-            'align': 'center',
-            'valign': 'vcenter',
-            'num_format': 'yyyy-mm-dd'
-        }
-
-        is_left = []
-        # Write header
-        for col_num, col in enumerate(titles):
-            if col in ('비고'):
-                is_left.append(col_num)
-
-        # Write header
-        for i, row in enumerate(data):
-            row = list(row)
-            row_num += 1
-            row.insert(0, i + 1)
-            for col_num, cell_data in enumerate(row):
-                if col_num == 0:
-                    body_format['num_format'] = '#,##0'
-                else:
-                    body_format['num_format'] = 'yyyy-mm-dd'
-                if col_num in is_left:
-                    if 'align' in body_format:
-                        del body_format['align']
-                else:
-                    if 'align' not in body_format:
-                        body_format['align'] = 'center'
-                bformat = workbook.add_format(body_format)
-                worksheet.write(row_num, col_num, cell_data, bformat)
-
-        # Close the workbook before sending the data.
-        workbook.close()
-
-        # Rewind the buffer.
-        output.seek(0)
-
-        # Set up the Http response.
-        filename = '{date}-applicants.xlsx'.format(date=TODAY)
-        file_format = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        response = HttpResponse(output, content_type=file_format)
-        response['Content-Disposition'] = 'attachment; filename=%s' % filename
-
-        return response
-
-
-class ExportSuccessions(View):
-    """해지자 리스트"""
-
-    @staticmethod
-    def get(request):
-
-        # Create an in-memory output file for the new workbook.
-        output = io.BytesIO()
-
-        # Even though the final file will be in memory the module uses temp
-        # files during assembly for efficiency. To avoid this on servers that
-        # don't allow temp files, for example the Google APP Engine, set the
-        # 'in_memory' Workbook() constructor option as shown in the docs.
-        workbook = xlsxwriter.Workbook(output)
-        worksheet = workbook.add_worksheet('권리의무승계_목록')
-
-        worksheet.set_default_row(20)
-
-        project = Project.objects.get(pk=request.GET.get('project'))
-
-        # title_list
-        header_src = [[],
-                      ['계약 정보', 'contract', 15],
-                      ['양도계약자', 'seller', 13],
-                      ['양수계약자', 'buyer', 13],
-                      ['승계신청일', 'apply_date', 15],
-                      ['매매계약일', 'trading_date', 15],
-                      ['변경인가일', 'approval_date', 15],
-                      ['변경인가여부', 'is_approval', 13],
-                      ['비고', 'note', 45]]
-
-        # 1. Title
-        row_num = 0
-        worksheet.set_row(row_num, 50)
-        title_format = workbook.add_format()
-        title_format.set_bold()
-        title_format.set_font_size(18)
-        title_format.set_align('vcenter')
-        worksheet.merge_range(row_num, 0, row_num, len(header_src) - 1, str(project) + ' 권리의무승계 목록', title_format)
-
-        # 2. Pre Header - Date
-        row_num = 1
-        worksheet.set_row(row_num, 18)
-        worksheet.write(row_num, len(header_src) - 1, TODAY + ' 현재', workbook.add_format({'align': 'right'}))
-
-        # 3. Header - 1
-        row_num = 2
-        worksheet.set_row(row_num, 20, workbook.add_format({'bold': True}))
-
-        titles = ['No']  # header titles
-        params = []  # ORM 추출 field
-        widths = [7]  # No. 컬럼 넓이
-
-        for ds in header_src:
-            if ds:
-                titles.append(ds[0])
-                params.append(ds[1])
-                widths.append(ds[2])
-
-        h_format = workbook.add_format()
-        h_format.set_bold()
-        h_format.set_border()
-        h_format.set_align('center')
-        h_format.set_align('vcenter')
-        h_format.set_bg_color('#eeeeee')
-
-        # Adjust the column width.
-        for i, col_width in enumerate(widths):
-            worksheet.set_column(i, i, col_width)
-
-        # Write header - 1
-        for col_num, title in enumerate(titles):
-            worksheet.write(row_num, col_num, title, h_format)
-
-        # 4. Body
-        # Get some data to write to the spreadsheet.
-        obj_list = Succession.objects.filter(contract__project=project)
-
-        data = obj_list.values_list(*params)
-
-        b_format = workbook.add_format()
-        b_format.set_border()
-        b_format.set_align('center')
-        b_format.set_align('vcenter')
-        b_format.set_num_format('yyyy-mm-dd')
-
-        body_format = {
-            'border': True,
-            'valign': 'vcenter',
-            'num_format': 'yyyy-mm-dd'
-        }
-
-        # Turn off some of the warnings:
-        worksheet.ignore_errors({'number_stored_as_text': 'F:G'})
-
-        # Write header
-        for i, row in enumerate(data):
-            row = list(row)
-            row_num += 1
-            row.insert(0, i + 1)
-            for col_num, cell_data in enumerate(row):
-                if col_num == 1:
-                    cell_data = obj_list.get(contract=cell_data).contract.__str__()
-                if col_num == 2:
-                    cell_data = obj_list.get(seller=cell_data).contract.contractor.name
-                if col_num == 3:
-                    cell_data = obj_list.get(buyer=cell_data).buyer.name
-                if col_num not in (4, 5, 6):
-                    body_format['num_format'] = '#,##0'
-                else:
-                    body_format['num_format'] = 'yyyy-mm-dd'
-                if col_num == 7:
-                    cell_data = '완료' if cell_data else ''
-                if col_num == 8:
-                    body_format['align'] = 'left'
-                else:
-                    body_format['align'] = 'center'
-                bformat = workbook.add_format(body_format)
-                worksheet.write(row_num, col_num, cell_data, bformat)
-
-        # Close the workbook before sending the data.
-        workbook.close()
-
-        # Rewind the buffer.
-        output.seek(0)
-
-        # Set up the Http response.
-        filename = '{date}-successions.xlsx'.format(date=TODAY)
-        file_format = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        response = HttpResponse(output, content_type=file_format)
-        response['Content-Disposition'] = 'attachment; filename=%s' % filename
-
-        return response
-
-
-class ExportReleases(View):
-    """해지자 리스트"""
-
-    @staticmethod
-    def get(request):
-
-        # Create an in-memory output file for the new workbook.
-        output = io.BytesIO()
-
-        # Even though the final file will be in memory the module uses temp
-        # files during assembly for efficiency. To avoid this on servers that
-        # don't allow temp files, for example the Google APP Engine, set the
-        # 'in_memory' Workbook() constructor option as shown in the docs.
-        workbook = xlsxwriter.Workbook(output)
-        worksheet = workbook.add_worksheet('해지자목록_정보')
-
-        worksheet.set_default_row(20)
-
-        project = Project.objects.get(pk=request.GET.get('project'))
-
-        # title_list
-        header_src = [[],
-                      ['해지자', 'contractor__name', 10],
-                      ['해지일련번호', 'contractor__contract__serial_number', 30],
-                      ['현재상태', 'status', 12],
-                      ['환불(예정)금액', 'refund_amount', 15],
-                      ['은행', 'refund_account_bank', 15],
-                      ['계좌번호', 'refund_account_number', 18],
-                      ['예금주', 'refund_account_depositor', 12],
-                      ['해지신청일', 'request_date', 14],
-                      ['환불처리일', 'completion_date', 14],
-                      ['비고', 'note', 45]]
-
-        # 1. Title
-        row_num = 0
-        worksheet.set_row(row_num, 50)
-        title_format = workbook.add_format()
-        title_format.set_bold()
-        title_format.set_font_size(18)
-        title_format.set_align('vcenter')
-        worksheet.merge_range(row_num, 0, row_num, len(header_src) - 1, str(project) + ' 해지자 리스트', title_format)
-
-        # 2. Pre Header - Date
-        row_num = 1
-        worksheet.set_row(row_num, 18)
-        worksheet.write(row_num, len(header_src) - 1, TODAY + ' 현재', workbook.add_format({'align': 'right'}))
-
-        # 3. Header - 1
-        row_num = 2
-        worksheet.set_row(row_num, 20, workbook.add_format({'bold': True}))
-
-        titles = ['No']  # header titles
-        params = []  # ORM 추출 field
-        widths = [7]  # No. 컬럼 넓이
-
-        for ds in header_src:
-            if ds:
-                titles.append(ds[0])
-                params.append(ds[1])
-                widths.append(ds[2])
-
-        h_format = workbook.add_format()
-        h_format.set_bold()
-        h_format.set_border()
-        h_format.set_align('center')
-        h_format.set_align('vcenter')
-        h_format.set_bg_color('#eeeeee')
-
-        # Adjust the column width.
-        for i, col_width in enumerate(widths):
-            worksheet.set_column(i, i, col_width)
-
-        # Write header - 1
-        for col_num, title in enumerate(titles):
-            if col_num == 5:
-                worksheet.merge_range(row_num, col_num, row_num, col_num + 2, '환불 계좌', h_format)
-            elif col_num in [6, 7]:
-                pass
-            else:
-                worksheet.write(row_num, col_num, title, h_format)
-
-        # Write Header - 2
-        row_num = 3
-        for col_num, title in enumerate(titles):
-            if col_num in [5, 6, 7]:
-                worksheet.write(row_num, col_num, title, h_format)
-            else:
-                worksheet.merge_range(row_num - 1, col_num, row_num, col_num, title, h_format)
-
-        # 4. Body
-        # Get some data to write to the spreadsheet.
-        queryset = ContractorRelease.objects.filter(project=project)
+from .cache import ReportCacheMixin
+from .specs import ExportSpec, Column
+from .utils import StreamingWorkbook, FormatRegistry, iter_values_list, write_merged_cells
 
-        data = queryset.values_list(*params)
+from apiV1.views.cash import CashBookFilterSet, ProjectCashBookFilterSet
+from apiV1.views.contract import ContractFilter
+from cash.models import CashBook, ProjectCashBook
+from company.models import Company, Staff, Department, JobGrade, Position, DutyTitle
+from contract.models import Contract, Succession, ContractorRelease
+from docs.models import LawsuitCase
+from items.utils import UnitGrid
+from payment.models import InstallmentPaymentOrder
+from payment.utils import PaymentIndex, PricingContext, PaymentStatusPivot, OverdueCalculator
+from project.models import Project, Site, SiteOwner, SiteContract
+from project.utils import BudgetExecution
 
-        b_format = workbook.add_format()
-        b_format.set_border()
-        b_format.set_align('center')
-        b_format.set_align('vcenter')
-        b_format.set_num_format('yyyy-mm-dd')
+TODAY = datetime.date.today().strftime('%Y-%m-%d')
 
-        body_format = {
-            'border': True,
-            'valign': 'vcenter',
-            'num_format': 'yyyy-mm-dd'
-        }
 
-        # Turn off some of the warnings:
-        worksheet.ignore_errors({'number_stored_as_text': 'F:G'})
+class ExportContracts(ExportSpec):
+    """계약자 리스트"""
+    queryset = Contract.objects.filter(activation=True, contractor__status='2')
+    ordering = ('contractor__contract_date',)
+
+    filterset_class = ContractFilter
+    filter_params = {'status': 'contractor__status',
+                     'group': 'order_group',
+                     'type': 'unit_type',
+                     'dong': 'keyunit__houseunit__building_unit',
+                     'is_null': 'houseunit__isnull',
+                     'quali': 'contractor__qualification',
+                     'sup': 'is_sup_cont',
+                     'sdate': 'from_contract_date',
+                     'edate': 'to_contract_date'}
+    search_param = 'q'
+    search_fields = ('serial_number', 'contractor__name', 'contractor__note',
+                     'contractor__contractorcontact__cell_phone')
+    order_list = ('-created_at', 'created_at', '-contractor__contract_date',
+                  'contractor__contract_date', '-serial_number',
+                  'serial_number', '-contractor__name', 'contractor__name')  # ?order= 정렬 기준 목록
+    changed_fields = ('updated_at', 'contractor__updated_at',
+                      'contractor__contractoraddress__updated_at', 'contractor__contractorcontact__updated_at')
+
+    filename = '{date}-contracts.xlsx'
+
+    def setup(self, request, *args, **kwargs):
+        super().setup(request, *args, **kwargs)
+        self.t_name = '계약' if request.GET.get('status') == '2' else '청약'
+        self.title = f'{self.t_name}자 리스트'
+        self.sheet_name = f'{self.t_name}목록_정보'
+
+    def get_columns(self, request, scope):
+        cols = sorted(map(int, request.GET.get('col').split('-')))  # 요청된 컬럼 번호 (1-2-3...)
+        paid_index = PaymentIndex(scope) if 13 in cols else None  # 계약 건별 납부 총액 인덱스
+        t_name = self.t_name
+        column_src = [
+            None,
+            Column('일련번호', 'serial_number', 10),
+            Column('등록상태', 'contractor__qualification', 8,
+                   choices=(('1', '일반분양'), ('2', '미인가'), ('3', '인가'), ('4', '부적격'))),
+            Column('차수', 'order_group__order_group_name', 10),
+            Column('타입', 'keyunit__unit_type__name', 7),
+            Column(f'{t_name}자', 'contractor__name', 10),
+            Column('동', 'keyunit__houseunit__building_unit__name', 7),
+            Column('호수', 'keyunit__houseunit__name', 7),
+            Column(f'{t_name}일자', 'contractor__contract_date', 12, kind='date'),
+            Column('건물가', 'contractor__contract__contractprice__price_build', 12, kind='amount'),
+            Column('대지가', 'contractor__contract__contractprice__price_land', 12, kind='amount'),
+            Column('부가세', 'contractor__contract__contractprice__price_tax', 11, kind='amount'),
+            Column('공급가액', 'contractor__contract__contractprice__price', 12, kind='amount'),
+            Column('납입금합계', 'pk', 12, kind='amount', display=paid_index and paid_index.get_paid_sum),
+            Column('회당계약금', 'contractor__contract__contractprice__down_pay', 11, kind='amount'),
+            Column('회당중도금', 'contractor__contract__contractprice__middle_pay', 11, kind='amount'),
+            Column('회당잔금', 'contractor__contract__contractprice__remain_pay', 12, kind='amount'),
+            Column('생년월일', 'contractor__birth_date', 12, kind='date'),
+            Column('연락처[1]', 'contractor__contractorcontact__cell_phone', 14),
+            Column('연락처[2]', 'contractor__contractorcontact__home_phone', 14),
+            Column('연락처[3]', 'contractor__contractorcontact__other_phone', 14),
+            Column('이메일', 'contractor__contractorcontact__email', 15),
+            Column('우편번호', 'contractor__contractoraddress__id_zipcode', 7, group='주소[등본]'),
+            Column('주소', 'contractor__contractoraddress__id_address1', 35, align='left', group='주소[등본]'),
+            Column('상세주소', 'contractor__contractoraddress__id_address2', 20, align='left', group='주소[등본]'),
+            Column('참고항목', 'contractor__contractoraddress__id_address3', 40, align='left', group='주소[등본]'),
+            Column('우편번호', 'contractor__contractoraddress__dm_zipcode', 7, group='주소[우편]'),
+            Column('주소', 'contractor__contractoraddress__dm_address1', 35, align='left', group='주소[우편]'),
+            Column('상세주소', 'contractor__contractoraddress__dm_address2', 20, align='left', group='주소[우편]'),
+            Column('참고항목', 'contractor__contractoraddress__dm_address3', 40, align='left', group='주소[우편]'),
+            Column('비고', 'contractor__note', 45, align='left'),
+        ]
+        return [column_src[n] for n in cols]
 
-        # Write header
-        choice = dict(ContractorRelease.STATUS_CHOICES)
-        for i, row in enumerate(data):
-            row = list(row)
-            row_num += 1
-            row.insert(0, i + 1)
-            for col_num, cell_data in enumerate(row):
-                if col_num == 0:
-                    body_format['num_format'] = '#,##0'
-                else:
-                    body_format['num_format'] = 'yyyy-mm-dd'
-                if col_num == 4:
-                    body_format['num_format'] = 41
-                elif col_num == 10:
-                    body_format['align'] = 'left'
-                else:
-                    body_format['align'] = 'center'
-                if col_num == 3:
-                    cell_data = choice[cell_data]
-                bformat = workbook.add_format(body_format)
-                worksheet.write(row_num, col_num, cell_data, bformat)
+    def filter_queryset(self, request, queryset):
+        queryset = super().filter_queryset(request, queryset)
+        order = request.GET.get('order')
+        return queryset.order_by(self.order_list[int(order)]) if order else queryset
 
-        # Close the workbook before sending the data.
-        workbook.close()
 
-        # Rewind the buffer.
-        output.seek(0)
+class ExportApplicants(ExportSpec):
+    """청약자 리스트"""
+    queryset = Contract.objects.filter(keyunit__contract__isnull=False, contractor__status='1')
+    columns = (
+        Column('일련번호', 'serial_number', 10),
+        Column('차수', 'order_group__order_group_name', 10),
+        Column('타입', 'keyunit__unit_type__name', 7),
+        Column('청약자', 'contractor__name', 10),
+        Column('청약일자', 'contractor__reservation_date', 12, kind='date'),
+        Column('연락처[1]', 'contractor__contractorcontact__cell_phone', 14),
+        Column('연락처[2]', 'contractor__contractorcontact__home_phone', 14),
+        Column('연락처[3]', 'contractor__contractorcontact__other_phone', 14),
+        Column('이메일', 'contractor__contractorcontact__email', 15),
+        Column('비고', 'contractor__note', 45, align='left'),
+    )
+    title = '청약자 리스트'
+    sheet_name = '청약목록_정보'
+    filename = '{date}-applicants.xlsx'
+
+    def get_columns(self, request, scope):
+        columns = super().get_columns(request, scope)
+        if scope.is_unit_set:
+            columns += [Column('동', 'keyunit__houseunit__building_unit__name', 7),
+                        Column('호수', 'keyunit__houseunit__name', 7)]
+        return columns
+
+
+class ExportSuccessions(ExportSpec):
+    """권리의무승계 리스트"""
+    queryset = Succession.objects.all()
+    scope_field = 'contract__project'
+    title = '권리의무승계 목록'
+    sheet_name = '권리의무승계_목록'
+    filename = '{date}-successions.xlsx'
+
+    def get_columns(self, request, scope):
+        return [
+            Column('계약 정보', 'contract__serial_number', 15, display=lambda serial: f'[{scope.pk}] {serial}'),
+            Column('양도계약자', 'contract__contractor__name', 13),
+            Column('양수계약자', 'buyer__name', 13),
+            Column('승계신청일', 'apply_date', 15, kind='date'),
+            Column('매매계약일', 'trading_date', 15, kind='date'),
+            Column('변경인가일', 'approval_date', 15, kind='date'),
+            Column('변경인가여부', 'is_approval', 13, display=lambda approved: '완료' if approved else ''),
+            Column('비고', 'note', 45, align='left'),
+        ]
 
-        # Set up the Http response.
-        filename = '{date}-releases.xlsx'.format(date=TODAY)
-        file_format = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        response = HttpResponse(output, content_type=file_format)
-        response['Content-Disposition'] = 'attachment; filename=%s' % filename
 
-        return response
+class ExportReleases(ExportSpec):
+    """해지자 리스트"""
+    queryset = ContractorRelease.objects.all()
+    columns = (
+        Column('해지자', 'contractor__name', 10),
+        Column('해지일련번호', 'contractor__contract__serial_number', 30),
+        Column('현재상태', 'status', 12, choices=ContractorRelease.STATUS_CHOICES),
+        Column('환불(예정)금액', 'refund_amount', 15, kind='amount'),
+        Column('은행', 'refund_account_bank', 15, group='환불 계좌'),
+        Column('계좌번호', 'refund_account_number', 18, group='환불 계좌'),
+        Column('예금주', 'refund_account_depositor', 12, group='환불 계좌'),
+        Column('해지신청일', 'request_date', 14, kind='date'),
+        Column('환불처리일', 'completion_date', 14, kind='date'),
+        Column('비고', 'note', 45, align='left'),
+    )
+    title = '해지자 리스트'
+    sheet_name = '해지자목록_정보'
+    filename = '{date}-releases.xlsx'
 
 
 class ExportUnitStatus(View):
@@ -701,17 +191,14 @@ class ExportUnitStatus(View):
         # don't allow temp files, for example the Google APP Engine, set the
         # 'in_memory' Workbook() constructor option as shown in the docs.
         workbook = xlsxwriter.Workbook(output)
+        formats = FormatRegistry(workbook)  # 셀 서식 캐시
         worksheet = workbook.add_worksheet('동호수현황표')
 
         worksheet.set_default_row(15)
 
         # data start --------------------------------------------- #
         project = Project.objects.get(pk=request.GET.get('project'))
-        max_floor = HouseUnit.objects.aggregate(Max('floor_no'))
-        floor_no__max = max_floor['floor_no__max'] if max_floor['floor_no__max'] else 1
-        max_floor_range = range(0, floor_no__max)
-        unit_numbers = HouseUnit.objects.filter(building_unit__project=project)
-        dong_obj = BuildingUnit.objects.filter(project=project).values('name')
+        grid = UnitGrid(project)  # 동 x 층 x 라인 호수 배치
         is_contor = True if request.GET.get('iscontor') == 'true' else False
 
         # 1. Title
@@ -725,15 +212,8 @@ class ExportUnitStatus(View):
         worksheet.write(row_num, 0, str(project) + ' 동호수 현황표', title_format)
 
         # 2. Sub Description
-        max_col = 0
         row_num = 1
-
-        for dong in dong_obj:
-            lines = unit_numbers.order_by('bldg_line').values('bldg_line').filter(
-                building_unit__name__contains=dong['name']).distinct()
-            for line in lines:
-                max_col += 1
-            max_col += 1
+        max_col = sum(len(building['lines']) + 1 for building in grid.buildings)
 
         worksheet.write(row_num, max_col, TODAY + ' 현재', workbook.add_format({'align': 'right', 'font_size': '9'}))
 
@@ -753,41 +233,34 @@ class ExportUnitStatus(View):
             'valign': 'vcenter'
         }
         # 최고층수 만큼 반복
-        for mf in max_floor_range:
+        for floor_no in grid.floors:  # 현재 층수
             row_num += 2
-            floor_no = floor_no__max - mf  # 현재 층수
             col_num = 1
             # 동 수 만큼 반복
-            for dong in dong_obj:  # 동호수 표시 라인
-                units = unit_numbers.filter(building_unit__name=dong['name'])
-                lines = unit_numbers.order_by('bldg_line').values('bldg_line').filter(
-                    building_unit__name__contains=dong['name']).distinct()
-                for line in lines:
-                    try:
-                        unit = units.get(floor_no=floor_no, bldg_line=line['bldg_line'])
-                    except ObjectDoesNotExist:
-                        unit = None
+            for building in grid.buildings:  # 동호수 표시 라인
+                for line in building['lines']:
+                    unit = grid.get_unit(building['pk'], floor_no, line)
                     if unit or floor_no <= 2:
-                        unit_format['bg_color'] = unit.unit_type.color if unit else '#BBBBBB'
-                        unit_formats = workbook.add_format(unit_format)
+                        unit_format['bg_color'] = unit['color'] if unit else '#BBBBBB'
+                        unit_formats = formats.get(unit_format)
                         if not unit:
                             worksheet.merge_range(row_num, col_num, row_num + 1, col_num, '', unit_formats)
                         else:
-                            worksheet.write(row_num, col_num, int(unit.name), unit_formats)
-                            if unit.key_unit:
-                                if int(unit.key_unit.contract.contractor.status) % 2 == 0:
+                            worksheet.write(row_num, col_num, int(unit['name']), unit_formats)
+                            if unit['status']:
+                                if int(unit['status']) % 2 == 0:
                                     status_format['bg_color'] = '#DDDDDD'
                                     status_format['font_color'] = 'black'
                                 else:
                                     status_format['bg_color'] = '#FFFF99'
                                     status_format['font_color'] = 'black'
-                            elif unit.is_hold:
+                            elif unit['is_hold']:
                                 status_format['bg_color'] = '#999999'
                                 status_format['font_color'] = 'black'
                             else:
                                 status_format['bg_color'] = 'white'
-                            cont = unit.key_unit.contract.contractor.name if unit.key_unit and is_contor else ''
-                            status_formats = workbook.add_format(status_format)
+                            cont = unit['contractor'] if unit['contractor'] and is_contor else ''
+                            status_formats = formats.get(status_format)
                             worksheet.write(row_num + 1, col_num, cont, status_formats)
                     col_num += 1
                 col_num += 1
@@ -802,325 +275,18 @@ class ExportUnitStatus(View):
         dong_title_format.set_align('center')
         dong_title_format.set_align('vcenter')
         dong_title_format.set_bg_color('#777777')
-        dong_title_format.set_font_color('#FFFFFF')
-
-        # 동 수 만큼 반복
-        for dong in dong_obj:  # 호수 상태 표시 라인
-            lines = unit_numbers.order_by('-bldg_line').values('bldg_line').filter(
-                building_unit__name__contains=dong['name']).distinct()
-            worksheet.merge_range(row_num, col_num, row_num + 1, col_num + lines.count() - 1,
-                                  dong['name'] + '동',
-                                  dong_title_format)
-
-            col_num = col_num + lines.count() + 1
-
-        # data end ----------------------------------------------- #
-
-        # Close the workbook before sending the data.
-        workbook.close()
-
-        # Rewind the buffer.
-        output.seek(0)
-
-        # Set up the Http response.
-        filename = '{date}-unit-status-board.xlsx'.format(date=TODAY)
-        file_format = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        response = HttpResponse(output, content_type=file_format)
-        response['Content-Disposition'] = 'attachment; filename=%s' % filename
-
-        return response
-
-
-def export_payments_xls(request):
-    """수납건별 수납내역 리스트"""
-    response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-    response['Content-Disposition'] = 'attachment; filename={date}-payments.xls'.format(date=TODAY)
-
-    wb = xlwt.Workbook(encoding='utf-8')
-    ws = wb.add_sheet('수납건별_납부내역')  # 시트 이름
-
-    # get_data: ?project=1&sd=2020-12-01&ed=2020-12-02&ipo=4&ba=5&up=on&q=#
-    project = Project.objects.get(pk=request.GET.get('project'))
-    sd = request.GET.get('sd')
-    ed = request.GET.get('ed')
-    og = request.GET.get('og')
-    ut = request.GET.get('ut')
-    ipo = request.GET.get('ipo')
-    ba = request.GET.get('ba')
-    nc = request.GET.get('nc')
-    ni = request.GET.get('ni')
-    q = request.GET.get('q')
-
-    sd = sd if sd else '1900-01-01'
-    ed = TODAY if not ed or ed == 'null' else ed
-    obj_list = ProjectCashBook.objects.filter(project=project,
-                                              income__isnull=False,
-                                              project_account_d3__in=(1, 4),
-                                              deal_date__range=(sd, ed)).order_by('deal_date', 'created_at')
-
-    obj_list = obj_list.filter(contract__order_group=og) if og else obj_list
-    obj_list = obj_list.filter(contract__unit_type=ut) if ut else obj_list
-    obj_list = obj_list.filter(installment_order_id=ipo) if ipo else obj_list
-    obj_list = obj_list.filter(bank_account__id=ba) if ba else obj_list
-    obj_list = obj_list.filter(contract__isnull=True) if nc else obj_list
-    obj_list = obj_list.filter(installment_order__isnull=True, contract__isnull=False) if ni else obj_list
-    obj_list = obj_list = obj_list.filter(
-        Q(contract__contractor__name__icontains=q) |
-        Q(content__icontains=q) |
-        Q(trader__icontains=q) |
-        Q(note__icontains=q)) if q else obj_list
-
-    # Sheet Title, first row
-    row_num = 0
-
-    style = xlwt.XFStyle()
-    style.font.bold = True
-    style.font.height = 300
-    style.alignment.vert = style.alignment.VERT_CENTER  # 수직정렬
-
-    ws.write(row_num, 0, str(project) + ' 계약자 대금 납부내역', style)
-    ws.row(0).height_mismatch = True
-    ws.row(0).height = 38 * 20
-
-    # title_list
-
-    resources = [
-        ['거래일자', 'deal_date'],
-        ['차수', 'contract__order_group__order_group_name'],
-        ['타입', 'contract__keyunit__unit_type__name'],
-        ['일련번호', 'contract__serial_number'],
-        ['계약자', 'contract__contractor__name'],
-        ['입금 금액', 'income'],
-        ['납입회차', 'installment_order__pay_name'],
-        ['수납계좌', 'bank_account__alias_name'],
-        ['입금자', 'trader']
-    ]
-
-    columns = []
-    params = []
-
-    for rsc in resources:
-        columns.append(rsc[0])
-        params.append(rsc[1])
-
-    rows = obj_list.values_list(*params)
-
-    # Sheet header, second row
-    row_num = 1
-
-    style = xlwt.XFStyle()
-    style.font.bold = True
-
-    # 테두리 설정
-    # 가는 실선 : 1, 작은 굵은 실선 : 2,가는 파선 : 3, 중간가는 파선 : 4, 큰 굵은 실선 : 5, 이중선 : 6,가는 점선 : 7
-    # 큰 굵은 점선 : 8,가는 점선 : 9, 굵은 점선 : 10,가는 이중 점선 : 11, 굵은 이중 점선 : 12, 사선 점선 : 13
-    style.borders.left = 1
-    style.borders.right = 1
-    style.borders.top = 1
-    style.borders.bottom = 1
-
-    style.pattern.pattern = xlwt.Pattern.SOLID_PATTERN
-    style.pattern.pattern_fore_colour = xlwt.Style.colour_map['silver_ega']
-
-    style.alignment.vert = style.alignment.VERT_CENTER  # 수직정렬
-    style.alignment.horz = style.alignment.HORZ_CENTER  # 수평정렬
-
-    for col_num in range(len(columns)):
-        ws.write(row_num, col_num, columns[col_num], style)
-
-    # Sheet body, remaining rows
-    style = xlwt.XFStyle()
-    # 테두리 설정
-    style.borders.left = 1
-    style.borders.right = 1
-    style.borders.top = 1
-    style.borders.bottom = 1
-
-    style.alignment.vert = style.alignment.VERT_CENTER  # 수직정렬
-    # style.alignment.horz = style.alignment.HORZ_CENTER  # 수평정렬
-
-    for row in rows:
-        row_num += 1
-        for col_num, col in enumerate(columns):
-            row = list(row)
-
-            if col_num == 0:
-                style.num_format_str = 'yyyy-mm-dd'
-                ws.col(col_num).width = 110 * 30
-
-            if '금액' in col:
-                style.num_format_str = '#,##'
-                style.alignment.horz = style.alignment.HORZ_RIGHT
-                ws.col(col_num).width = 110 * 30
-
-            if col == '차수' or col == '납입회차' or col == '일련번호':
-                ws.col(col_num).width = 110 * 30
-
-            if col == '수납계좌':
-                ws.col(col_num).width = 170 * 30
-
-            if col == '입금자' or col == '계약자':
-                ws.col(col_num).width = 110 * 30
-
-            ws.write(row_num, col_num, row[col_num], style)
-
-    wb.save(response)
-    return response
-
-
-class ExportPayments(View):
-    """수납건별 수납내역 리스트"""
-
-    @staticmethod
-    def get(request):
-
-        # Create an in-memory output file for the new workbook.
-        output = io.BytesIO()
-
-        # Even though the final file will be in memory the module uses temp
-        # files during assembly for efficiency. To avoid this on servers that
-        # don't allow temp files, for example the Google APP Engine, set the
-        # 'in_memory' Workbook() constructor option as shown in the docs.
-        workbook = xlsxwriter.Workbook(output)
-        worksheet = workbook.add_worksheet('수납건별_납부내역')
-
-        worksheet.set_default_row(20)
-
-        project = Project.objects.get(pk=request.GET.get('project'))
-        sd = request.GET.get('sd')
-        ed = request.GET.get('ed')
-        sd = sd if sd else '1900-01-01'
-        ed = TODAY if not ed or ed == 'null' else ed
-
-        # title_list
-        header_src = [
-            ['거래일자', 'deal_date', 12],
-            ['차수', 'contract__order_group__order_group_name', 12],
-            ['타입', 'contract__keyunit__unit_type__name', 10],
-            ['일련번호', 'contract__serial_number', 12],
-            ['계약자', 'contract__contractor__name', 11],
-            ['입금 금액', 'income', 12],
-            ['납입회차', 'installment_order__pay_name', 13],
-            ['수납계좌', 'bank_account__alias_name', 20],
-            ['입금자', 'trader', 20],
-            ['공급계약체결일', 'contract__sup_cont_date', 15],
-        ]
-
-        if project.is_unit_set:
-            header_src.insert(4, ['동', 'contract__keyunit__houseunit__building_unit__name', 7])
-            header_src.insert(5, ['호수', 'contract__keyunit__houseunit__name', 7])
-
-        # 1. Title
-        row_num = 0
-        worksheet.set_row(row_num, 50)
-        title_format = workbook.add_format()
-        title_format.set_bold()
-        title_format.set_font_size(18)
-        title_format.set_align('vcenter')
-        worksheet.merge_range(row_num, 0, row_num, len(header_src) - 1, str(project) + ' 계약자 대금 납부내역', title_format)
-
-        # 2. Pre Header - Date
-        row_num = 1
-        worksheet.set_row(row_num, 18)
-        worksheet.write(row_num, len(header_src) - 1, ed + ' 현재', workbook.add_format({'align': 'right'}))
-
-        # 3. Header - 1
-        row_num = 2
-        worksheet.set_row(row_num, 20, workbook.add_format({'bold': True}))
-
-        titles = []  # header titles
-        params = []  # ORM 추출 field
-        widths = []  # No. 컬럼 넓이
-
-        for ds in header_src:
-            if ds:
-                titles.append(ds[0])
-                params.append(ds[1])
-                widths.append(ds[2])
-
-        h_format = workbook.add_format()
-        h_format.set_bold()
-        h_format.set_border()
-        h_format.set_align('center')
-        h_format.set_align('vcenter')
-        h_format.set_bg_color('#eeeeee')
-
-        # Adjust the column width.
-        for i, col_width in enumerate(widths):
-            worksheet.set_column(i, i, col_width)
-
-        us_cnt = 2 if project.is_unit_set else 0  # 동호 지정 시 추가 열 수 계산
-
-        # Write header - 1
-        for col_num, title in enumerate(titles):
-            if col_num == 5 + us_cnt:
-                worksheet.merge_range(row_num, col_num, row_num, col_num + 2, '건별 수납 정보', h_format)
-            elif col_num in [6 + us_cnt, 7 + us_cnt]:
-                pass
-            else:
-                worksheet.write(row_num, col_num, title, h_format)
-
-        # Write Header - 2
-        row_num = 3
-        for col_num, title in enumerate(titles):
-            if col_num in [5 + us_cnt, 6 + us_cnt, 7 + us_cnt]:
-                worksheet.write(row_num, col_num, title, h_format)
-            else:
-                worksheet.merge_range(row_num - 1, col_num, row_num, col_num, title, h_format)
-
-        # 4. Body
-        # Get some data to write to the spreadsheet.
-        og = request.GET.get('og')
-        ut = request.GET.get('ut')
-        ipo = request.GET.get('ipo')
-        ba = request.GET.get('ba')
-        nc = request.GET.get('nc')
-        ni = request.GET.get('ni')
-        q = request.GET.get('q')
-
-        obj_list = ProjectCashBook.objects.filter(project=project,
-                                                  income__isnull=False,
-                                                  project_account_d3__in=(1, 4),
-                                                  deal_date__range=(sd, ed)).order_by('deal_date', 'created_at')
-
-        obj_list = obj_list.filter(contract__order_group=og) if og else obj_list
-        obj_list = obj_list.filter(contract__unit_type=ut) if ut else obj_list
-        obj_list = obj_list.filter(installment_order_id=ipo) if ipo else obj_list
-        obj_list = obj_list.filter(bank_account__id=ba) if ba else obj_list
-        obj_list = obj_list.filter(contract__isnull=True) if nc else obj_list
-        obj_list = obj_list.filter(installment_order__isnull=True, contract__isnull=False) if ni else obj_list
-        obj_list = obj_list.filter(
-            Q(contract__contractor__name__icontains=q) |
-            Q(content__icontains=q) |
-            Q(trader__icontains=q) |
-            Q(note__icontains=q)) if q else obj_list
-
-        data = obj_list.values_list(*params)
-
-        # Turn off the warnings:
-        worksheet.ignore_errors({'number_stored_as_text': 'C:F'})
-
-        # Default CSS setting
-        body_format = {
-            'border': True,
-            'align': 'center',
-            'valign': 'vcenter',
-            'num_format': 'yyyy-mm-dd'
-        }
-
-        # Write header
-        for i, row in enumerate(data):
-            row_num += 1
-
-            for col_num, cell_data in enumerate(row):
-                if col_num == 0 or col_num == 11:
-                    body_format['num_format'] = 'yyyy-mm-dd'
-                else:
-                    body_format['num_format'] = 41
+        dong_title_format.set_font_color('#FFFFFF')
 
-                bformat = workbook.add_format(body_format)
+        # 동 수 만큼 반복
+        for building in grid.buildings:  # 호수 상태 표시 라인
+            line_count = len(building['lines'])
+            worksheet.merge_range(row_num, col_num, row_num + 1, col_num + line_count - 1,
+                                  building['name'] + '동',
+                                  dong_title_format)
 
-                worksheet.write(row_num, col_num, cell_data, bformat)
+            col_num = col_num + line_count + 1
+
+        # data end ----------------------------------------------- #
 
         # Close the workbook before sending the data.
         workbook.close()
@@ -1129,7 +295,7 @@ class ExportPayments(View):
         output.seek(0)
 
         # Set up the Http response.
-        filename = '{date}-payments.xlsx'.format(date=ed)
+        filename = '{date}-unit-status-board.xlsx'.format(date=TODAY)
         file_format = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
         response = HttpResponse(output, content_type=file_format)
         response['Content-Disposition'] = 'attachment; filename=%s' % filename
@@ -1137,20 +303,73 @@ class ExportPayments(View):
         return response
 
 
-class ExportPaymentsByCont(View):
+class ExportPayments(ExportSpec):
+    """수납건별 수납내역 리스트"""
+    queryset = ProjectCashBook.objects.filter(income__isnull=False,
+                                              project_account_d3__in=(1, 4))
+    numbering = False
+    ordering = ('deal_date', 'created_at')
+
+    filterset_class = ProjectCashBookFilterSet
+    filter_params = {'og': 'contract__order_group',
+                     'ut': 'contract__unit_type',
+                     'ipo': 'installment_order',
+                     'ba': 'bank_account',
+                     'nc': 'no_contract',
+                     'ni': 'no_install'}
+    search_param = 'q'
+    search_fields = ('contract__contractor__name', 'content', 'trader', 'note')
+
+    title = '계약자 대금 납부내역'
+    sheet_name = '수납건별_납부내역'
+    filename = '{date}-payments.xlsx'
+
+    def get_date(self, request):
+        ed = request.GET.get('ed')
+        return TODAY if not ed or ed == 'null' else ed
+
+    def get_columns(self, request, scope):
+        columns = [
+            Column('거래일자', 'deal_date', 12, kind='date'),
+            Column('차수', 'contract__order_group__order_group_name', 12),
+            Column('타입', 'contract__keyunit__unit_type__name', 10),
+            Column('일련번호', 'contract__serial_number', 12),
+            Column('계약자', 'contract__contractor__name', 11),
+            Column('입금 금액', 'income', 12, kind='amount', group='건별 수납 정보'),
+            Column('납입회차', 'installment_order__pay_name', 13, group='건별 수납 정보'),
+            Column('수납계좌', 'bank_account__alias_name', 20, group='건별 수납 정보'),
+            Column('입금자', 'trader', 20),
+            Column('공급계약체결일', 'contract__sup_cont_date', 15, kind='date'),
+        ]
+        if scope.is_unit_set:
+            columns.insert(4, Column('동', 'contract__keyunit__houseunit__building_unit__name', 7))
+            columns.insert(5, Column('호수', 'contract__keyunit__houseunit__name', 7))
+        return columns
+
+    def get_queryset(self, request, scope):
+        sd = request.GET.get('sd')
+        sd = sd if sd else '1900-01-01'
+        return super().get_queryset(request, scope).filter(deal_date__range=(sd, self.get_date(request)))
+
+    def filter_queryset(self, request, queryset):
+        queryset = super().filter_queryset(request, queryset)
+        # 회차 미등록 건은 계약이 등록된 건만 추출
+        return queryset.filter(contract__isnull=False) if request.GET.get('ni') else queryset
+
+
+class ExportPaymentsByCont(ReportCacheMixin, View):
     """계약자별 수납내역 리스트"""
 
+    cache_export = 'paid-by-cont'
+
     @staticmethod
     def get(request):
 
-        # Create an in-memory output file for the new workbook.
-        output = io.BytesIO()
-
-        # Even though the final file will be in memory the module uses temp
-        # files during assembly for efficiency. To avoid this on servers that
-        # don't allow temp files, for example the Google APP Engine, set the
-        # 'in_memory' Workbook() constructor option as shown in the docs.
-        workbook = xlsxwriter.Workbook(output)
+        # Create a constant-memory workbook. Rows are flushed to a temp file
+        # as soon as the next row is started, so the rows must be written in
+        # order and the finished file is streamed back in blocks.
+        workbook = StreamingWorkbook()
+        formats = FormatRegistry(workbook)  # 셀 서식 캐시
         worksheet = workbook.add_worksheet('계약자별_납부내역')
 
         worksheet.set_default_row(20)
@@ -1266,12 +485,14 @@ class ExportPaymentsByCont(View):
 
         sum_col = None  # 기납부총액 컬럼 위치
 
+        header_cells = []  # (first_row, first_col, last_row, last_col, title, format)
+
         for col_num, title in enumerate(titles):  # 헤더 줄 제목 세팅
             if col_num < 7 + is_us_cn or col_num == col_cnt:
-                worksheet.merge_range(row_num, col_num, row_num + 1, col_num, title, h_format)
+                header_cells.append((row_num, col_num, row_num + 1, col_num, title, h_format))
             else:
                 if col_num % 2 == 1:
-                    worksheet.merge_range(row_num, col_num, row_num, col_num + 1, title, h_format)
+                    header_cells.append((row_num, col_num, row_num, col_num + 1, title, h_format))
             if title == '계약일':
                 date_col.append(col_num)
             if title in ('기납부 총액', '미납내역'):
@@ -1279,6 +500,8 @@ class ExportPaymentsByCont(View):
                 if title == '기납부 총액':
                     sum_col = col_num
 
+        write_merged_cells(worksheet, header_cells)
+
         # Line --------------------- 3
         row_num = 4
         worksheet.set_row(row_num, 23)
@@ -1312,17 +535,16 @@ class ExportPaymentsByCont(View):
 
         # ----------------- get_queryset finish ----------------- #
 
-        data = obj_list.values_list(*params)
+        data = iter_values_list(obj_list, *params)
 
         # Write body
         # ----------------------------------------------------------------- #
-        paid_params = ['contract', 'income', 'installment_order', 'deal_date']
-        paid_data = ProjectCashBook.objects.filter(project=project,
-                                                   income__isnull=False,
-                                                   project_account_d3__in=(1, 4),
-                                                   deal_date__lte=date,
-                                                   contract__isnull=False)
-        paid_dict = paid_data.values_list(*paid_params)
+        paid_index = PaymentIndex(project, date)  # 계약 및 회차별 납부 인덱스
+        pricing = PricingContext(project)  # 분양가 산정 정보
+
+        # 계약 건별 차수, 타입, 층별 타입
+        cont_units = {pk: (og, ut, ft) for pk, og, ut, ft in obj_list.values_list(
+            'pk', 'order_group', 'keyunit__unit_type', 'keyunit__houseunit__floor_type')}
 
         # 계약금 분납 횟수
         down_num = due_pay_orders.filter(pay_sort='1').count()
@@ -1334,44 +556,29 @@ class ExportPaymentsByCont(View):
 
             paid_sum = 0  # 기납부 총액
             if sum_col is not None:
-                paid_sum = sum([ps[1] for ps in paid_dict if ps[0] == row[0]])
+                paid_sum = paid_index.get_paid_sum(row[0])
                 row.insert(sum_col, paid_sum)  # 순서 삽입
 
             next_col = sum_col
             due_amt_sum = 0  # 납부 약정액 합계
             unpaid_amt = 0  # 미납액
 
-            contract = Contract.objects.get(serial_number=row[1], contractor__name=row[2])
-            prices = SalesPriceByGT.objects.filter(project_id=project,
-                                                   order_group__order_group_name=row[3],
-                                                   unit_type__name=row[4])
-            try:
-                floor = contract.keyunit.houseunit.floor_type
-                cont_price = prices.get(unit_floor_type=floor).price  # 분양가
-            except ObjectDoesNotExist:
-                cont_price = ProjectIncBudget.objects.get(order_group__order_group_name=row[3],
-                                                          unit_type__name=row[4]).average_price
-            except ProjectIncBudget.DoesNotExsist:
-                price = contract.keyunit.unit_type.average_price
-                cont_price = price if price else 0  # 분양가
+            og_id, ut_id, floor_id = cont_units[row[0]]
+            cont_price = pricing.get_price(og_id, ut_id, floor_id)  # 분양가
 
             for pi, po in enumerate(due_pay_orders):  # 회차별 납입 내역 삽입
-                dates = [p[3] for p in paid_dict if p[0] == row[0] and p[2] == po.pay_code]
-                paid_date = max(dates).strftime('%Y-%m-%d') if dates else None
-                paid_amount = sum([p[1] for p in paid_dict if p[0] == row[0] and p[2] == po.pay_code])
+                paid_amount, paid_date = paid_index.get_order_paid(row[0], po.pk)
+                paid_date = paid_date.strftime('%Y-%m-%d') if paid_date else None
 
                 row.insert(next_col + 1 + pi, paid_date)  # 거래일 정보 삽입
                 row.insert(next_col + 2 + pi, paid_amount)  # 납부 금액 정보 삽입
 
                 # due_amount adding
                 if po.pay_sort == '1':  # 계약금일 때
-                    try:
-                        down_pay = DownPayment.objects.get(
-                            project_id=project,
-                            order_group=contract.order_group,
-                            unit_type=contract.keyunit.unit_type)
-                        due_amt = down_pay.payment_amount
-                    except DownPayment.DoesNotExist:
+                    down_pay = pricing.get_down_pay(og_id, ut_id)
+                    if down_pay is not None:
+                        due_amt = down_pay
+                    else:
                         pn = round(down_num / 2)
                         due_amt = int(cont_price * 0.1 / pn)
                 elif po.pay_sort == '2':  # 중도금일 때
@@ -1396,28 +603,20 @@ class ExportPaymentsByCont(View):
                 elif col_num in digit_col:  # 숫자(금액) 컬럼 일때
                     body_format['num_format'] = 41
 
-                bf = workbook.add_format(body_format)
+                bf = formats.get(body_format)
 
                 worksheet.write(row_num, col_num, cell_data, bf)
 
-        # Close the workbook before sending the data.
-        workbook.close()
-
-        # Rewind the buffer.
-        output.seek(0)
-
-        # Set up the Http response.
+        # Close the workbook and stream the file back.
         filename = f'{date}-payment-by-cont.xlsx'
-        file_format = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        response = HttpResponse(output, content_type=file_format)
-        response['Content-Disposition'] = 'attachment; filename=%s' % filename
-
-        return response
+        return workbook.response(filename)
 
 
-class ExportPaymentStatus(View):
+class ExportPaymentStatus(ReportCacheMixin, View):
     """차수 및 타입별 수납 집계 현황"""
 
+    cache_export = 'paid-status'
+
     @staticmethod
     def get(request):
 
@@ -1429,6 +628,7 @@ class ExportPaymentStatus(View):
         # don't allow temp files, for example the Google APP Engine, set the
         # 'in_memory' Workbook() constructor option as shown in the docs.
         workbook = xlsxwriter.Workbook(output)
+        formats = FormatRegistry(workbook)  # 셀 서식 캐시
         worksheet = workbook.add_worksheet('차수_타입별_수납집계')
 
         worksheet.set_default_row(20)
@@ -1479,24 +679,19 @@ class ExportPaymentStatus(View):
                       ['합계', 'budget', 18]]
 
         titles = []  # 헤더명
-        params = []  # 헤더 컬럼(db)
         widths = []  # 헤더 넓이
 
         for ds in header_src:
             if ds:
                 titles.append(ds[0])
-                params.append(ds[1])
                 widths.append(ds[2])
 
-        while '' in params:
-            params.remove('')
-
         # Adjust the column width.
         for i, col_width in enumerate(widths):  # 각 컬럼 넓이 세팅
             worksheet.set_column(i, i, col_width)
 
         # Write header
-        h1format = workbook.add_format(h_format)
+        h1format = formats.get(h_format)
 
         for col_num, title in enumerate(titles):
             worksheet.write(row_num, col_num, title, h1format)
@@ -1537,64 +732,11 @@ class ExportPaymentStatus(View):
         worksheet.ignore_errors({'number_stored_as_text': 'B:C'})
 
         # ----------------- get_queryset start ----------------- #
-        # Get some data to write to the spreadsheet.
-        obj_list = ProjectIncBudget.objects.filter(project=project).order_by('order_group', 'unit_type')
-
-        og_list = OrderGroup.objects.filter(project=project)
-        og_params = ['pk', 'order_group_name']
-        order_group = og_list.values_list(*og_params)
-
-        ut_list = UnitType.objects.filter(project=project)
-        ut_params = ['pk', 'name', 'color']
-        unit_type = ut_list.values_list(*ut_params)
-
-        cont_num_list = Contract.objects.filter(project=project,
-                                                contractor__contract_date__lte=date,
-                                                activation=True,
-                                                contractor__status=2) \
-            .values('order_group', 'unit_type') \
-            .annotate(conts_num=Count('order_group')) \
-            .annotate(price_sum=Sum('contractprice__price'))
-
-        paid_sum_list = ProjectCashBook.objects.filter(project=project,
-                                                       income__isnull=False,
-                                                       project_account_d3__in=(1, 4),
-                                                       contract__activation=True,
-                                                       contract__contractor__status=2,
-                                                       deal_date__lte=date) \
-            .order_by('contract__order_group', 'contract__unit_type') \
-            .annotate(order_group=F('contract__order_group')) \
-            .annotate(unit_type=F('contract__unit_type')) \
-            .values('order_group', 'unit_type') \
-            .annotate(paid_sum=Sum('income'))
-
+        pivot = PaymentStatusPivot(project, date)  # 차수 x 타입별 예산, 계약, 수납 집계
         # ----------------- get_queryset finish ----------------- #
 
-        rows = obj_list.values_list(*params)
-
-        def get_obj_name(pk, obj):
-            return [o for o in obj if o[0] == pk][0][1]
-
-        def get_og_num(og):
-            return len([o for o in rows if o[0] == og])
-
-        def get_cont_num(og, ut):
-            num = [o for o in cont_num_list if o.get('order_group') == og and o.get('unit_type') == ut]
-            return num[0].get('conts_num') if num else 0
-
-        def get_price_sum(og, ut):
-            sum = [o for o in cont_num_list if o.get('order_group') == og and o.get('unit_type') == ut]
-            return sum[0].get('price_sum') if sum else 0
-
-        def get_paid_sum(og, ut):
-            sum = [o for o in paid_sum_list if o.get('order_group') == og and o.get('unit_type') == ut]
-            return sum[0].get('paid_sum') if sum else 0
-
-        first_type = unit_type.first()[0]
-        total_cont_sum = 0  # 계약 금액 총 합계
-
         # Write data
-        for row in rows:
+        for row in pivot.rows:
             row_num += 1
 
             for col_num, title in enumerate(titles):
@@ -1604,43 +746,36 @@ class ExportPaymentStatus(View):
                 else:
                     body_format['num_format'] = 41
 
-                bformat = workbook.add_format(body_format)
-
-                type_num = get_og_num(row[0]) - 1
-                og_name = get_obj_name(row[0], order_group)
-                ut_name = get_obj_name(row[1], unit_type)
-
-                cont_num = get_cont_num(row[0], row[1])
-                cont_sum = get_price_sum(row[0], row[1])  # cont_num * row[2] ## 계약세대수 * 단가평균
-                paid_sum = get_paid_sum(row[0], row[1])
+                bformat = formats.get(body_format)
 
-                if col_num == 0 and first_type == row[1]:
-                    worksheet.merge_range(row_num, col_num, row_num + type_num, col_num, og_name, bformat)  # 차수명
+                if col_num == 0 and row['og_span'] > 1:
+                    worksheet.merge_range(row_num, col_num, row_num + row['og_span'] - 1, col_num,
+                                          row['og_name'], bformat)  # 차수명
+                elif col_num == 0 and row['og_span'] == 1:
+                    worksheet.write(row_num, col_num, row['og_name'], bformat)  # 차수명
                 elif col_num == 1:
-                    worksheet.write(row_num, col_num, ut_name, bformat)  # 타입 명
-                elif col_num == 2 or col_num == 3:
-                    worksheet.write(row_num, col_num, row[col_num], bformat)  # 단가 - 계획 세대수
+                    worksheet.write(row_num, col_num, row['ut_name'], bformat)  # 타입 명
+                elif col_num == 2:
+                    worksheet.write(row_num, col_num, row['average_price'], bformat)  # 단가
+                elif col_num == 3:
+                    worksheet.write(row_num, col_num, row['quantity'], bformat)  # 계획 세대수
                 elif col_num == 4:
-                    worksheet.write(row_num, col_num, cont_num, bformat)  # 계약 세대수
+                    worksheet.write(row_num, col_num, row['conts_num'], bformat)  # 계약 세대수
                 elif col_num == 5:
-                    total_cont_sum += cont_sum
-                    worksheet.write(row_num, col_num, cont_sum, bformat)  # 계약 금액
+                    worksheet.write(row_num, col_num, row['price_sum'], bformat)  # 계약 금액
                 elif col_num == 6:
-                    worksheet.write(row_num, col_num, paid_sum, bformat)  # 실수납 금액
+                    worksheet.write(row_num, col_num, row['paid_sum'], bformat)  # 실수납 금액
                 elif col_num == 7:
-                    worksheet.write(row_num, col_num, cont_sum - paid_sum, bformat)  # 미수 금액
+                    worksheet.write(row_num, col_num, row['unpaid_sum'], bformat)  # 미수 금액
                 elif col_num == 8:
-                    worksheet.write(row_num, col_num, row[4] - cont_sum, bformat)  # 미계약 금액
+                    worksheet.write(row_num, col_num, row['non_cont_sum'], bformat)  # 미계약 금액
                 elif col_num == 9:
-                    worksheet.write(row_num, col_num, row[4], bformat)  # 합계
+                    worksheet.write(row_num, col_num, row['budget'], bformat)  # 합계
 
         row_num += 1
         worksheet.set_row(row_num, 23)
 
-        total_num = sum([n[3] for n in rows])
-        total_cont_num = sum([n.get('conts_num') for n in cont_num_list])
-        total_paid_sum = sum([s.get('paid_sum') for s in paid_sum_list])
-        total_budget = sum([n[4] for n in rows])
+        totals = pivot.get_totals()
 
         for col_num, col in enumerate(titles):
             # css 정렬
@@ -1649,26 +784,26 @@ class ExportPaymentStatus(View):
             else:
                 h_format['num_format'] = 41
 
-            h2format = workbook.add_format(h_format)
+            h2format = formats.get(h_format)
 
             if col_num == 0:
                 worksheet.merge_range(row_num, col_num, row_num, col_num + 1, '합계', h2format)
             elif col_num == 2:
                 worksheet.write(row_num, col_num, None, h2format)
             elif col_num == 3:
-                worksheet.write(row_num, col_num, total_num, h2format)  # 계획 세대수 합계
+                worksheet.write(row_num, col_num, totals['quantity'], h2format)  # 계획 세대수 합계
             elif col_num == 4:
-                worksheet.write(row_num, col_num, total_cont_num, h2format)  # 계약 세대수 합계
+                worksheet.write(row_num, col_num, totals['conts_num'], h2format)  # 계약 세대수 합계
             elif col_num == 5:
-                worksheet.write(row_num, col_num, total_cont_sum, h2format)  # 계약 금액 합계
+                worksheet.write(row_num, col_num, totals['price_sum'], h2format)  # 계약 금액 합계
             elif col_num == 6:
-                worksheet.write(row_num, col_num, total_paid_sum, h2format)  # 실수납 금액 합계
+                worksheet.write(row_num, col_num, totals['paid_sum'], h2format)  # 실수납 금액 합계
             elif col_num == 7:
-                worksheet.write(row_num, col_num, total_cont_sum - total_paid_sum, h2format)  # 미수 금액 합계
+                worksheet.write(row_num, col_num, totals['unpaid_sum'], h2format)  # 미수 금액 합계
             elif col_num == 8:
-                worksheet.write(row_num, col_num, total_budget - total_cont_sum, h2format)  # 미계약 금액 합계
+                worksheet.write(row_num, col_num, totals['non_cont_sum'], h2format)  # 미계약 금액 합계
             elif col_num == 9:
-                worksheet.write(row_num, col_num, total_budget, h2format)  # 예산 합계
+                worksheet.write(row_num, col_num, totals['budget'], h2format)  # 예산 합계
 
         # Close the workbook before sending the data.
         workbook.close()
@@ -1685,9 +820,105 @@ class ExportPaymentStatus(View):
         return response
 
 
-class ExportProjectBalance(View):
+class ExportOverdueStatus(View):
+    """계약자별 연체/선납 현황"""
+
+    @staticmethod
+    def get(request):
+
+        # Create a constant-memory workbook. Rows are flushed to a temp file
+        # as soon as the next row is started, so the rows must be written in
+        # order and the finished file is streamed back in blocks.
+        workbook = StreamingWorkbook()
+        formats = FormatRegistry(workbook)  # 셀 서식 캐시
+        worksheet = workbook.add_worksheet('계약자별_연체현황')
+
+        worksheet.set_default_row(20)
+
+        # ----------------- get_queryset start ----------------- #
+        project = Project.objects.get(pk=request.GET.get('project'))
+        date = request.GET.get('date')
+        date = TODAY if not date or date == 'null' else date
+        calculator = OverdueCalculator(project, datetime.datetime.strptime(date, '%Y-%m-%d').date())
+        # ----------------- get_queryset finish ----------------- #
+
+        # title_list
+        header_src = [
+            ['번호', '', 7],
+            ['계약번호', 'serial_number', 12],
+            ['차수', 'order_group', 12],
+            ['타입', 'unit_type', 10],
+            ['계약자', 'contractor', 12],
+            ['계약일', 'contract_date', 12],
+            ['약정금 누계', 'due_sum', 16],
+            ['납부 누계', 'paid_sum', 16],
+            ['미납금', 'unpaid_sum', 15],
+            ['연체일수', 'overdue_days', 10],
+            ['지연 가산금', 'penalty', 14],
+            ['선납 할인금', 'discount', 14],
+            ['가산금 합계', 'late_fee', 14],
+        ]
+        col_cnt = len(header_src) - 1
+        amount_col = 6  # 금액 컬럼 시작
+
+        # 1. Title
+        row_num = 0
+        worksheet.set_row(row_num, 50)
+        title_format = formats.get({'bold': True, 'font_size': 18, 'valign': 'vcenter'})
+        worksheet.merge_range(row_num, 0, row_num, col_cnt, str(project) + ' 계약자별 연체/선납 현황', title_format)
+
+        # 2. Pre Header - Date
+        row_num = 1
+        worksheet.set_row(row_num, 18)
+        worksheet.write(row_num, col_cnt, date + ' 현재', formats.get({'align': 'right'}))
+
+        # 3. Header
+        row_num = 2
+        worksheet.set_row(row_num, 25)
+        h_format = formats.get({'bold': True, 'border': True, 'align': 'center', 'valign': 'vcenter',
+                                'bg_color': '#eeeeee'})
+
+        for col_num, (title, _, width) in enumerate(header_src):
+            worksheet.set_column(col_num, col_num, width)
+            worksheet.write(row_num, col_num, title, h_format)
+
+        # 4. Body
+        body_format = {'border': True, 'valign': 'vcenter'}
+        center_format = formats.get(dict(body_format, align='center'))
+        date_format = formats.get(dict(body_format, align='center', num_format='yyyy-mm-dd'))
+        number_format = formats.get(dict(body_format, num_format=41))
+
+        for i, row in enumerate(calculator.rows):
+            row_num += 1
+            worksheet.write(row_num, 0, i + 1, center_format)
+            for col_num, (_, field, _) in enumerate(header_src[1:], start=1):
+                if field == 'contract_date':
+                    worksheet.write_datetime(row_num, col_num, row[field], date_format)
+                elif col_num >= amount_col:
+                    worksheet.write(row_num, col_num, row[field], number_format)
+                else:
+                    worksheet.write(row_num, col_num, row[field], center_format)
+
+        # 5. Sum row
+        row_num += 1
+        totals = calculator.get_totals()
+        sum_format = formats.get(dict(body_format, bold=True, bg_color='#eeeeee', num_format=41))
+        worksheet.merge_range(row_num, 0, row_num, amount_col - 1, '합계', formats.get(
+            dict(body_format, bold=True, bg_color='#eeeeee', align='center')))
+        for col_num, (_, field, _) in enumerate(header_src[amount_col:], start=amount_col):
+            value = f'{totals["overdue_num"]}건' if field == 'overdue_days' else totals[field]
+            worksheet.write(row_num, col_num, value, sum_format)
+
+        # Close the workbook and stream the file back.
+        filename = f'{date}-overdue-status.xlsx'
+        return workbook.response(filename)
+
+
+class ExportProjectBalance(ReportCacheMixin, View):
     """프로젝트 계좌별 잔고 내역"""
 
+    cache_export = 'p-balance'
+
     @staticmethod
     def get(request):
         # Create an in-memory output file for the new workbook.
@@ -2024,53 +1255,26 @@ class ExportBudgetExecutionStatus(View):
         b_format.set_num_format(41)
         b_format.set_align('left')
 
-        budgets = ProjectOutBudget.objects.filter(project=project)
-        budget_sum = budgets.aggregate(Sum('budget'))['budget__sum']
-        revised_budget_sum = budgets.aggregate(
-            revised_budget_sum=Sum(
-                Case(
-                    When(revised_budget__isnull=True, then=F('budget')),
-                    When(revised_budget=0, then=F('budget')),
-                    default=F('revised_budget'),
-                    output_field=PositiveBigIntegerField()  # budget 및 revised_budget의 필드 타입에 맞게 조정
-                )
-            )
-        )['revised_budget_sum']
-
-        calc_budget_sum = revised_budget_sum if is_revised else budget_sum
-
-        budget_month_sum = 0
-        budget_total_sum = 0
-
-        for row, budget in enumerate(budgets):
-            row_num += 1
-            co_budget = ProjectCashBook.objects.filter(project=project,
-                                                       project_account_d3=budget.account_d3,
-                                                       deal_date__lte=date)
-
-            co_budget_month = co_budget.filter(deal_date__gte=date[:8] + '01').aggregate(Sum('outlay'))['outlay__sum']
-            co_budget_month = co_budget_month if co_budget_month else 0
-            budget_month_sum += co_budget_month
+        execution = BudgetExecution(project, date, is_revised)  # 예산 항목별 집행 금액
+        budget_count = len(execution.rows)
 
-            calc_budget = budget.revised_budget or budget.budget if is_revised else budget.budget
-            co_budget_total = co_budget.aggregate(Sum('outlay'))['outlay__sum']
-            co_budget_total = co_budget_total if co_budget_total else 0
-            budget_total_sum += co_budget_total
-
-            opt_budgets = self.get_sub_title(project, budget.account_opt, budget.account_d2.pk)
+        for row, data in enumerate(execution.rows):
+            row_num += 1
+            budget = data['budget']
+            opt_d3s = execution.get_opt_d3s(budget)
 
             for col in range(9):
                 if col == 0 and row == 0:
-                    worksheet.merge_range(row_num, col, budgets.count() + 2, col, '사업비', b_format)
+                    worksheet.merge_range(row_num, col, budget_count + 2, col, '사업비', b_format)
                 if col == 1:
                     if int(budget.account_d3.code) == int(budget.account_d2.code) + 1:
                         worksheet.merge_range(row_num, col,
-                                              row_num + budget.account_d2.projectoutbudget_set.count() - 1,
+                                              row_num + execution.d2_counts[budget.account_d2_id] - 1,
                                               col, budget.account_d2.name, b_format)
                 if col == 2:
                     if budget.account_opt:
-                        if budget.account_d3.pk == opt_budgets[0][4]:
-                            worksheet.merge_range(row_num, col, row_num + len(opt_budgets) - 1,
+                        if budget.account_d3_id == opt_d3s[0]:
+                            worksheet.merge_range(row_num, col, row_num + len(opt_d3s) - 1,
                                                   col, budget.account_opt, b_format)
                     else:
                         worksheet.merge_range(row_num, col, row_num, col + 1, budget.account_d3.name, b_format)
@@ -2078,24 +1282,25 @@ class ExportBudgetExecutionStatus(View):
                     if budget.account_opt:
                         worksheet.write(row_num, col, budget.account_d3.name, b_format)
                 if col == 4:
-                    worksheet.write(row_num, col, calc_budget, b_format)
+                    worksheet.write(row_num, col, data['calc_budget'], b_format)
                 if col == 5:
-                    worksheet.write(row_num, col, co_budget_total - co_budget_month, b_format)
+                    worksheet.write(row_num, col, data['prev_sum'], b_format)
                 if col == 6:
-                    worksheet.write(row_num, col, co_budget_month, b_format)
+                    worksheet.write(row_num, col, data['month_sum'], b_format)
                 if col == 7:
-                    worksheet.write(row_num, col, co_budget_total, b_format)
+                    worksheet.write(row_num, col, data['all_sum'], b_format)
                 if col == 8:
-                    worksheet.write(row_num, col, calc_budget - co_budget_total, b_format)
+                    worksheet.write(row_num, col, data['available'], b_format)
 
         # 5. Sum row
+        totals = execution.get_totals()
         row_num += 1
         worksheet.merge_range(row_num, 0, row_num, 3, '합 계', b_format)
-        worksheet.write(row_num, 4, calc_budget_sum, b_format)
-        worksheet.write(row_num, 5, budget_total_sum - budget_month_sum, b_format)
-        worksheet.write(row_num, 6, budget_month_sum, b_format)
-        worksheet.write(row_num, 7, budget_total_sum, b_format)
-        worksheet.write(row_num, 8, calc_budget_sum - budget_total_sum, b_format)
+        worksheet.write(row_num, 4, totals['calc_budget'], b_format)
+        worksheet.write(row_num, 5, totals['prev_sum'], b_format)
+        worksheet.write(row_num, 6, totals['month_sum'], b_format)
+        worksheet.write(row_num, 7, totals['all_sum'], b_format)
+        worksheet.write(row_num, 8, totals['available'], b_format)
 
         # data end ----------------------------------------------- #
 
@@ -2113,158 +1318,53 @@ class ExportBudgetExecutionStatus(View):
 
         return response
 
-    @staticmethod
-    def get_sub_title(project, sub, d2):
-        return ProjectOutBudget.objects.filter(project=project, account_opt=sub, account_d2__id=d2).order_by(
-            'account_d3').values_list()
-
 
-def export_project_cash_xls(request):
+class ExportProjectCash(ExportSpec):
     """프로젝트별 입출금 내역"""
-    sdate = request.GET.get('sdate')
-    edate = request.GET.get('edate')
-
-    sdate = '1900-01-01' if not sdate or sdate == 'null' else sdate
-    edate = TODAY if not edate or edate == 'null' else edate
-
-    is_imp = request.GET.get('imp')
-    filename = 'imprest' if is_imp == '1' else 'cashbook'
-
-    response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-    response['Content-Disposition'] = f'attachment; filename={edate}-project-{filename}.xls'
-
-    wb = xlwt.Workbook(encoding='utf-8')
-    ws = wb.add_sheet('프로젝트_입출금_내역')  # 시트 이름
-
-    # get_data: ?project=1&sdate=2020-12-01&edate=2020-12-31&sort=1&d1=1&d2=1&bank_acc=5&q=ㅁ
-    project = Project.objects.get(pk=request.GET.get('project'))
-    sort = request.GET.get('sort')
-    d1 = request.GET.get('d1')
-    d2 = request.GET.get('d2')
-    bank_acc = request.GET.get('bank_acc')
-    q = request.GET.get('q')
-
-    cash_list = ProjectCashBook.objects.filter(project=project,
-                                               is_separate=False,
-                                               deal_date__range=(sdate, edate)) \
-        .order_by('deal_date', 'created_at')
-
-    imp_list = ProjectCashBook.objects.filter(project=project, is_imprest=True, is_separate=False,
-                                              deal_date__range=(sdate, edate)).exclude(project_account_d3=63,
-                                                                                       income__isnull=True)
-    obj_list = imp_list if is_imp == '1' else cash_list
-    obj_list = obj_list.filter(sort_id=sort) if sort else obj_list
-    obj_list = obj_list.filter(project_account_d2_id=d1) if d1 else obj_list
-    obj_list = obj_list.filter(project_account_d3_id=d2) if d2 else obj_list
-    obj_list = obj_list.filter(bank_account_id=bank_acc) if bank_acc else obj_list
-    obj_list = obj_list.filter(
-        Q(contract__contractor__name__icontains=q) |
-        Q(content__icontains=q) |
-        Q(trader__icontains=q) |
-        Q(note__icontains=q)) if q else obj_list
-
-    # Sheet Title, first row
-    row_num = 0
-
-    style = xlwt.XFStyle()
-    style.font.bold = True
-    style.font.height = 300
-    style.alignment.vert = style.alignment.VERT_CENTER  # 수직정렬
-
-    ws.write(row_num, 0, str(project) + ' 입출금 내역', style)
-    ws.row(0).height_mismatch = True
-    ws.row(0).height = 38 * 20
-
-    # title_list
-
-    resources = [
-        ['거래일자', 'deal_date'],
-        ['구분', 'sort__name'],
-        ['현장 계정', 'project_account_d2__name'],
-        ['현장 세부계정', 'project_account_d3__name'],
-        ['적요', 'content'],
-        ['거래처', 'trader'],
-        ['거래 계좌', 'bank_account__alias_name'],
-        ['입금 금액', 'income'],
-        ['출금 금액', 'outlay'],
-        ['비고', 'note']]
-
-    columns = []
-    params = []
-
-    for rsc in resources:
-        columns.append(rsc[0])
-        params.append(rsc[1])
-
-    rows = obj_list.values_list(*params)
-
-    # Sheet header, second row
-    row_num = 1
-
-    style = xlwt.XFStyle()
-    style.font.bold = True
-
-    # 테두리 설정
-    # 가는 실선 : 1, 작은 굵은 실선 : 2,가는 파선 : 3, 중간가는 파선 : 4, 큰 굵은 실선 : 5, 이중선 : 6,가는 점선 : 7
-    # 큰 굵은 점선 : 8,가는 점선 : 9, 굵은 점선 : 10,가는 이중 점선 : 11, 굵은 이중 점선 : 12, 사선 점선 : 13
-    style.borders.left = 1
-    style.borders.right = 1
-    style.borders.top = 1
-    style.borders.bottom = 1
-
-    style.pattern.pattern = xlwt.Pattern.SOLID_PATTERN
-    style.pattern.pattern_fore_colour = xlwt.Style.colour_map['silver_ega']
-
-    style.alignment.vert = style.alignment.VERT_CENTER  # 수직정렬
-    style.alignment.horz = style.alignment.HORZ_CENTER  # 수평정렬
-
-    for col_num, col in enumerate(columns):
-        ws.write(row_num, col_num, col, style)
-
-    # Sheet body, remaining rows
-    style = xlwt.XFStyle()
-    # 테두리 설정
-    style.borders.left = 1
-    style.borders.right = 1
-    style.borders.top = 1
-    style.borders.bottom = 1
-
-    style.alignment.vert = style.alignment.VERT_CENTER  # 수직정렬
-    # style.alignment.horz = style.alignment.HORZ_CENTER  # 수평정렬
-
-    for row in rows:
-        row_num += 1
-        for col_num, col in enumerate(columns):
-            row = list(row)
+    queryset = ProjectCashBook.objects.filter(is_separate=False)
+    numbering = False
+    ordering = ('deal_date', 'created_at')
+
+    filterset_class = ProjectCashBookFilterSet
+    filter_params = {'sort': 'sort',
+                     'd1': 'project_account_d2',
+                     'd2': 'project_account_d3',
+                     'bank_acc': 'bank_account'}
+    search_param = 'q'
+    search_fields = ('contract__contractor__name', 'content', 'trader', 'note')
+    changed_fields = ('updated_at',)
+
+    columns = (
+        Column('거래일자', 'deal_date', 13, kind='date'),
+        Column('구분', 'sort__name', 8),
+        Column('현장 계정', 'project_account_d2__name', 13),
+        Column('현장 세부계정', 'project_account_d3__name', 19),
+        Column('적요', 'content', 21, align='left'),
+        Column('거래처', 'trader', 21, align='left'),
+        Column('거래 계좌', 'bank_account__alias_name', 20),
+        Column('입금 금액', 'income', 13, kind='amount'),
+        Column('출금 금액', 'outlay', 13, kind='amount'),
+        Column('비고', 'note', 30, align='left'),
+    )
+
+    title = '입출금 내역'
+    sheet_name = '프로젝트_입출금_내역'
+
+    def get_date(self, request):
+        edate = request.GET.get('edate')
+        return TODAY if not edate or edate == 'null' else edate
+
+    def get_filename(self, request, date):
+        filename = 'imprest' if request.GET.get('imp') == '1' else 'cashbook'
+        return f'{date}-project-{filename}.xlsx'
 
-            if col == '거래일자':
-                style.num_format_str = 'yyyy-mm-dd'
-                ws.col(col_num).width = 110 * 30
-            if col == '구분':
-                if row[col_num] == '1':
-                    row[col_num] = '입금'
-                if row[col_num] == '2':
-                    row[col_num] = '출금'
-                if row[col_num] == '3':
-                    row[col_num] = '대체'
-            if col == '현장 계정':
-                ws.col(col_num).width = 110 * 30
-            if col == '현장 세부계정':
-                ws.col(col_num).width = 160 * 30
-            if col == '적요' or col == '거래처':
-                ws.col(col_num).width = 180 * 30
-            if col == '거래 계좌':
-                ws.col(col_num).width = 170 * 30
-            if '금액' in col:
-                style.num_format_str = '#,##'
-                ws.col(col_num).width = 110 * 30
-            if col == '비고':
-                ws.col(col_num).width = 256 * 30
-
-            ws.write(row_num, col_num, row[col_num], style)
-
-    wb.save(response)
-    return response
+    def get_queryset(self, request, scope):
+        sdate = request.GET.get('sdate')
+        sdate = '1900-01-01' if not sdate or sdate == 'null' else sdate
+        queryset = super().get_queryset(request, scope).filter(deal_date__range=(sdate, self.get_date(request)))
+        if request.GET.get('imp') == '1':
+            return queryset.filter(is_imprest=True).exclude(project_account_d3=63, income__isnull=True)
+        return queryset
 
 
 class ExportSites(View):
@@ -2280,6 +1380,7 @@ class ExportSites(View):
         # don't allow temp files, for example the Google APP Engine, set the
         # 'in_memory' Workbook() constructor option as shown in the docs.
         workbook = xlsxwriter.Workbook(output)
+        formats = FormatRegistry(workbook)  # 셀 서식 캐시
         worksheet = workbook.add_worksheet('지번별_토지목록')
 
         worksheet.set_default_row(20)  # 기본 행 높이
@@ -2412,7 +1513,7 @@ class ExportSites(View):
                 else:
                     body_format['num_format'] = '#,##0'
 
-                bf = workbook.add_format(body_format)
+                bf = formats.get(body_format)
 
                 if col_num < 5:
                     worksheet.write(row_num, col_num, row[col_num], bf)
@@ -2495,6 +1596,7 @@ class ExportSitesByOwner(View):
         # don't allow temp files, for example the Google APP Engine, set the
         # 'in_memory' Workbook() constructor option as shown in the docs.
         workbook = xlsxwriter.Workbook(output)
+        formats = FormatRegistry(workbook)  # 셀 서식 캐시
         worksheet = workbook.add_worksheet('소유자별_토지목록')
 
         worksheet.set_default_row(20)  # 기본 행 높이
@@ -2619,7 +1721,7 @@ class ExportSitesByOwner(View):
                 if col_num in (5, 6, 7):
                     body_format['num_format'] = 43
 
-                bf = workbook.add_format(body_format)
+                bf = formats.get(body_format)
 
                 if col_num == 0:
                     worksheet.write(row_num, col_num, self.get_sort(row[col_num]), bf)
@@ -2688,6 +1790,7 @@ class ExportSitesContracts(View):
         # don't allow temp files, for example the Google APP Engine, set the
         # 'in_memory' Workbook() constructor option as shown in the docs.
         workbook = xlsxwriter.Workbook(output)
+        formats = FormatRegistry(workbook)  # 셀 서식 캐시
         worksheet = workbook.add_worksheet('사업부지_계약현황')
 
         worksheet.set_default_row(20)  # 기본 행 높이
@@ -2813,7 +1916,7 @@ class ExportSitesContracts(View):
                     body_format['num_format'] = 43
                 else:
                     body_format['num_format'] = 41
-                bf = workbook.add_format(body_format)
+                bf = formats.get(body_format)
 
                 if col_num == 0:
                     worksheet.write(row_num, col_num, self.get_sort(row[col_num]), bf)
@@ -3168,181 +2271,52 @@ class ExportDateCashbook(View):
         return response
 
 
-def export_cashbook_xls(request):
+class ExportCashBook(ExportSpec):
     """본사 입출금 내역"""
-    response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-    response['Content-Disposition'] = 'attachment; filename={date}-cashbook.xls'.format(date=TODAY)
-
-    wb = xlwt.Workbook(encoding='utf-8')
-    ws = wb.add_sheet('본사_입출금_내역')  # 시트 이름
-
-    # get_data: ?s_date=2018-06-30&e_date=&category1=&category2=&bank_account=&search_word=
-    s_date = request.GET.get('s_date')
-    e_date = request.GET.get('e_date')
-    sort = request.GET.get('sort')
-    account_d1 = request.GET.get('account_d1')
-    account_d2 = request.GET.get('account_d2')
-    account_d3 = request.GET.get('account_d3')
-    bank_account = request.GET.get('bank_account')
-    search_word = request.GET.get('search_word')
-
-    company = Company.objects.get(pk=request.GET.get('company'))
-    com_name = company.name.replace('주식회사 ', '(주)')
-    sd = '1900-01-01' if not s_date or s_date == 'null' else s_date
-    ed = TODAY if not e_date or e_date == 'null' else e_date
-
-    obj_list = CashBook.objects.filter(company=company, is_separate=False,
-                                       deal_date__range=(sd, ed)).order_by('deal_date', 'id')
-
-    obj_list = obj_list.filter(sort_id=sort) if sort else obj_list
-    obj_list = obj_list.filter(account_d1_id=account_d1) if account_d1 else obj_list
-    obj_list = obj_list.filter(account_d2_id=account_d2) if account_d2 else obj_list
-    obj_list = obj_list.filter(account_d3_id=account_d3) if account_d3 else obj_list
-    obj_list = obj_list.filter(bank_account_id=bank_account) if bank_account else obj_list
-    obj_list = obj_list.filter(
-        Q(content__icontains=search_word) |
-        Q(trader__icontains=search_word) |
-        Q(note__icontains=search_word)) if search_word else obj_list
-
-    # Sheet Title, first row
-    row_num = 0
-
-    style = xlwt.XFStyle()
-    style.font.bold = True
-    style.font.height = 300
-    style.alignment.vert = style.alignment.VERT_CENTER  # 수직정렬
-
-    ws.write(row_num, 0, com_name + ' 입출금 내역', style)
-    ws.row(0).height_mismatch = True
-    ws.row(0).height = 38 * 20
-
-    # title_list
-
-    resources = [
-        ['거래일자', 'deal_date'],
-        ['구분', 'sort__name'],
-        ['계정', 'account_d1__name'],
-        ['중분류', 'account_d2__name'],
-        ['세부계정', 'account_d3__name'],
-        ['적요', 'content'],
-        ['거래처', 'trader'],
-        ['거래계좌', 'bank_account__alias_name'],
-        ['입금금액', 'income'],
-        ['출금금액', 'outlay'],
-        ['비고', 'note']]
-
-    columns = []
-    params = []
-
-    for rsc in resources:
-        columns.append(rsc[0])
-        params.append(rsc[1])
-
-    rows = obj_list.values_list(*params)
-
-    # Sheet header, second row
-    row_num = 1
-
-    style = xlwt.XFStyle()
-    style.font.bold = True
-
-    # 테두리 설정
-    # 가는 실선 : 1, 작은 굵은 실선 : 2,가는 파선 : 3, 중간가는 파선 : 4, 큰 굵은 실선 : 5, 이중선 : 6,가는 점선 : 7
-    # 큰 굵은 점선 : 8,가는 점선 : 9, 굵은 점선 : 10,가는 이중 점선 : 11, 굵은 이중 점선 : 12, 사선 점선 : 13
-    style.borders.left = 1
-    style.borders.right = 1
-    style.borders.top = 1
-    style.borders.bottom = 1
-
-    style.pattern.pattern = xlwt.Pattern.SOLID_PATTERN
-    style.pattern.pattern_fore_colour = xlwt.Style.colour_map['silver_ega']
-
-    style.alignment.vert = style.alignment.VERT_CENTER  # 수직정렬
-    style.alignment.horz = style.alignment.HORZ_CENTER  # 수평정렬
-
-    for col_num in range(len(columns)):
-        ws.write(row_num, col_num, columns[col_num], style)
-
-    # Sheet body, remaining rows
-    style = xlwt.XFStyle()
-    # 테두리 설정
-    style.borders.left = 1
-    style.borders.right = 1
-    style.borders.top = 1
-    style.borders.bottom = 1
-
-    style.alignment.vert = style.alignment.VERT_CENTER  # 수직정렬
-    # style.alignment.horz = style.alignment.HORZ_CENTER  # 수평정렬
-
-    for row in rows:
-        row_num += 1
-        for col_num, col in enumerate((columns)):
-            row = list(row)
-
-            if col == '거래일자':
-                style.num_format_str = 'yyyy-mm-dd'
-                ws.col(col_num).width = 110 * 30
-
-            if col == '구분':
-                if row[col_num] == '1':
-                    row[col_num] = '입금'
-                if row[col_num] == '2':
-                    row[col_num] = '출금'
-                if row[col_num] == '3':
-                    row[col_num] = '대체'
-
-            if col == '계정':
-                if row[col_num] == '1':
-                    row[col_num] = '자산'
-                if row[col_num] == '2':
-                    row[col_num] = '부채'
-                if row[col_num] == '3':
-                    row[col_num] = '자본'
-                if row[col_num] == '4':
-                    row[col_num] = '수익'
-                if row[col_num] == '5':
-                    row[col_num] = '비용'
-                if row[col_num] == '6':
-                    row[col_num] = '대체'
-
-            if col == '현장 계정':
-                ws.col(col_num).width = 110 * 30
-
-            if col == '세부계정':
-                ws.col(col_num).width = 160 * 30
-
-            if col == '적요' or col == '거래처':
-                ws.col(col_num).width = 180 * 30
-
-            if col == '거래계좌':
-                ws.col(col_num).width = 170 * 30
-
-            if '금액' in col:
-                style.num_format_str = '#,##'
-                ws.col(col_num).width = 110 * 30
-
-            if col == '증빙자료':
-                if row[col_num] == '0':
-                    row[col_num] = '증빙 없음'
-                if row[col_num] == '1':
-                    row[col_num] = '세금계산서'
-                if row[col_num] == '2':
-                    row[col_num] = '계산서(면세)'
-                if row[col_num] == '3':
-                    row[col_num] = '신용카드전표'
-                if row[col_num] == '4':
-                    row[col_num] = '현금영수증'
-                if row[col_num] == '5':
-                    row[col_num] = '간이영수증'
-                ws.col(col_num).width = 100 * 30
-
-            if col == '비고':
-                ws.col(col_num).width = 256 * 30
-
-            ws.write(row_num, col_num, row[col_num], style)
-
-    wb.save(response)
-    return response
+    scope_model = Company
+    scope_param = 'company'
+    scope_field = 'company'
+
+    queryset = CashBook.objects.filter(is_separate=False)
+    numbering = False
+    ordering = ('deal_date', 'id')
+
+    filterset_class = CashBookFilterSet
+    filter_params = {'sort': 'sort',
+                     'account_d1': 'account_d1',
+                     'account_d2': 'account_d2',
+                     'account_d3': 'account_d3',
+                     'bank_account': 'bank_account'}
+    search_param = 'search_word'
+    search_fields = ('content', 'trader', 'note')
+    changed_fields = ('updated_at',)
+
+    columns = (
+        Column('거래일자', 'deal_date', 13, kind='date'),
+        Column('구분', 'sort__name', 8),
+        Column('계정', 'account_d1__name', 10),
+        Column('중분류', 'account_d2__name', 13),
+        Column('세부계정', 'account_d3__name', 19),
+        Column('적요', 'content', 21, align='left'),
+        Column('거래처', 'trader', 21, align='left'),
+        Column('거래계좌', 'bank_account__alias_name', 20),
+        Column('입금금액', 'income', 13, kind='amount'),
+        Column('출금금액', 'outlay', 13, kind='amount'),
+        Column('비고', 'note', 30, align='left'),
+    )
+
+    title = '입출금 내역'
+    sheet_name = '본사_입출금_내역'
+    filename = '{date}-cashbook.xlsx'
+
+    def get_date(self, request):
+        e_date = request.GET.get('e_date')
+        return TODAY if not e_date or e_date == 'null' else e_date
+
+    def get_queryset(self, request, scope):
+        s_date = request.GET.get('s_date')
+        s_date = '1900-01-01' if not s_date or s_date == 'null' else s_date
+        return super().get_queryset(request, scope).filter(deal_date__range=(s_date, self.get_date(request)))
 
 
 class ExportSuitCases(View):
@@ -3358,6 +2332,7 @@ class ExportSuitCases(View):
         # don't allow temp files, for example the Google APP Engine, set the
         # 'in_memory' Workbook() constructor option as shown in the docs.
         workbook = xlsxwriter.Workbook(output)
+        formats = FormatRegistry(workbook)  # 셀 서식 캐시
         worksheet = workbook.add_worksheet('소송 목록')
 
         worksheet.set_default_row(20)  # 기본 행 높이
@@ -3505,11 +2480,11 @@ class ExportSuitCases(View):
                     else:
                         body_format['num_format'] = '#,##0'
                     body_format['align'] = 'center'
-                    bformat = workbook.add_format(body_format)
+                    bformat = formats.get(body_format)
                     worksheet.write(row_num, col_num, cell_data, bformat)
                 else:
                     body_format['align'] = 'left'
-                    bformat = workbook.add_format(body_format)
+                    bformat = formats.get(body_format)
                     worksheet.write(row_num, col_num, cell_data, bformat)
 
         # data finish -------------------------------------------- #
@@ -3698,6 +2673,7 @@ class ExportStaffs(View):
         # don't allow temp files, for example the Google APP Engine, set the
         # 'in_memory' Workbook() constructor option as shown in the docs.
         workbook = xlsxwriter.Workbook(output)
+        formats = FormatRegistry(workbook)  # 셀 서식 캐시
         worksheet = workbook.add_worksheet('직원 정보')
 
         worksheet.set_default_row(20)  # 기본 행 높이
@@ -3790,11 +2766,11 @@ class ExportStaffs(View):
 
         data = obj_list.values_list(*params)
 
-        b_format = workbook.add_format()
-        b_format.set_border()
-        b_format.set_align('center')
-        b_format.set_align('vcenter')
-        b_format.set_num_format('yyyy-mm-dd')
+        # 참조 테이블 pk -> 이름 (테이블당 1회 조회)
+        departs = dict(Department.objects.filter(company=company).values_list('pk', 'name'))
+        grades = dict(JobGrade.objects.filter(company=company).values_list('pk', 'name'))
+        positions = dict(Position.objects.filter(company=company).values_list('pk', 'name'))
+        duties = dict(DutyTitle.objects.filter(company=company).values_list('pk', 'name'))
 
         body_format = {
             'border': True,
@@ -3817,20 +2793,20 @@ class ExportStaffs(View):
                 if col_num == 1:
                     cell_data = sort[cell_data]
                 if col_num == 6:
-                    cell_data = Department.objects.get(pk=cell_data).name if cell_data else None
+                    cell_data = departs.get(cell_data)
                 if col_num == 7:
-                    cell_data = JobGrade.objects.get(pk=cell_data).name if cell_data else None
+                    cell_data = grades.get(cell_data)
                 if col_num == 8:
-                    cell_data = Position.objects.get(pk=cell_data).name if cell_data else None
+                    cell_data = positions.get(cell_data)
                 if col_num == 9:
-                    cell_data = DutyTitle.objects.get(pk=cell_data).name if cell_data else None
+                    cell_data = duties.get(cell_data)
                 if col_num == 11:
                     cell_data = status[cell_data]
                 if col_num in (10, 12):
                     body_format['num_format'] = 'yyyy-mm-dd'
                 else:
                     body_format['num_format'] = '#,##0'
-                bformat = workbook.add_format(body_format)
+                bformat = formats.get(body_format)
                 worksheet.write(row_num, col_num, cell_data, bformat)
 
         # data finish -------------------------------------------- #
@@ -3863,6 +2839,7 @@ class ExportDeparts(View):
         # don't allow temp files, for example the Google APP Engine, set the
         # 'in_memory' Workbook() constructor option as shown in the docs.
         workbook = xlsxwriter.Workbook(output)
+        formats = FormatRegistry(workbook)  # 셀 서식 캐시
         worksheet = workbook.add_worksheet('부서 정보')
 
         worksheet.set_default_row(20)  # 기본 행 높이
@@ -3931,12 +2908,7 @@ class ExportDeparts(View):
             Q(task__icontains=search)) if search else obj_list
 
         data = obj_list.values_list(*params)
-
-        b_format = workbook.add_format()
-        b_format.set_border()
-        b_format.set_align('center')
-        b_format.set_align('vcenter')
-        b_format.set_num_format('yyyy-mm-dd')
+        departs = dict(Department.objects.filter(company=company).values_list('pk', 'name'))  # 상위부서 pk -> 이름
 
         body_format = {
             'border': True,
@@ -3954,13 +2926,13 @@ class ExportDeparts(View):
             row.insert(0, i + 1)
             for col_num, cell_data in enumerate(row):
                 if col_num == 1:
-                    cell_data = obj_list.get(pk=cell_data).name if cell_data else None
+                    cell_data = departs.get(cell_data)
                 if col_num == 3:
                     body_format['align'] = 'left'
                 else:
                     body_format['align'] = 'center'
 
-                bformat = workbook.add_format(body_format)
+                bformat = formats.get(body_format)
                 worksheet.write(row_num, col_num, cell_data, bformat)
 
         # data finish -------------------------------------------- #
@@ -3993,6 +2965,7 @@ class ExportPositions(View):
         # don't allow temp files, for example the Google APP Engine, set the
         # 'in_memory' Workbook() constructor option as shown in the docs.
         workbook = xlsxwriter.Workbook(output)
+        formats = FormatRegistry(workbook)  # 셀 서식 캐시
         worksheet = workbook.add_worksheet('직위 정보')
 
         worksheet.set_default_row(20)  # 기본 행 높이
@@ -4055,15 +3028,7 @@ class ExportPositions(View):
         obj_list = Position.objects.filter(company=company)
         obj_list = obj_list.filter(name__icontains=search) if search else obj_list
 
-        json_data = serializers.serialize('json', obj_list)
-        data = [i['fields'] for i in json.loads(json_data)]
-        # data = obj_list.values_list(*params)
-
-        b_format = workbook.add_format()
-        b_format.set_border()
-        b_format.set_align('center')
-        b_format.set_align('vcenter')
-        b_format.set_num_format('yyyy-mm-dd')
+        data = obj_list.prefetch_related('grades')  # 직급(M2M) 일괄 조회
 
         body_format = {
             'border': True,
@@ -4074,30 +3039,18 @@ class ExportPositions(View):
         # Turn off some of the warnings:
         worksheet.ignore_errors({'number_stored_as_text': 'A:D'})
 
-        def get_grade(pk):
-            return JobGrade.objects.get(pk=pk).name
-
         # Write body
-        params.insert(0, 'num')
-        for i, row in enumerate(data):
+        for i, position in enumerate(data):
             row_num += 1
-            row['num'] = i + 1
-            del row['company']
-            row_data = []
-            row_data.insert(0, row['num'])
-            row_data.insert(1, row['name'])
-            row_data.insert(2, row['grades'])
-            row_data.insert(3, row['desc'])
+            grades = ', '.join(sorted(grade.name for grade in position.grades.all()))
+            row_data = [i + 1, position.name, grades, position.desc]
 
             for col_num, cell_data in enumerate(row_data):
-                if type(cell_data) == list:
-                    grades = [get_grade(i) for i in cell_data]
-                    cell_data = ', '.join(sorted(grades))
                 if col_num in (2, 3):
                     body_format['align'] = 'left'
                 else:
                     body_format['align'] = 'center'
-                bformat = workbook.add_format(body_format)
+                bformat = formats.get(body_format)
                 worksheet.write(row_num, col_num, cell_data, bformat)
         # data finish -------------------------------------------- #
 
@@ -4116,124 +3069,21 @@ class ExportPositions(View):
         return response
 
 
-class ExportDuties(View):
+class ExportDuties(ExportSpec):
     """직책 정보 목록"""
-
-    @staticmethod
-    def get(request):
-        # Create an in-memory output file for the new workbook.
-        output = io.BytesIO()
-
-        # Even though the final file will be in memory the module uses temp
-        # files during assembly for efficiency. To avoid this on servers that
-        # don't allow temp files, for example the Google APP Engine, set the
-        # 'in_memory' Workbook() constructor option as shown in the docs.
-        workbook = xlsxwriter.Workbook(output)
-        worksheet = workbook.add_worksheet('직책 정보')
-
-        worksheet.set_default_row(20)  # 기본 행 높이
-
-        # data start --------------------------------------------- #
-        company = Company.objects.get(pk=request.GET.get('company'))
-        com_name = company.name.replace('주식회사 ', '(주)')
-
-        # title_list
-        header_src = [[],
-                      ['직책명', 'name', 20],
-                      ['설명', 'desc', 60]]
-        titles = ['No']  # header titles
-        params = []  # ORM 추출 field
-        widths = [7]  # No. 컬럼 넓이
-
-        for el in header_src:
-            if el:
-                titles.append(el[0])
-                params.append(el[1])
-                widths.append(el[2])
-
-        # 1. Title
-        row_num = 0
-        worksheet.set_row(row_num, 50)
-        title_format = workbook.add_format()
-        title_format.set_bold()
-        title_format.set_font_size(18)
-        title_format.set_align('vcenter')
-        worksheet.merge_range(row_num, 0, row_num, len(header_src) - 1, com_name + ' 직책 정보 목록', title_format)
-
-        # 2. Pre Header - Date
-        row_num = 1
-        worksheet.set_row(row_num, 18)
-        worksheet.write(row_num, len(header_src) - 1, TODAY + ' 현재', workbook.add_format({'align': 'right'}))
-
-        # 3. Header - 1
-        row_num = 2
-        worksheet.set_row(row_num, 20, workbook.add_format({'bold': True}))
-
-        h_format = workbook.add_format()
-        h_format.set_bold()
-        h_format.set_border()
-        h_format.set_align('center')
-        h_format.set_align('vcenter')
-        h_format.set_bg_color('#eeeeee')
-
-        # Adjust the column width.
-        for i, col_width in enumerate(widths):
-            worksheet.set_column(i, i, col_width)
-
-        # Write header - 1
-        for col_num, title in enumerate(titles):
-            worksheet.write(row_num, col_num, title, h_format)
-
-        # 4. Body
-        # Get some data to write to the spreadsheet.
-        search = request.GET.get('search')
-        obj_list = DutyTitle.objects.filter(company=company)
-        obj_list = obj_list.filter(name__icontains=search) if search else obj_list
-
-        data = obj_list.values_list(*params)
-
-        b_format = workbook.add_format()
-        b_format.set_border()
-        b_format.set_align('center')
-        b_format.set_align('vcenter')
-        b_format.set_num_format('yyyy-mm-dd')
-
-        body_format = {
-            'border': True,
-            'valign': 'vcenter',
-            'num_format': '#,##0'
-        }
-
-        # Turn off some of the warnings:
-        # worksheet.ignore_errors({'number_stored_as_text': 'F:G'})
-
-        # Write body
-        for i, row in enumerate(data):
-            row = list(row)
-            row_num += 1
-            row.insert(0, i + 1)
-            for col_num, cell_data in enumerate(row):
-                if col_num == 3:
-                    body_format['align'] = 'left'
-                else:
-                    body_format['align'] = 'center'
-                bformat = workbook.add_format(body_format)
-                worksheet.write(row_num, col_num, cell_data, bformat)
-        # data finish -------------------------------------------- #
-
-        # Close the workbook before sending the data.
-        workbook.close()
-
-        # Rewind the buffer.
-        output.seek(0)
-
-        # Set up the Http response.
-        filename = f'{TODAY}-duties.xlsx'
-        file_format = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        response = HttpResponse(output, content_type=file_format)
-        response['Content-Disposition'] = f'attachment; filename={filename}'
-
-        return response
+    scope_model = Company
+    scope_param = 'company'
+    scope_field = 'company'
+    queryset = DutyTitle.objects.all()
+    columns = (
+        Column('직책명', 'name', 20),
+        Column('설명', 'desc', 60, align='left'),
+    )
+    search_param = 'search'
+    search_fields = ('name',)
+    title = '직책 정보 목록'
+    sheet_name = '직책 정보'
+    filename = '{date}-duties.xlsx'
 
 
 class ExportGrades(View):
@@ -4249,6 +3099,7 @@ class ExportGrades(View):
         # don't allow temp files, for example the Google APP Engine, set the
         # 'in_memory' Workbook() constructor option as shown in the docs.
         workbook = xlsxwriter.Workbook(output)
+        formats = FormatRegistry(workbook)  # 셀 서식 캐시
         worksheet = workbook.add_worksheet('직급 정보')
 
         worksheet.set_default_row(20)  # 기본 행 높이
@@ -4316,33 +3167,7 @@ class ExportGrades(View):
             Q(positions__name__icontains=search) |
             Q(criteria_new__icontains=search)) if search else obj_list
 
-        base_data = obj_list.values(*params)
-        data = []
-        for bd in base_data:
-            bd['p_list'] = []
-            if len(data) == 0:
-                bd['p_list'].append(bd['positions'])
-                data.append(bd)
-            else:
-                is_exist = False
-                for dt in data:
-                    if dt['name'] == bd['name']:
-                        is_exist = True
-                        dt['p_list'].append(bd['positions'])
-                if not is_exist:
-                    bd['p_list'].append(bd['positions'])
-                    data.append(bd)
-
-        for i, dt in enumerate(data):
-            dt['num'] = i + 1
-            dt['positions'] = dt['p_list']
-            del dt['p_list']
-
-        b_format = workbook.add_format()
-        b_format.set_border()
-        b_format.set_align('center')
-        b_format.set_align('vcenter')
-        b_format.set_num_format('yyyy-mm-dd')
+        data = obj_list.distinct().prefetch_related('positions')  # 허용직위(M2M) 일괄 조회
 
         body_format = {
             'border': True,
@@ -4353,23 +3178,18 @@ class ExportGrades(View):
         # Turn off some of the warnings:
         worksheet.ignore_errors({'number_stored_as_text': 'A:D'})
 
-        def get_position(pk):
-            return Position.objects.get(pk=pk).name
-
         # Write body
-        for i, row in enumerate(data):
+        for i, grade in enumerate(data):
             row_num += 1
-            row_data = [row['num'], row['name'], row['promotion_period'], row['positions'], row['criteria_new']]
+            positions = ', '.join(sorted(position.name for position in grade.positions.all()))
+            row_data = [i + 1, grade.name, grade.promotion_period, positions, grade.criteria_new]
 
             for col_num, cell_data in enumerate(row_data):
-                if type(cell_data) == list:
-                    positions = [get_position(i) for i in cell_data]
-                    cell_data = ', '.join(sorted(positions))
                 if col_num in (3, 4):
                     body_format['align'] = 'left'
                 else:
                     body_format['align'] = 'center'
-                bformat = workbook.add_format(body_format)
+                bformat = formats.get(body_format)
                 worksheet.write(row_num, col_num, cell_data, bformat)
         # data finish -------------------------------------------- #
 
@@ -4401,6 +3221,7 @@ class ExportExamples(View):
         # don't allow temp files, for example the Google APP Engine, set the
         # 'in_memory' Workbook() constructor option as shown in the docs.
         workbook = xlsxwriter.Workbook(output)
+        formats = FormatRegistry(workbook)  # 셀 서식 캐시
         worksheet = workbook.add_worksheet('시트 타이틀')
 
         worksheet.set_default_row(20)  # 기본 행 높이
@@ -4481,7 +3302,7 @@ class ExportExamples(View):
             row_num += 1
             row.insert(0, i + 1)
             for col_num, cell_data in enumerate(row):
-                bformat = workbook.add_format(body_format)
+                bformat = formats.get(body_format)
                 worksheet.write(row_num, col_num, cell_data, bformat)
 
         # data finish -------------------------------------------- #
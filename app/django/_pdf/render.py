@@ -0,0 +1,222 @@
+import io
+import multiprocessing
+import os
+import shutil
+import sys
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from pathlib import Path
+
+from django.conf import settings
+from django.template.loader import get_template
+from pypdf import PdfWriter
+from weasyprint import HTML, CSS
+from weasyprint.text.fonts import FontConfiguration
+
+# PDF 변환 작업 프로세스 수 - 미지정 시 CPU 코어 수를 전체 내보내기 동시 실행 수로 나눈 값
+# (풀은 uWSGI 작업자마다 생성되므로 동시에 변환 중인 작업자들의 풀 합계가 CPU 코어 수를 넘지 않도록 제한)
+PDF_RENDER_WORKERS = getattr(settings, 'PDF_RENDER_WORKERS', None) or \
+    max((os.cpu_count() or 1) // getattr(settings, 'EXPORT_CONCURRENCY', {}).get('total', 4), 1)
+PDF_RENDER_CHUNK_SIZE = getattr(settings, 'PDF_RENDER_CHUNK_SIZE', 20)  # 프로세스 하나가 한 번에 변환할 문서 수(고지서 건수)
+PDF_POOL_IDLE_TIMEOUT = getattr(settings, 'PDF_POOL_IDLE_TIMEOUT', 300)  # 마지막 사용 후 풀을 종료할 때까지 대기 시간(초)
+PDF_WARM_UP = getattr(settings, 'PDF_WARM_UP', True)  # 웹 작업자 시작 시 글꼴 설정, 스타일시트, 템플릿 미리 로드
+PDF_RENDER_PYTHON = getattr(settings, 'PDF_RENDER_PYTHON', None)  # 작업 프로세스 python 실행 파일 (미지정 시 자동 검색)
+
+STYLE_DIR = Path(__file__).resolve().parent / 'styles'
+PDF_STYLESHEETS = {  # PDF 템플릿 -> 스타일시트 파일 (STYLE_DIR)
+    'pdf/bill_control.html': 'bill_control.css',
+    'pdf/payments_by_contractor.html': 'payments_by_contractor.css',
+    'pdf/calculation_by_contractor.html': 'calculation_by_contractor.css',
+}
+
+# 프로세스 단위 캐시 - 한 번 만들어 두고 요청마다 재사용
+# (글꼴 설정과 스타일시트는 PDF 변환을 수행하는 웹 작업자와 작업 프로세스에, 템플릿은 HTML 을 렌더링하는 웹 작업자에만 생성)
+font_config = None  # 공유 글꼴 설정 (FontConfiguration)
+stylesheets = {}  # 템플릿 -> 미리 파싱한 CSS 목록
+templates = {}  # 템플릿 -> 컴파일된 Django 템플릿
+pool = None  # 변환 작업 프로세스 풀
+pool_users = 0  # 풀을 사용 중인 요청 수
+idle_timer = None  # 유휴 풀 종료 타이머
+pool_lock = threading.Lock()
+
+
+def get_font_config():
+    """공유 글꼴 설정 - 시스템 글꼴 검색(fontconfig)은 프로세스당 한 번만 수행한다."""
+    global font_config
+    if font_config is None:
+        font_config = FontConfiguration()
+    return font_config
+
+
+def get_stylesheets(template_name):
+    """템플릿의 미리 파싱한 스타일시트 목록 (등록되지 않은 템플릿은 빈 목록)"""
+    if template_name not in stylesheets:
+        filename = PDF_STYLESHEETS.get(template_name)
+        stylesheets[template_name] = [CSS(filename=STYLE_DIR / filename, font_config=get_font_config())] \
+            if filename else []
+    return stylesheets[template_name]
+
+
+def load_styles():
+    """글꼴 설정과 스타일시트 미리 로드 (웹 작업자 및 변환 작업 프로세스 시작 시 실행)"""
+    for template_name in PDF_STYLESHEETS:
+        get_stylesheets(template_name)
+
+
+def get_pdf_template(template_name):
+    """컴파일된 Django 템플릿 - 템플릿 검색/파싱은 프로세스당 한 번만 수행한다."""
+    if template_name not in templates:
+        templates[template_name] = get_template(template_name)
+    return templates[template_name]
+
+
+def render_html(template_name, context):
+    """PDF 템플릿을 HTML 문자열로 렌더링"""
+    return get_pdf_template(template_name).render(context)
+
+
+def warm_up():
+    """
+    :: 글꼴 설정, 스타일시트, 템플릿 미리 로드 - 웹 작업자 시작 시(_config.wsgi) 실행
+    - 첫 요청부터 동적 내용의 렌더링만 수행하도록 고정 준비 작업을 요청 전에 끝내 둔다.
+    - 문서 하나짜리 변환(render_pdf)은 웹 작업자에서 바로 수행하므로 작업 프로세스 풀 사용 여부와 관계없이 로드한다.
+    """
+    load_styles()
+    for template_name in PDF_STYLESHEETS:
+        get_pdf_template(template_name)
+
+
+def write_pdf(html_string, template_name=None):
+    """
+    :: HTML 문자열을 PDF 로 변환 (현재 프로세스에서 변환 - 웹 작업자에서는 render_pdf / render_pdfs 사용)
+    - 이 모듈의 변환 함수는 모델을 참조하지 않으므로 작업 프로세스는 DB 연결 없이 WeasyPrint 만 사용한다.
+    - 스타일시트와 글꼴 설정은 프로세스 캐시를 사용하므로 문서별로는 HTML 파싱과 레이아웃만 수행한다.
+    :param html_string: HTML 문자열
+    :param template_name: HTML 을 렌더링한 템플릿 - 해당 템플릿의 스타일시트 적용
+    :return: bytes
+    """
+    return HTML(string=html_string).write_pdf(stylesheets=get_stylesheets(template_name),
+                                              font_config=get_font_config())
+
+
+def get_python_executable():
+    """
+    작업 프로세스 python 실행 파일
+    - uWSGI 에서는 sys.executable 이 uwsgi 바이너리이므로 현재 환경(venv)의 python 을 찾아 사용한다.
+    """
+    if PDF_RENDER_PYTHON:
+        return PDF_RENDER_PYTHON
+    if Path(sys.executable).name.startswith('python'):
+        return sys.executable
+    for name in (f'python{sys.version_info.major}.{sys.version_info.minor}', 'python3', 'python'):
+        path = Path(sys.prefix) / 'bin' / name
+        if path.exists():
+            return str(path)
+    return shutil.which('python3') or sys.executable
+
+
+def acquire_pool():
+    """
+    변환 작업 프로세스 풀 사용 시작 - 처음 사용할 때 생성하여 이후 요청에서 재사용한다.
+    - uWSGI 작업자의 스레드/DB 연결을 물려받지 않도록 spawn 방식으로 프로세스를 생성하고
+      작업 프로세스는 시작 시 글꼴 설정과 스타일시트를 미리 로드한다.
+    - 풀 관리 스레드가 동작하도록 uWSGI 는 --enable-threads 옵션으로 실행해야 한다.
+    - 사용이 끝나면 release_pool() 을 호출해야 한다.
+    """
+    global pool, pool_users, idle_timer
+    with pool_lock:
+        if idle_timer is not None:
+            idle_timer.cancel()
+            idle_timer = None
+        if pool is None:
+            context = multiprocessing.get_context('spawn')
+            context.set_executable(get_python_executable())
+            pool = ProcessPoolExecutor(max_workers=PDF_RENDER_WORKERS, mp_context=context, initializer=load_styles)
+        pool_users += 1
+        return pool
+
+
+def release_pool(broken=False):
+    """
+    변환 작업 프로세스 풀 사용 종료 - 사용 중인 요청이 없으면 PDF_POOL_IDLE_TIMEOUT 초 후 풀을 종료한다.
+    (uWSGI 작업자마다 작업 프로세스가 계속 남아 있지 않도록 PDF 요청이 없는 작업자의 풀은 정리)
+    :param broken: 작업 프로세스가 비정상 종료된 경우 True - 풀을 버리고 다음 요청에서 새로 생성
+    """
+    global pool, pool_users, idle_timer
+    with pool_lock:
+        pool_users -= 1
+        if broken:
+            pool = None
+        if pool is not None and not pool_users:
+            idle_timer = threading.Timer(PDF_POOL_IDLE_TIMEOUT, shutdown_idle_pool)
+            idle_timer.daemon = True
+            idle_timer.start()
+
+
+def shutdown_idle_pool():
+    """유휴 풀 종료 (타이머 스레드에서 실행) - 그 사이 풀을 다시 사용했거나 새 타이머로 교체되었으면 무시"""
+    global pool, idle_timer
+    with pool_lock:
+        if pool_users or idle_timer is not threading.current_thread():
+            return
+        executor, pool, idle_timer = pool, None, None
+    executor.shutdown()
+
+
+def render_pdfs(html_strings, template_name=None, workers=PDF_RENDER_WORKERS):
+    """
+    :: 여러 HTML 문서를 각각 PDF 로 변환 - 2건 이상이면 프로세스 풀에서 병렬 변환
+    - 1건은 프로세스 시작과 프로세스 간 전달 비용이 더 크므로 현재 프로세스에서 캐시된 스타일시트로 변환한다.
+    :param html_strings: HTML 문자열 목록
+    :param template_name: HTML 을 렌더링한 템플릿 (스타일시트 적용)
+    :param workers: 작업 프로세스 수 (1 이하이면 풀을 사용하지 않고 현재 프로세스에서 변환)
+    :return: 입력 순서와 같은 PDF(bytes) 목록
+    """
+    html_strings = list(html_strings)
+    convert = partial(write_pdf, template_name=template_name)
+    if workers <= 1 or len(html_strings) <= 1:
+        return [convert(html_string) for html_string in html_strings]
+    executor = acquire_pool()
+    broken = False
+    try:
+        return list(executor.map(convert, html_strings))
+    except BrokenProcessPool:
+        broken = True
+        raise
+    finally:
+        release_pool(broken)
+
+
+def render_pdf(html_string, template_name=None):
+    """:: HTML 문서 하나를 PDF 로 변환 (작업 프로세스 풀을 사용하지 않고 현재 프로세스에서 변환) - bytes"""
+    return write_pdf(html_string, template_name)
+
+
+def merge_pdfs(pdfs):
+    """
+    :: PDF 목록을 순서대로 이어 붙여 하나의 PDF 로 병합
+    :return: bytes
+    """
+    if len(pdfs) == 1:
+        return pdfs[0]
+    writer = PdfWriter()
+    for pdf in pdfs:
+        writer.append(io.BytesIO(pdf))
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue()
+
+
+def zip_files(files):
+    """
+    :: (파일명, bytes) 목록을 ZIP 으로 압축
+    :return: bytes
+    """
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, content in files:
+            archive.writestr(name, content)
+    return output.getvalue()
@@ -1,23 +1,47 @@
-from datetime import date, datetime, timedelta
+from datetime import date, datetime
 from itertools import accumulate
 # --------------------------------------------------------
 from django.core.exceptions import ObjectDoesNotExist
-from django.core.files.storage import FileSystemStorage
 from django.db.models import Sum
 from django.http import HttpResponse
-from django.template.loader import render_to_string
 from django.views.generic import View
-from weasyprint import HTML
 
 from cash.models import ProjectCashBook
 from contract.models import Contract
 from notice.models import SalesBillIssue
-from payment.models import (InstallmentPaymentOrder, OverDueRule,
-                            SpecialPaymentOrder, SpecialDownPay, SpecialOverDueRule)
+from payment.models import SpecialDownPay
+from payment.utils import InstallmentSchedule, LateFeeSchedule
+
+from .render import PDF_RENDER_CHUNK_SIZE, render_html, render_pdf, render_pdfs, merge_pdfs, zip_files
 
 TODAY = date.today()
 
 
+def file_response(content, filename, content_type='application/pdf'):
+    """
+    :: 메모리에서 생성한 파일(bytes)로 첨부 파일 응답 생성
+    :param content: 파일 내용
+    :param filename: 다운로드 파일명
+    :param content_type: 파일 형식
+    :return: HttpResponse
+    """
+    response = HttpResponse(content, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def pdf_response(template_name, context, filename):
+    """
+    :: PDF 템플릿을 렌더링하고 메모리에서 PDF 로 변환하여 첨부 파일 응답 생성
+    - 요청마다 별도의 바이트 버퍼에 렌더링하므로 동시 요청의 결과가 서로 덮어쓰이지 않는다.
+    :param template_name: PDF 템플릿
+    :param context: 템플릿 컨텍스트
+    :param filename: 다운로드 파일명
+    :return: HttpResponse
+    """
+    return file_response(render_pdf(render_html(template_name, context), template_name), filename)
+
+
 def get_contract(cont_id):
     """ ■ 계약 가져오기
     :param cont_id: 계약자 아이디
@@ -26,10 +50,10 @@ def get_contract(cont_id):
     return Contract.objects.get(pk=cont_id)
 
 
-def get_simple_orders(payment_orders, contract, amount, is_past=False):
+def get_simple_orders(schedule, contract, amount, is_past=False):
     """
     :: 약식 납부회차 구하기
-    :param payment_orders:
+    :param schedule: 납부기한 계산표 (InstallmentSchedule)
     :param contract:
     :param amount:
     :param is_past: 종전 선납/연체 계산 여부
@@ -38,11 +62,8 @@ def get_simple_orders(payment_orders, contract, amount, is_past=False):
     simple_orders = []
 
     amount_total = 0
-    try:
-        calc_start = payment_orders.filter(is_calc_start=True).first().pay_code
-    except AttributeError:
-        calc_start = 3
-    for order in payment_orders:
+    calc_start = schedule.calc_start or 3
+    for order in schedule.orders:
         if is_past:
             amt = amount['1'] if order.pay_code < 5 else amount['2']
         else:
@@ -52,7 +73,7 @@ def get_simple_orders(payment_orders, contract, amount, is_past=False):
             'name': order.alias_name if order.alias_name else order.pay_name,  # 회차별 별칭
             'pay_code': order.pay_code,
             'calc_start': calc_start,
-            'due_date': get_due_date_per_order(contract, order, payment_orders),  # 회차별 납부기한
+            'due_date': get_due_date_per_order(contract, order, schedule),  # 회차별 납부기한
             'amount': amt,  # 회차별 약정금
             'amount_total': amount_total,  # 회차별 약정금 누계
         }
@@ -61,17 +82,17 @@ def get_simple_orders(payment_orders, contract, amount, is_past=False):
     return simple_orders
 
 
-def get_due_amount(payment_orders, contract, amount):
+def get_due_amount(schedule, contract, amount):
     """
     :: 약정금 누계 계산 함수
-    :param payment_orders: 전체 납부회차 쿼리셋
+    :param schedule: 납부기한 계산표 (InstallmentSchedule)
     :param contract: contract 객체
     :param amount: {'1': down, '2': middle, '3': remain}
     :return: int 현재 회차까지 납부 약정액 합계
     """
     total_amounts = 0
     # 약정회차 리스트
-    due_orders = get_due_orders(contract, payment_orders)
+    due_orders = get_due_orders(contract, schedule)
     for order in due_orders:
         total_amounts += amount[order.pay_sort]
     return total_amounts
@@ -86,100 +107,45 @@ def is_due(due_date):
     return due_date and due_date <= TODAY
 
 
-def get_due_date_per_order(contract, order, payment_orders):
+def get_due_date_per_order(contract, order, schedule):
     """
     :: 회차 별 납부 일자 구하기
     :param contract: 계약자 객체
-    :param order: 납부 회차 객체
-    :param payment_orders: 납부 회차 컬렉션
+    :param order: 납부 회차 객체 또는 약식 납부회차(dict)
+    :param schedule: 납부기한 계산표 (InstallmentSchedule, 약식 납부회차인 경우 사용하지 않음)
     :return str(due_date): 회차 별 약정 납부 일자
     """
 
     cont_date = contract.contractor.contract_date  # 계약일 (default 납부기한 = 계약일)
-    due_date = cont_date
 
-    if type(order) is dict and order.get('pay_code') >= 2:
-        due_date = order.get('due_date', None)
-    elif order.pay_code >= 2:
-        si_date = order.days_since_prev
-        pd_date = order.pay_due_date
-        ed_date = order.extra_due_date
+    if type(order) is dict:
+        return order.get('due_date', None) if order.get('pay_code') >= 2 else cont_date
+    return schedule.get_due_date(cont_date, order)
 
-        due_date = cont_date + timedelta(days=si_date) if si_date else ed_date or pd_date
 
-        if order.pay_code >= 3:
-            pre_ords = payment_orders.filter(pay_code__lt=order.pay_code)
-            pre_si = pre_ords.aggregate(total=Sum('days_since_prev'))['total']
-            si_due = cont_date + timedelta(days=pre_si) if pre_si else cont_date
-
-            due = ed_date or pd_date
-            if not due:
-                due_date = None
-            else:
-                due_date = due if due > si_due else si_due
-
-    return due_date
-
-
-def get_due_orders(contract, payment_orders):
+def get_due_orders(contract, schedule):
     """
     :: 오늘 날짜 기준 기도래 납부 회차 객체 리스트 구하기
     :param contract: 
-    :param payment_orders:
+    :param schedule: 납부기한 계산표 (InstallmentSchedule)
     :return: list -> 납부회차 객체
     """
-    return [o for o in payment_orders if is_due(get_due_date_per_order(contract, o, payment_orders))]
+    return [o for o in schedule.orders if is_due(get_due_date_per_order(contract, o, schedule))]
 
 
-def get_late_fee(project, late_amt, days, is_past=False):
+def get_late_fee(project, late_amt, days, is_past=False, schedule=None):
     """
     :: 회차별 지연 가산금 계산 함수
     :param project: 프로젝트
     :param late_amt: 지연금액
     :param days: 지연일수
     :param is_past: 종전 선납/연체 계산 여부
+    :param schedule: 미리 생성한 가산금 계산표 (없으면 프로젝트 규정을 조회하여 생성)
     :return int(floor_fee: 가산금), str(적용 이자율):
     """
-
-    if not is_past:
-        rules = OverDueRule.objects.filter(project=project)
-    else:
-        rules = SpecialOverDueRule.objects.filter(project=project)
-
-    calc_fee = 0
-    calc_days = 0
-
-    for rule in rules:
-        start = rule.term_start
-        end = rule.term_end
-        rate = rule.rate_year / 100
-
-        if start is None and end is None:  # 단일 가산율 적용인 경우
-            return int(late_amt * days * rate / 365)
-
-        elif start is None and end is not None:  # 선납 률이 규정 되어 있는 경우
-            if days <= 0:  # 선납인 경우
-                return int(late_amt * days * rate / 365)
-            else:
-                pass
-
-        elif start is not None and end is not None:  # 특정 기간 동안 연체인 경우
-
-            if start == 1:  # 연체 시작 구간일 경우
-                if days <= end:
-                    return int(late_amt * days * rate / 365)
-                else:
-                    calc_fee += late_amt * end * rate / 365
-                    calc_days = end
-            else:  # 연체 진행 구간일 경우
-                if days <= end:
-                    return int(calc_fee + (late_amt * (days - calc_days) * rate / 365))
-                else:
-                    calc_fee += late_amt * (end - calc_days) * rate / 365
-                    calc_days = end
-
-        elif start is not None and end is None:  # 특정 기간 이상 연체인 경우
-            return int(calc_fee + (late_amt * (days - calc_days) * rate / 365))
+    if schedule is None:
+        schedule = LateFeeSchedule.for_project(project, is_past)
+    return schedule.get_fee(late_amt, days)
 
 
 def get_paid(contract: Contract, simple_orders, pub_date, **kwargs):
@@ -189,6 +155,7 @@ def get_paid(contract: Contract, simple_orders, pub_date, **kwargs):
     :param simple_orders: 회차정보
     :param pub_date: 발행일자
     :param kwargs: is_calc => True - 일반용 / False - 확인용 / is_past => 변경 약정에 의한 가산금 산출 여부
+                   schedule => 가산금 계산표 (없으면 is_past 에 따른 프로젝트 규정으로 생성)
     :return list(paid_list: { 납부 건 딕셔너리 }), int(paid_sum_total: 납부 총액):
     """
 
@@ -202,6 +169,7 @@ def get_paid(contract: Contract, simple_orders, pub_date, **kwargs):
 
     is_past = True if kwargs.get('is_past') else False
     paid_list = paid_list.filter(installment_order__pay_sort='1') if is_past else paid_list
+    schedule = kwargs.get('schedule') or LateFeeSchedule.for_project(contract.project_id, is_past)  # 가산금 계산표
 
     pay_list = [p.income for p in paid_list]  # 입금액 추출 리스트
     paid_sum_list = list(accumulate(pay_list))  # 입금액 리스트를 시간 순 누계액 리스트로 변경
@@ -214,7 +182,7 @@ def get_paid(contract: Contract, simple_orders, pub_date, **kwargs):
     # 선납/할인 적용 시작 회차부터 현재 납부 의무 회차까지
     calc_orders = [item for item in simple_orders
                    if item.get('pay_code', 0) >= calc_start_pay_code
-                   and is_due(get_due_date_per_order(contract, item, simple_orders))]
+                   and is_due(get_due_date_per_order(contract, item, None))]
 
     calc_orders = calc_orders if kwargs.get('is_calc', None) else []  # 일반용일 경우에만 적용
 
@@ -310,7 +278,7 @@ def get_paid(contract: Contract, simple_orders, pub_date, **kwargs):
             days = prepay_days if diff < 0 else delay_days
             days = days if diff else 0
 
-            calc = get_late_fee(contract.project, diff, days, is_past)
+            calc = schedule.get_fee(diff, days)
 
             penalty = calc if diff > 0 else 0
             discount = calc if diff < 0 else 0
@@ -333,7 +301,7 @@ def get_paid(contract: Contract, simple_orders, pub_date, **kwargs):
             days = (next_date - paid['due_date']).days if diff else 0
             days = days if diff > 0 else days * -1
 
-            calc = get_late_fee(contract.project, diff, days, is_past)
+            calc = schedule.get_fee(diff, days)
 
             penalty = calc if diff > 0 else 0
             discount = calc if diff < 0 else 0
@@ -358,8 +326,52 @@ def get_paid(contract: Contract, simple_orders, pub_date, **kwargs):
     return paid_dict_list, paid_sum_total, calc_sums
 
 
+class BillDataLoader:
+    """
+    고지서 일괄 발행 데이터 로더
+    - 요청된 계약 건 전체를 계약자, 가격, 동호수와 함께 한 번에 조회하고 납부 내역도 한 번의 쿼리로 가져와
+      계약 건별로 묶어 두므로 고지서 데이터는 메모리에서 계산되어 발행 건수와 관계없이 쿼리 수가 일정하다.
+    """
+
+    def __init__(self, project, cont_ids):
+        """
+        :param project: 프로젝트 ID
+        :param cont_ids: 계약 건 ID 리스트 (고지서 발행 순서)
+        """
+        self.schedule = InstallmentSchedule.for_project(project)  # 전체 납부회차 및 납부기한 계산표
+        self.late_fee_schedule = LateFeeSchedule.for_project(project)  # 지연 가산금 계산표
+
+        contracts = Contract.objects.select_related('unit_type', 'contractor', 'contractprice',
+                                                    'keyunit__unit_type', 'keyunit__houseunit__building_unit') \
+            .in_bulk(cont_ids)
+        self.contracts = [contracts[int(cont_id)] for cont_id in cont_ids]
+
+        self.paid_lists = {}  # 계약 건 ID -> [(income, deal_date), ...] 납부일 순
+        paid_list = ProjectCashBook.objects.filter(
+            income__isnull=False,
+            project_account_d3__in=(1, 4),  # 분(부)담금 or 분양수입금
+            contract__in=list(contracts),
+        ).order_by('deal_date', 'id').values_list('contract', 'income', 'deal_date')  # 요청 계약 건 전체 납부 데이터
+        for cont_id, income, deal_date in paid_list:
+            self.paid_lists.setdefault(cont_id, []).append((income, deal_date))
+
+    def get_paid(self, contract):
+        """
+        :: ■ 기 납부금액 구하기
+        :param contract: 계약정보
+        :return list(paid_list: [(income, deal_date), ...]), int(paid_sum_total: 납부 총액):
+        """
+        paid_list = self.paid_lists.get(contract.pk, [])
+        return paid_list, sum(income for income, _ in paid_list)
+
+
 class PdfExportBill(View):
-    """고지서 리스트"""
+    """
+    고지서 리스트
+    - 계약 건별 고지서 데이터를 만든 후 PDF_RENDER_CHUNK_SIZE 건씩 나누어 프로세스 풀에서 병렬로 변환하고
+      순서대로 병합한다. (?zip=1 요청 시 계약 건별 PDF 파일을 ZIP 으로 압축)
+    """
+    template_name = 'pdf/bill_control.html'
 
     def get(self, request):
         """
@@ -377,33 +389,42 @@ class PdfExportBill(View):
             'pub_date': pub_date,
             'bill_info': bill_info
         }  # 전체 데이터 딕셔너리
-        payment_orders = InstallmentPaymentOrder.objects.filter(project=project)  # 전체 납부회차 리스트
         now_due_order = bill_info.now_payment_order.pay_code if bill_info.now_payment_order else 2  # 당회 납부 회차
 
         contractor_list = request.GET.get('seq').split('-')  # 계약 건 ID 리스트
+        loader = BillDataLoader(project, contractor_list)  # 계약 건, 납부회차, 납부 내역 일괄 조회
 
         # 해당 계약건에 대한 데이터 정리 --------------------------------------- start
 
-        context['data_list'] = (self.get_bill_data(cont_id, payment_orders, now_due_order, pub_date, np, nl) \
-                                for cont_id in contractor_list)
+        bills = [self.get_bill_data(contract, loader, now_due_order, pub_date, np, nl)
+                 for contract in loader.contracts]
 
         # 해당 계약건에 대한 데이터 정리 --------------------------------------- end
 
-        html_string = render_to_string('pdf/bill_control.html', context)
-        html = HTML(string=html_string)
-        html.write_pdf(target='/tmp/mypdf.pdf')
+        if request.GET.get('zip'):
+            # 계약 건별 개별 PDF 파일 압축
+            pdfs = render_pdfs((render_html(self.template_name, dict(context, data_list=[bill])) for bill in bills),
+                               self.template_name)
+            files = zip((self.get_bill_filename(bill) for bill in bills), pdfs)
+            return file_response(zip_files(files), f'payment_bill({len(contractor_list)}).zip',
+                                 content_type='application/zip')
+
+        chunks = (bills[i:i + PDF_RENDER_CHUNK_SIZE] for i in range(0, len(bills), PDF_RENDER_CHUNK_SIZE))
+        pdfs = render_pdfs((render_html(self.template_name, dict(context, data_list=chunk)) for chunk in chunks),
+                           self.template_name)
+        return file_response(merge_pdfs(pdfs), f'payment_bill({len(contractor_list)}).pdf')
 
-        fs = FileSystemStorage('/tmp')
-        with fs.open('mypdf.pdf') as pdf:
-            response = HttpResponse(pdf, content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="payment_bill({len(contractor_list)}).pdf"'
-            return response
+    @staticmethod
+    def get_bill_filename(bill_data):
+        """ZIP 내 계약 건별 고지서 파일명 - 일련번호(계약자명).pdf"""
+        contract = bill_data['contract']
+        return f'{contract.serial_number}({contract.contractor.name}).pdf'
 
-    def get_bill_data(self, cont_id, payment_orders, now_due_order, pub_date, np, nl):
+    def get_bill_data(self, contract, loader, now_due_order, pub_date, np, nl):
         """
         :: 계약 건 당 전달 데이터 생성 함수
-        :param cont_id: 계약자 아이디
-        :param payment_orders: 전체 납부 회차
+        :param contract: 계약 건 (관련 객체 포함 조회)
+        :param loader: 고지서 일괄 발행 데이터 로더
         :param now_due_order: 금회 납부 회차
         :param pub_date: 발행일
         :param np: no price 가격 미표시 여부
@@ -411,9 +432,11 @@ class PdfExportBill(View):
         :return dict(bill_data: 계약 건당 데이터):
         """
         bill_data = {}  # 현재 계약 정보 딕셔너리
+        schedule = loader.schedule  # 납부기한 계산표
+        payment_orders = schedule.orders  # 전체 납부 회차
 
         # 계약 건 객체
-        bill_data['contract'] = contract = get_contract(cont_id)
+        bill_data['contract'] = contract
 
         try:
             unit = contract.keyunit.houseunit
@@ -452,7 +475,7 @@ class PdfExportBill(View):
         amount = {'1': down, '2': middle, '3': remain}
 
         # 납부목록, 완납금액 구하기 ------------------------------------------
-        paid_list, paid_sum_total = self.get_paid(contract)
+        paid_list, paid_sum_total = loader.get_paid(contract)
         # --------------------------------------------------------------
 
         # 해당 계약 건의 회차별 관련 정보
@@ -467,7 +490,7 @@ class PdfExportBill(View):
         # ■ 납부대금 안내 ----------------------------------------------
         bill_data['this_pay_info'] = self.get_this_pay_info(contract,
                                                             orders_info,
-                                                            payment_orders,
+                                                            schedule,
                                                             now_due_order,
                                                             paid_code)
 
@@ -486,18 +509,20 @@ class PdfExportBill(View):
         # ■ 납부약정 및 납입내역 -------------------------------------------
         # 기 도래한 약정 회차 내역
         bill_data['due_orders'] = self.get_due_orders(contract, orders_info,
-                                                      payment_orders, now_due_order,
-                                                      paid_code, pub_date, is_late_fee=False)
+                                                      schedule, now_due_order,
+                                                      paid_code, pub_date, paid_list,
+                                                      loader.late_fee_schedule, is_late_fee=False)
 
         # 미 도래한 약정 회차 내역
         bill_data['remain_orders'] = self.get_remain_orders(contract, orders_info,
-                                                            payment_orders, now_due_order)
+                                                            schedule, now_due_order)
 
         bill_data['paid_sum_total'] = paid_sum_total  # 기 납부 총액
         # 연체료 합계
         bill_data['late_fee_sum'] = self.get_due_orders(contract, orders_info,
-                                                        payment_orders, now_due_order,
-                                                        paid_code, pub_date, is_late_fee=True)
+                                                        schedule, now_due_order,
+                                                        paid_code, pub_date, paid_list,
+                                                        loader.late_fee_schedule, is_late_fee=True)
 
         # 표시 정보 제한 여부
         bill_data['no_price'] = np
@@ -509,29 +534,11 @@ class PdfExportBill(View):
 
         bill_data['blank_line'] = self.get_blank_line(unpaid_count,
                                                       pm_cost_sum,
-                                                      payment_orders.count())
+                                                      len(payment_orders))
 
         # --------------------------------------------------------------
         return bill_data
 
-    @staticmethod
-    def get_paid(contract):
-        """
-        :: ■ 기 납부금액 구하기
-        :param contract: 계약정보
-        :param pub_date: 발행일
-        :return list(paid_list: 납부 건 리스트), int(paid_sum_total: 납부 총액):
-        """
-        paid_list = ProjectCashBook.objects.filter(
-            income__isnull=False,
-            project_account_d3__in=(1, 4),  # 분(부)담금 or 분양수입금
-            contract=contract,
-        ).order_by('deal_date', 'id')  # 해당 계약 건 납부 데이터
-
-        paid_sum_total = paid_list.aggregate(Sum('income'))['income__sum']  # 완납 총금액
-        paid_sum_total = paid_sum_total if paid_sum_total else 0
-        return paid_list, paid_sum_total
-
     @staticmethod
     def get_orders_info(payment_orders, amount, paid_sum_total):
         """
@@ -545,12 +552,6 @@ class PdfExportBill(View):
         sum_pay_amount = 0  # 회당 납부 약정액 누계
         pm_cost_sum = 0  # PM 용역비 합계
 
-        # 지연가산금 관련 계산 시작 회차 ----------------------------------------------
-        try:
-            calc_start_code = payment_orders.filter(is_calc_start=True)[0].pay_code
-        except IndexError:
-            calc_start_code = 2
-
         for order in payment_orders:
             info = {'order': order}
             pay_amount = amount[order.pay_sort]  # 회당 납부 약정액
@@ -604,20 +605,20 @@ class PdfExportBill(View):
 
     @staticmethod
     def get_this_pay_info(contract,
-                          orders_info, payment_orders,
+                          orders_info, schedule,
                           now_due_order, paid_code):
         """
         :: ■ 납부대금 안내
         :param contract: 계약 정보
         :param orders_info: 회차별 부가정보
-        :param payment_orders: 회차 정보
+        :param schedule: 납부기한 계산표
         :param now_due_order: 당회 납부 회차
         :param paid_code: 완납 회차
         :return list(dict(order: 납부회차, due_date: 납부기한, amount: 약정금액, unpaid: 미납금액, penalty: 연체가산금, sum_amount: 납부금액)):
         """
         payment_list = []
-        unpaid_orders = payment_orders.filter(pay_code__gt=paid_code,
-                                              pay_code__lte=now_due_order)  # 최종 기납부회차 이후부터 납부지정회차 까지 회차그룹
+        unpaid_orders = [o for o in schedule.orders
+                         if paid_code < o.pay_code <= now_due_order]  # 최종 기납부회차 이후부터 납부지정회차 까지 회차그룹
         for order in unpaid_orders:
             ord_info = list(filter(lambda o: o['order'] == order, orders_info))[0]
 
@@ -627,7 +628,7 @@ class PdfExportBill(View):
 
             payment_dict = {
                 'order': order,
-                'due_date': get_due_date_per_order(contract, order, unpaid_orders),
+                'due_date': get_due_date_per_order(contract, order, schedule),
                 'amount': amount,
                 'unpaid': unpaid,
                 'penalty': penalty,
@@ -637,41 +638,42 @@ class PdfExportBill(View):
 
         return payment_list
 
-    def get_due_orders(self, contract, orders_info,
-                       payment_orders, now_due_order,
-                       paid_code, pub_date, is_late_fee=False):
+    @staticmethod
+    def get_due_orders(contract, orders_info,
+                       schedule, now_due_order,
+                       paid_code, pub_date, paid_list,
+                       late_fee_schedule, is_late_fee=False):
         """
         :: ■ 납부약정 및 납입내역 - 납입내역
         :param contract: 계약 건
         :param orders_info: 납부 회차별 부가정보
-        :param payment_orders: 전체 납부회차
+        :param schedule: 납부기한 계산표
         :param now_due_order: 금회 납부 회차
         :param paid_code: 완납회차
         :param pub_date: 발행일자
+        :param paid_list: 해당 계약 건 전체 납부 목록 -> [(income, deal_date), ...]
+        :param late_fee_schedule: 지연 가산금 계산표
         :param is_late_fee: 연체료 발행여부
         :return list(paid_list: 왼납 회차 목록):
         """
 
-        # 해당 계약 건 전체 납부 목록 -> [(income, deal_date), ...]
-        paid_list = [(p.income, p.deal_date) for p in self.get_paid(contract)[0]]
+        paid_list = list(paid_list)  # 회차별 납입금 계산 시 앞에서부터 소진하므로 복사
         paid_date = paid_list[0][1] if len(paid_list) > 0 else None
 
         # 전체 리턴 데이터 목록
         paid_amt_list = []
-        due_orders = payment_orders.filter(pay_code__lte=now_due_order)  # 금 회차까지 납부 회차
+        due_orders = [o for o in schedule.orders if o.pay_code <= now_due_order]  # 금 회차까지 납부 회차
 
         excess = 0  # 회차별 초과 납부분
         paid_amt_sum = 0  # 실 수납액 누계
 
         late_fee_sum = 0
 
-        try:
-            calc_start_code = payment_orders.filter(is_calc_start=True)[0].pay_code
-        except IndexError:
-            calc_start_code = 2
+        # 지연가산금 관련 계산 시작 회차
+        calc_start_code = schedule.calc_start or 2
 
         for order in due_orders:
-            due_date = get_due_date_per_order(contract, order, due_orders)  # 납부기한
+            due_date = get_due_date_per_order(contract, order, schedule)  # 납부기한
             ord_info = list(filter(lambda o: o['order'] == order, orders_info))[0]  # 금 회차 orders_info
             amount = ord_info['pay_amount']  # 금 회차 납부 약정액
 
@@ -720,8 +722,7 @@ class PdfExportBill(View):
                     except AttributeError:
                         unpaid_days = 0
 
-            project = contract.project
-            late_fee_sum += get_late_fee(project, unpaid_amt, unpaid_days)
+            late_fee_sum += late_fee_schedule.get_fee(unpaid_amt, unpaid_days)
 
             paid_dict = dict()
             paid_dict['order'] = order.pay_name
@@ -732,7 +733,7 @@ class PdfExportBill(View):
 
             paid_dict['unpaid_amt'] = unpaid_amt
             paid_dict['unpaid_days'] = unpaid_days
-            paid_dict['unpaid_result'] = get_late_fee(project, unpaid_amt, unpaid_days)
+            paid_dict['unpaid_result'] = late_fee_schedule.get_fee(unpaid_amt, unpaid_days)
 
             paid_dict['note'] = f'(+)' if unpaid_days else ''
             paid_amt_list.append(paid_dict)
@@ -756,17 +757,17 @@ class PdfExportBill(View):
         return '.' * blank_line
 
     @staticmethod
-    def get_remain_orders(contract, orders_info, payment_orders, now_due_order):
+    def get_remain_orders(contract, orders_info, schedule, now_due_order):
         """
         :: ■ 납부약정 및 납입내역 - 잔여회차
         :param contract: 계약 건
         :param orders_info: 납부 회차별 부가정보
-        :param payment_orders: 전체 납부 회차
+        :param schedule: 납부기한 계산표
         :param now_due_order: 금회 납부 회차
         :return list(dict(remain_amt_list)): 잔여 회차(dict) 목록:
         """
         remain_amt_list = []
-        remain_orders = payment_orders.filter(pay_code__gt=now_due_order)
+        remain_orders = [o for o in schedule.orders if o.pay_code > now_due_order]
 
         for order in remain_orders:
             ord_info = list(filter(lambda o: o['order'] == order, orders_info))[0]
@@ -774,7 +775,7 @@ class PdfExportBill(View):
 
             paid_dict = {
                 'order': order.pay_name,
-                'due_date': get_due_date_per_order(contract, order, remain_orders),
+                'due_date': get_due_date_per_order(contract, order, schedule),
                 'amount': amount,
                 'paid_date': '',
                 'paid_amt': 0,
@@ -804,7 +805,7 @@ class PdfExportPayments(View):
         pub_date = datetime.strptime(pub_date, '%Y-%m-%d').date() if pub_date else TODAY
         context['pub_date'] = pub_date
 
-        payment_orders = InstallmentPaymentOrder.objects.filter(project=project)  # 전체 납부회차 컬렉션
+        installments = InstallmentSchedule.for_project(project)  # 전체 납부회차 및 납부기한 계산표
 
         try:
             unit = contract.keyunit.houseunit
@@ -842,28 +843,21 @@ class PdfExportPayments(View):
         amount = {'1': down, '2': middle, '3': remain}
 
         # 2. 요약 테이블 데이터
-        context['due_amount'] = get_due_amount(payment_orders, contract, amount)  # 약정금 누계
+        context['due_amount'] = get_due_amount(installments, contract, amount)  # 약정금 누계
 
         # 3. 간단 차수 정보
-        context['simple_orders'] = simple_orders = get_simple_orders(payment_orders, contract, amount)
+        context['simple_orders'] = simple_orders = get_simple_orders(installments, contract, amount)
 
         # 4. 납부목록, 완납금액 구하기 ------------------------------------------
-        paid_dicts, paid_sum_total, calc_sums = get_paid(contract, simple_orders, pub_date, is_calc=calc)
+        late_fee = LateFeeSchedule.for_project(contract.project_id)  # 가산금 계산표
+        paid_dicts, paid_sum_total, calc_sums = get_paid(contract, simple_orders, pub_date,
+                                                         is_calc=calc, schedule=late_fee)
         context['paid_dicts'] = paid_dicts
         context['paid_sum_total'] = paid_sum_total  # paid_list.aggregate(Sum('income'))['income__sum']  # 기 납부총액
         context['calc_sums'] = calc_sums
         # ----------------------------------------------------------------
 
-        html_string = render_to_string('pdf/payments_by_contractor.html', context)
-
-        html = HTML(string=html_string)
-        html.write_pdf(target='/tmp/mypdf.pdf')
-
-        fs = FileSystemStorage('/tmp')
-        with fs.open('mypdf.pdf') as pdf:
-            response = HttpResponse(pdf, content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="payments_contractor.pdf"'
-            return response
+        return pdf_response('pdf/payments_by_contractor.html', context, 'payments_contractor.pdf')
 
 
 class PdfExportCalculation(View):
@@ -881,7 +875,7 @@ class PdfExportCalculation(View):
         pub_date = datetime.strptime(pub_date, '%Y-%m-%d').date() if pub_date else TODAY
         context['pub_date'] = pub_date
 
-        payment_orders = SpecialPaymentOrder.objects.filter(project=project)  # 전체 납부회차 컬렉션
+        installments = InstallmentSchedule.for_project(project, is_past=True)  # 종전 약정 납부회차 및 납부기한 계산표
 
         try:
             unit = contract.keyunit.houseunit
@@ -916,26 +910,18 @@ class PdfExportCalculation(View):
         context['due_amount'] = (down1 * 4) + down2  # 약정금 누계
 
         # 3. 간단 차수 정보
-        context['simple_orders'] = simple_orders = get_simple_orders(payment_orders, contract, amount, True)
+        context['simple_orders'] = simple_orders = get_simple_orders(installments, contract, amount, True)
 
         # 4. 납부목록, 완납금액 구하기 ------------------------------------------
+        late_fee = LateFeeSchedule.for_project(contract.project_id, is_past=True)  # 종전 약정 가산금 계산표
         paid_dicts, paid_sum_total, calc_sums = get_paid(contract, simple_orders, pub_date,
-                                                         is_calc=True, is_past=True)
+                                                         is_calc=True, is_past=True, schedule=late_fee)
         context['paid_dicts'] = paid_dicts
         context['paid_sum_total'] = paid_sum_total  # pad_list.aggregate(Sum('income'))['income__sum']  # 기 납부총액
         context['calc_sums'] = calc_sums
         # ----------------------------------------------------------------
 
-        html_string = render_to_string('pdf/calculation_by_contractor.html', context)
-
-        html = HTML(string=html_string)
-        html.write_pdf(target='/tmp/mypdf.pdf')
-
-        fs = FileSystemStorage('/tmp')
-        with fs.open('mypdf.pdf') as pdf:
-            response = HttpResponse(pdf, content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="calculation_contractor.pdf"'
-            return response
+        return pdf_response('pdf/calculation_by_contractor.html', context, 'calculation_contractor.pdf')
 
     @staticmethod
     def get_down_pay(contract):
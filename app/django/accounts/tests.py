@@ -1,3 +1,34 @@
-from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from project.testing import create_test_project
+from .models import StaffAuth
+
+
+class UserStreamTests(APITestCase):
+    """사용자 목록 대량 스트리밍(?stream=) 권한 확인"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, project = create_test_project()
+        cls.auth = StaffAuth.objects.create(user=cls.user, company=project.issue_project.company)
+
+    def get_stream(self):
+        return self.client.get(reverse('api:user-list'), {'stream': 'ndjson'})
+
+    def test_anonymous_denied(self):
+        self.assertIn(self.get_stream().status_code, (401, 403))
+
+    def test_non_staff_denied(self):
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.get_stream().status_code, 403)
+
+    def test_staff_without_superuser_flag(self):
+        self.auth.is_staff = True
+        self.auth.save()
+        self.client.force_authenticate(user=self.user)
+        response = self.get_stream()
+        self.assertEqual(response.status_code, 200)
+        content = b''.join(response.streaming_content).decode()
+        self.assertIn('"email": "test@test.com"', content)
+        self.assertNotIn('is_superuser', content)
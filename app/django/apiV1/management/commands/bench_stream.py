@@ -0,0 +1,148 @@
+import time
+import tracemalloc
+from urllib.parse import urlsplit, parse_qsl
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import CharField
+from django.urls import resolve
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ('목록 API 의 페이지 단위 JSON 조회와 ?stream=ndjson|csv 대량 조회 성능 비교\n'
+            '예) python manage.py bench_stream "/api/v1/project-cashbook/?project=1" --rows 50000')
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help='목록 API 경로 (쿼리 스트링 포함 가능)')
+        parser.add_argument('--rows', type=int, default=0,
+                            help='대상 행 수 - 부족한 만큼 기존 행을 복제하여 측정 후 롤백 (0: 기존 데이터만 사용)')
+        parser.add_argument('--template', type=int, help='복제할 행 pk (기본값: 마지막 행)')
+        parser.add_argument('--user', type=int, help='요청 사용자 pk (기본값: 첫 번째 superuser)')
+        parser.add_argument('--skip-json', action='store_true', help='페이지 단위 JSON 조회 측정 생략')
+        parser.add_argument('--memory', action='store_true',
+                            help='tracemalloc 으로 최대 메모리 사용량 측정 (한 번 더 실행하며 측정 오버헤드가 크다)')
+
+    def handle(self, *args, **options):
+        url = urlsplit(options['url'])
+        match = resolve(url.path)
+        view_class = getattr(match.func, 'cls', None)
+        if view_class is None or not hasattr(view_class, 'stream_fields'):
+            raise CommandError(f'{url.path} 는 대량 조회 스트리밍을 지원하는 목록 API 가 아닙니다.')
+
+        user_model = get_user_model()
+        user = user_model.objects.filter(pk=options['user']) if options['user'] \
+            else user_model.objects.filter(is_superuser=True)
+        self.user = user.first()
+        self.view = match.func
+        self.path = url.path
+        self.query = url.query
+        self.memory = options['memory']
+
+        try:
+            with transaction.atomic():
+                if options['rows']:
+                    self.fill_rows(view_class.queryset.model, options['rows'], options['template'])
+                results = []
+                if not options['skip_json']:
+                    results.append(self.measure('json (paginated)', self.read_pages, view_class))
+                results.append(self.measure('ndjson (stream)', self.read_stream, 'ndjson'))
+                results.append(self.measure('csv (stream)', self.read_stream, 'csv'))
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.stdout.write(f'{"mode":<18}{"rows":>9}{"requests":>10}{"queries":>9}{"seconds":>10}'
+                          f'{"peak MB":>10}{"bytes":>14}')
+        for mode, rows, requests, queries, seconds, peak, size in results:
+            peak = f'{peak / 1024 / 1024:.1f}' if peak is not None else '-'
+            self.stdout.write(f'{mode:<18}{rows:>9}{requests:>10}{queries:>9}{seconds:>10.2f}{peak:>10}{size:>14,}')
+
+    def fill_rows(self, model, rows, template):
+        """행 수가 부족하면 기존 행을 복제하여 채운다. (handle 의 트랜잭션과 함께 롤백)"""
+        count = model.objects.count()
+        if count >= rows:
+            return
+        source = model.objects.filter(pk=template).first() if template else model.objects.order_by('pk').last()
+        if source is None:
+            raise CommandError('복제할 행이 없습니다.')
+        fields = [f for f in model._meta.concrete_fields if not f.primary_key]
+        values = {f.attname: getattr(source, f.attname) for f in fields}
+        unique_fields = [f.attname for f in fields if f.unique and isinstance(f, CharField)]  # 일련번호 등
+
+        def clone(i):
+            return model(**dict(values, **{name: f'{values[name]}-{i}'[-model._meta.get_field(name).max_length:]
+                                           for name in unique_fields}))
+
+        for start in range(count, rows, 5000):
+            model.objects.bulk_create([clone(i) for i in range(start, min(start + 5000, rows))])
+        self.stdout.write(f'{model._meta.label}: {count} -> {rows} 행 (측정 후 롤백)')
+
+    def get(self, query):
+        request = APIRequestFactory().get(self.path, query)
+        if self.user is not None:
+            force_authenticate(request, user=self.user)
+        return self.view(request)
+
+    def measure(self, mode, func, *args):
+        """실행 시간과 쿼리 수를 측정하고 --memory 지정 시 다시 실행하여 최대 메모리 사용량 측정"""
+        queries = []
+
+        def count_query(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        with connection.execute_wrapper(count_query):
+            rows, requests, size = func(*args)
+        seconds = time.perf_counter() - start
+
+        peak = None
+        if self.memory:
+            tracemalloc.start()
+            try:
+                func(*args)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        return mode, rows, requests, len(queries), seconds, peak, size
+
+    def base_query(self):
+        return dict(parse_qsl(self.query, keep_blank_values=True))
+
+    def read_pages(self, view_class):
+        """페이지 단위 JSON 조회 - 다음 페이지가 없을 때까지 반복"""
+        query = self.base_query()
+        size_param = getattr(view_class.pagination_class, 'page_size_query_param', None)
+        if size_param:
+            query[size_param] = getattr(view_class.pagination_class, 'max_page_size', None) or 3000
+        rows = requests = size = 0
+        page = 1
+        while True:
+            response = self.get(dict(query, page=page))
+            response.render()
+            requests += 1
+            size += len(response.content)
+            data = response.data
+            if isinstance(data, dict) and 'results' in data:
+                rows += len(data['results'])
+                if not data.get('next'):
+                    break
+                page += 1
+            else:
+                rows += len(data)
+                break
+        return rows, requests, size
+
+    def read_stream(self, stream):
+        response = self.get(dict(self.base_query(), stream=stream))
+        rows = size = 0
+        for block in response.streaming_content:
+            rows += block.count(b'\n')
+            size += len(block)
+        return (rows - 1 if stream == 'csv' else rows), 1, size
@@ -222,20 +222,6 @@ class ProjectCashBookInContractSerializer(serializers.ModelSerializer):
         fields = ('pk', 'deal_date', 'income', 'bank_account', 'trader', 'installment_order')
 
 
-class ProjectCashBookOrderInContractSerializer(serializers.ModelSerializer):
-    installment_order = SimpleInstallmentOrderSerializer()
-
-    class Meta:
-        model = ProjectCashBook
-        fields = ('installment_order',)
-
-
-class ProjectCashBookIncsInContractSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = ProjectCashBook
-        fields = ('income',)
-
-
 class ContractFileInContractSetSerializer(serializers.ModelSerializer):
     user = SimpleUserSerializer(read_only=True)
 
@@ -268,37 +254,39 @@ class ContractSetSerializer(serializers.ModelSerializer):
 
     @staticmethod
     def get_payment_list(instance):
-        return instance.payments.filter(project_account_d3__in=(1, 4))
+        if hasattr(instance, 'sales_payments'):  # 조회 쿼리셋에서 일괄 조회(Prefetch)한 납부 목록
+            return instance.sales_payments
+        return instance.payments.filter(project_account_d3__in=(1, 4)) \
+            .select_related('installment_order').order_by('deal_date', 'id')
 
     def get_payments(self, instance):  # 납부 분담금/분양대금 리스트
-        payments = self.get_payment_list(instance).order_by('deal_date', 'id')
-        return ProjectCashBookInContractSerializer(payments, many=True, read_only=True).data
+        return ProjectCashBookInContractSerializer(self.get_payment_list(instance), many=True, read_only=True).data
 
     def get_total_paid(self, instance):
-        inc_data = ProjectCashBookIncsInContractSerializer(self.get_payment_list(instance),
-                                                           many=True,
-                                                           read_only=True).data
-        return sum([inc.get('income') for inc in inc_data])
+        if hasattr(instance, 'total_paid'):  # 조회 쿼리셋의 납부 합계(Sum) 서브쿼리 값
+            return instance.total_paid
+        return sum(payment.income or 0 for payment in self.get_payment_list(instance))
 
-    def get_last_paid_order(self, instance):  # 완납 회차 구하기
+    def get_last_paid_order(self, instance):  # 완납 회차 구하기 - 납부 현황 테이블 조회
+        try:
+            order = instance.payment_status.last_paid_order
+        except ObjectDoesNotExist:  # 납부 현황이 아직 없는 계약(갱신 대기 중 등)은 직접 계산
+            order = self.calc_last_paid_order(instance)
+        return SimpleInstallmentOrderSerializer(order, read_only=True).data if order else None
+
+    def calc_last_paid_order(self, instance):  # 총 납부액이 누적 약정액 이상인 마지막 회차
         price = get_cont_price(instance)  # 분양가 [price, price_build, price_land, price_tax]
         amount = get_pay_amount(instance, price[0])  # 계약금, 중도금, 잔금
         total_paid = self.get_total_paid(instance)  # 총 납부액
 
         due_amt = 0  # 총 약정액
-        order_data = {}  # 회차 데이터
-        payment_orders = InstallmentPaymentOrder.objects.filter(project=instance.project)
-
-        for order in payment_orders:
-            sort = int(order.pay_sort) - 1
-            due_amt += amount[sort]  # 0: 계약금, 1: 중도금, 2: 잔금
-            if total_paid >= due_amt:
-                project_cash = ProjectCashBook.objects.filter(installment_order=order).first()
-                order_data = ProjectCashBookOrderInContractSerializer(project_cash, read_only=True).data
-            else:
+        last_order = None
+        for order in InstallmentPaymentOrder.objects.filter(project=instance.project):
+            due_amt += amount[int(order.pay_sort) - 1]  # 0: 계약금, 1: 중도금, 2: 잔금
+            if total_paid < due_amt:
                 break
-
-        return order_data.get('installment_order') if order_data else None
+            last_order = order
+        return last_order
 
     @transaction.atomic
     def create(self, validated_data):
@@ -0,0 +1,31 @@
+from rest_framework import serializers
+
+from _excel.models import ExportJob
+from _excel.jobs import get_export_view
+
+
+# Export Job --------------------------------------------------------------------------
+class ExportJobSerializer(serializers.ModelSerializer):
+    user = serializers.SlugRelatedField(slug_field='username', read_only=True)
+    status_desc = serializers.CharField(source='get_status_display', read_only=True)
+
+    class Meta:
+        model = ExportJob
+        fields = ('pk', 'user', 'export', 'params', 'status', 'status_desc', 'file_name', 'file_type',
+                  'file_size', 'error', 'created', 'started', 'finished')
+        read_only_fields = ('status', 'file_name', 'file_type', 'file_size', 'error',
+                            'created', 'started', 'finished')
+
+    @staticmethod
+    def validate_export(value):
+        try:
+            get_export_view(value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+        return value
+
+    @staticmethod
+    def validate_params(value):
+        if not isinstance(value, dict):
+            raise serializers.ValidationError('요청 파라미터는 객체(dict) 형식이어야 합니다.')
+        return value
@@ -2,7 +2,8 @@ from rest_framework import serializers
 
 from cash.models import ProjectBankAccount, ProjectCashBook
 from contract.models import OrderGroup, Contract, Contractor
-from payment.models import SalesPriceByGT, InstallmentPaymentOrder, DownPayment, OverDueRule
+from payment.models import (SalesPriceByGT, InstallmentPaymentOrder, DownPayment, OverDueRule,
+                            ContractPaymentStatus)
 from .items import SimpleUnitTypeSerializer
 
 
@@ -57,6 +58,19 @@ class PaymentSummarySerializer(serializers.ModelSerializer):
         fields = ('order_group', 'unit_type', 'paid_sum')
 
 
+class ContractPaymentStatusSerializer(serializers.ModelSerializer):
+    serial_number = serializers.CharField(source='contract.serial_number', read_only=True)
+    contractor = serializers.CharField(source='contract.contractor.name', read_only=True, default=None)
+    order_group = serializers.IntegerField(source='contract.order_group_id', read_only=True)
+    unit_type = serializers.IntegerField(source='contract.unit_type_id', read_only=True)
+    last_paid_order = SimpleInstallmentOrderSerializer(read_only=True)
+
+    class Meta:
+        model = ContractPaymentStatus
+        fields = ('pk', 'project', 'contract', 'serial_number', 'contractor', 'order_group', 'unit_type',
+                  'total_paid', 'last_paid_order', 'due_amount', 'unpaid_amount', 'overdue_days', 'as_of')
+
+
 class SalesPriceSerializer(serializers.ModelSerializer):
     class Meta:
         model = SalesPriceByGT
@@ -0,0 +1,78 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework import permissions
+from rest_framework.settings import api_settings
+
+from _excel.utils import ROW_CHUNK_SIZE, CSV_CONTENT_TYPE, iter_csv_lines, iter_values_list
+from .permission import IsStaffOnly
+
+NDJSON_CONTENT_TYPE = 'application/x-ndjson; charset=utf-8'
+
+
+def iter_ndjson_lines(rows, chunk_size=ROW_CHUNK_SIZE):
+    """
+    NDJSON 블록 이터레이터 - 한 줄에 JSON 객체 하나, chunk_size 행씩 묶어서 반환
+    :param rows: dict 행 이터레이터
+    """
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    lines = []
+    for row in rows:
+        lines.append(encoder.encode(row))
+        if len(lines) >= chunk_size:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+class BulkStreamMixin:
+    """
+    대량 조회 스트리밍 믹스인 (list 전용)
+    - ?stream=ndjson|csv 요청 시 시리얼라이저와 페이지네이션을 거치지 않고 stream_fields 의 행을
+      키셋 페이지네이션(iter_values_list)으로 chunk 단위로 읽는 대로 내보내므로 전체 건수와 무관하게 메모리 사용량이 일정하다.
+    - 필터, 검색, 정렬 파라미터는 일반 목록 조회와 동일하게 적용된다.
+      정렬 파라미터가 없으면 기본 정렬 대신 pk 순서로 내보내 기본키 인덱스만으로 키셋 조회한다.
+    - 전체 목록을 한 번에 내보내므로 뷰셋 권한과 별도로 stream_permission_classes(로그인한 스태프)를 요구한다.
+    """
+    stream_param = 'stream'
+    stream_permission_classes = (permissions.IsAuthenticated, IsStaffOnly)
+    stream_fields = ()  # values() 로 추출할 필드 (ORM 경로 또는 get_stream_queryset 의 annotate 이름)
+    stream_filename = None  # CSV 다운로드 파일명 (미지정 시 모델 이름)
+
+    def list(self, request, *args, **kwargs):
+        stream = request.query_params.get(self.stream_param)
+        if stream in ('ndjson', 'csv'):
+            self.check_stream_permissions(request)
+            queryset = self.get_stream_queryset(self.filter_queryset(self.get_queryset()))
+            if not request.query_params.get(api_settings.ORDERING_PARAM):
+                queryset = queryset.order_by('pk')
+            fields = self.stream_fields
+            rows = (dict(zip(fields, row)) for row in iter_values_list(queryset, *fields))
+            if stream == 'csv':
+                return self.get_csv_response(rows)
+            return StreamingHttpResponse(iter_ndjson_lines(rows), content_type=NDJSON_CONTENT_TYPE)
+        return super().list(request, *args, **kwargs)
+
+    def check_stream_permissions(self, request):
+        for permission in (permission() for permission in self.stream_permission_classes):
+            if not permission.has_permission(request, self):
+                self.permission_denied(request, message=getattr(permission, 'message', None),
+                                       code=getattr(permission, 'code', None))
+
+    def get_stream_queryset(self, queryset):
+        """스트리밍 전용 annotate 등 쿼리셋 추가 가공"""
+        return queryset
+
+    def get_csv_response(self, rows):
+        """헤더(필드명) 행 후 본문 행을 CSV 로 스트리밍"""
+        fields = self.stream_fields
+        filename = self.stream_filename or f'{self.get_queryset().model._meta.model_name}.csv'
+
+        def iter_rows():
+            yield fields
+            for row in rows:
+                yield [row[field] for field in fields]
+
+        response = StreamingHttpResponse(iter_csv_lines(iter_rows()), content_type=CSV_CONTENT_TYPE)
+        response['Content-Disposition'] = f'attachment; filename={filename}'
+        return response
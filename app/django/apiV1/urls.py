@@ -13,6 +13,7 @@ from .views import contract
 from .views import notice
 from .views import board
 from .views import docs
+from .views import export
 
 app_name = 'api'
 
@@ -98,6 +99,7 @@ router.register(r'option-item', items.OptionItemViewSet, basename='option-item')
 router.register(r'payment', payment.PaymentViewSet, basename='payment')  # only list
 router.register(r'all-payment', payment.AllPaymentViewSet, basename='all-payment')  # only list
 router.register(r'payment-sum', payment.PaymentSummaryViewSet, basename='payment-sum')  # only list
+router.register(r'payment-status', payment.ContractPaymentStatusViewSet)  # only list
 router.register(r'price', payment.SalesPriceViewSet)
 router.register(r'pay-order', payment.InstallmentOrderViewSet)
 router.register(r'down-payment', payment.DownPaymentViewSet)
@@ -158,9 +160,13 @@ router.register(r'link', docs.LinkViewSet)
 router.register(r'file', docs.FileViewSet)
 router.register(r'image', docs.ImageViewSet)
 router.register(r'docs-trash-can', docs.DocsInTrashViewSet, basename='docs-trash-can')
+# export
+router.register(r'export-job', export.ExportJobViewSet)
 
 urlpatterns = router.urls
 urlpatterns += [path('issue-by-member/', work.IssueCountByMemberView.as_view(), name='issue-by-member')]
+urlpatterns += [path('unit-grid/', items.UnitGridView.as_view(), name='unit-grid')]
+urlpatterns += [path('overdue-status/', payment.OverdueStatusView.as_view(), name='overdue-status')]
 
 urlpatterns += [path('admin-create-user/', accounts.AdminCreateUserView.as_view(), name='admin-create-user')]
 urlpatterns += [path('check-password/', accounts.CheckPasswordView.as_view(), name='check-password')]
@@ -172,3 +178,6 @@ urlpatterns += [
     path('post/<int:pk>/copy/', board.PostViewSet.as_view({'post': 'copy_and_create'}), name='post-copy')]
 urlpatterns += [
     path('docs/<int:pk>/copy/', docs.DocumentViewSet.as_view({'docs': 'copy_and_create'}), name='docs-copy')]
+urlpatterns += [
+    path('export-job/<int:pk>/download/', export.ExportJobViewSet.as_view({'get': 'download'}),
+         name='export-job-download')]
@@ -12,15 +12,17 @@ from rest_framework.views import APIView
 from ..pagination import *
 from ..permission import *
 from ..serializers.accounts import *
+from ..streaming import BulkStreamMixin
 
 
 # Accounts --------------------------------------------------------------------------
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(BulkStreamMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     pagination_class = PageNumberPaginationThreeThousand
     permission_classes = (permissions.AllowAny,)
     filterset_fields = ('is_staff', 'is_active',)
+    stream_fields = ('pk', 'email', 'username', 'is_active', 'is_staff', 'work_manager', 'date_joined', 'last_login')
 
 
 class StaffAuthViewSet(viewsets.ModelViewSet):
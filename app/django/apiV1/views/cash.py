@@ -1,5 +1,5 @@
 from datetime import datetime
-from django.db.models import Sum, F, Q, Case, When
+from django.db.models import Sum, F, Case, When
 from django.template.defaultfilters import default
 from rest_framework import viewsets
 from django_filters.rest_framework import FilterSet
@@ -8,6 +8,7 @@ from django_filters import DateFilter, BooleanFilter
 from ..permission import *
 from ..pagination import *
 from ..serializers.cash import *
+from ..streaming import BulkStreamMixin
 
 from cash.models import (BankCode, CompanyBankAccount, ProjectBankAccount,
                          CashBook, ProjectCashBook)
@@ -92,13 +93,17 @@ class CashBookFilterSet(FilterSet):
                   'account_d1', 'account_d2', 'account_d3', 'bank_account')
 
 
-class CashBookViewSet(viewsets.ModelViewSet):
+class CashBookViewSet(BulkStreamMixin, viewsets.ModelViewSet):
     queryset = CashBook.objects.all()
     serializer_class = CashBookSerializer
     pagination_class = PageNumberPaginationFifteen
     permission_classes = (permissions.IsAuthenticated, IsStaffOrReadOnly)
     filterset_class = CashBookFilterSet
     search_fields = ('content', 'trader', 'note')
+    stream_fields = ('pk', 'company', 'sort', 'sort__name', 'account_d1', 'account_d1__name',
+                     'account_d2', 'account_d2__name', 'account_d3', 'account_d3__name', 'is_separate',
+                     'separated', 'content', 'trader', 'bank_account', 'bank_account__alias_name',
+                     'income', 'outlay', 'evidence', 'note', 'deal_date')
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -208,13 +213,17 @@ class ProjectCashBookFilterSet(FilterSet):
                   'contract__order_group', 'contract__unit_type', 'no_contract', 'no_install')
 
 
-class ProjectCashBookViewSet(viewsets.ModelViewSet):
+class ProjectCashBookViewSet(BulkStreamMixin, viewsets.ModelViewSet):
     queryset = ProjectCashBook.objects.all()  # filter(is_imprest=False)
     serializer_class = ProjectCashBookSerializer
     permission_classes = (permissions.IsAuthenticated, IsProjectStaffOrReadOnly)
     pagination_class = PageNumberPaginationFifteen
     filterset_class = ProjectCashBookFilterSet
     search_fields = ('contract__contractor__name', 'content', 'trader', 'note')
+    stream_fields = ('pk', 'project', 'sort', 'sort__name', 'project_account_d2', 'project_account_d2__name',
+                     'project_account_d3', 'project_account_d3__name', 'is_separate', 'separated', 'is_imprest',
+                     'contract', 'installment_order', 'refund_contractor', 'content', 'trader',
+                     'bank_account', 'bank_account__alias_name', 'income', 'outlay', 'evidence', 'note', 'deal_date')
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -1,4 +1,5 @@
-from django.db.models import Count, Sum
+from django.db.models import Count, Sum, OuterRef, Subquery, Prefetch
+from django.db.models.functions import Coalesce
 from rest_framework import viewsets
 from django_filters.rest_framework import FilterSet
 from django_filters import ChoiceFilter, ModelChoiceFilter, DateFilter, BooleanFilter
@@ -6,11 +7,14 @@ from django_filters import ChoiceFilter, ModelChoiceFilter, DateFilter, BooleanF
 from ..permission import *
 from ..serializers.contract import *
 from ..pagination import PageNumberPaginationThreeThousand
+from ..streaming import BulkStreamMixin
 
 from contract.models import (OrderGroup, Contract, ContractPrice, Contractor,
                              ContractorAddress, ContractorContact,
-                             Succession, ContractorRelease)
+                             Succession, ContractorRelease, ContractFile)
+from cash.models import ProjectCashBook
 from items.models import BuildingUnit
+from payment.utils import get_cont_summary
 
 
 # Contract --------------------------------------------------------------------------
@@ -62,9 +66,38 @@ class ContractViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
 
 
-class ContractSetViewSet(ContractViewSet):
+class ContractSetViewSet(BulkStreamMixin, ContractViewSet):
     serializer_class = ContractSetSerializer
     pagination_class = PageNumberPaginationThreeThousand
+    ordering_fields = ContractViewSet.ordering_fields + ('payment_status__total_paid',
+                                                         'payment_status__unpaid_amount',
+                                                         'payment_status__overdue_days')
+    stream_fields = ('pk', 'project', 'order_group', 'order_group__sort', 'unit_type', 'serial_number',
+                     'activation', 'is_sup_cont', 'sup_cont_date', 'keyunit', 'keyunit__unit_code',
+                     'keyunit__houseunit', 'keyunit__houseunit__building_unit__name', 'keyunit__houseunit__name',
+                     'contractprice__price', 'contractprice__down_pay', 'contractprice__middle_pay',
+                     'contractprice__remain_pay', 'contractor', 'contractor__name', 'contractor__qualification',
+                     'contractor__status', 'contractor__reservation_date', 'contractor__contract_date',
+                     'contractor__is_active', 'total_paid')
+
+    def get_queryset(self):
+        # 계약 건 수와 관계없이 페이지당 쿼리 수가 일정하도록 관계 객체는 조인(select_related) 또는
+        # 일괄 조회(Prefetch)하고 납부 합계는 서브쿼리로 집계한다.
+        payments = ProjectCashBook.objects.filter(project_account_d3__in=(1, 4)) \
+            .select_related('installment_order').order_by('deal_date', 'id')
+        # 납부 분담금/분양대금 합계 - 계약 행이 중복되지 않도록 서브쿼리로 집계
+        paid = ProjectCashBook.objects.filter(contract=OuterRef('pk'), project_account_d3__in=(1, 4)) \
+            .order_by().values('contract').annotate(total=Sum('income')).values('total')
+        return super().get_queryset() \
+            .select_related('order_group', 'unit_type', 'contractprice', 'keyunit__houseunit__building_unit',
+                            'contractor__contractoraddress', 'contractor__contractorcontact',
+                            'payment_status__last_paid_order') \
+            .prefetch_related(Prefetch('payments', queryset=payments, to_attr='sales_payments'),
+                              Prefetch('contract_files', queryset=ContractFile.objects.select_related('user'))) \
+            .annotate(total_paid=Coalesce(Subquery(paid), 0))
+
+    def get_stream_queryset(self, queryset):
+        return queryset.prefetch_related(None)  # values() 행 스트리밍에는 관계 객체 일괄 조회 불필요
 
 
 class SimpleContractViewSet(ContractViewSet):
@@ -109,10 +142,7 @@ class ContSummaryViewSet(viewsets.ModelViewSet):
     filterset_class = ContSumFilter
 
     def get_queryset(self):
-        return Contract.objects.filter(activation=True, contractor__status=2) \
-            .values('order_group', 'unit_type') \
-            .annotate(conts_num=Count('order_group')) \
-            .annotate(price_sum=Sum('contractprice__price'))
+        return get_cont_summary()
 
 
 class ContractorViewSet(viewsets.ModelViewSet):
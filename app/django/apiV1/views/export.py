@@ -0,0 +1,42 @@
+from django.http import FileResponse
+from rest_framework import viewsets, mixins, status
+from rest_framework.response import Response
+
+from ..permission import *
+from ..serializers.export import *
+
+
+# Export Job --------------------------------------------------------------------------
+class ExportJobViewSet(mixins.CreateModelMixin,
+                       mixins.RetrieveModelMixin,
+                       mixins.ListModelMixin,
+                       mixins.DestroyModelMixin,
+                       viewsets.GenericViewSet):
+    """
+    백그라운드 내보내기 작업 - 등록(POST) 후 상태를 폴링(GET)하고 완료되면 download 로 결과 파일을 받는다.
+    """
+    queryset = ExportJob.objects.all()
+    serializer_class = ExportJobSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+    filterset_fields = ('export', 'status')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        return queryset if user.is_superuser else queryset.filter(user=user)
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    def perform_destroy(self, instance):
+        if instance.file:
+            instance.file.delete(save=False)
+        instance.delete()
+
+    def download(self, request, *args, **kwargs):
+        job = self.get_object()
+        if job.status != '3' or not job.file:
+            return Response({'detail': f'다운로드할 수 없는 작업 상태입니다. ({job.get_status_display()})'},
+                            status=status.HTTP_409_CONFLICT)
+        return FileResponse(job.file.open('rb'), as_attachment=True, filename=job.file_name,
+                            content_type=job.file_type or None)
@@ -1,14 +1,19 @@
 from datetime import datetime
 from django.db.models import Q
-from rest_framework import viewsets
+from rest_framework import viewsets, status
+from rest_framework.views import APIView
+from rest_framework.response import Response
 from django_filters.rest_framework import FilterSet
 from django_filters import BooleanFilter
 
 from ..permission import *
 from ..pagination import *
 from ..serializers.items import *
+from ..streaming import BulkStreamMixin
 
 from items.models import UnitType, UnitFloorType, KeyUnit, BuildingUnit, HouseUnit
+from items.utils import UnitGrid
+from project.models import Project
 
 TODAY = datetime.today().strftime('%Y-%m-%d')
 
@@ -84,9 +89,12 @@ class AvailableHouseUnitViewSet(HouseUnitViewSet):
         return queryset
 
 
-class AllHouseUnitViewSet(HouseUnitViewSet):
+class AllHouseUnitViewSet(BulkStreamMixin, HouseUnitViewSet):
     serializer_class = AllHouseUnitSerializer
     pagination_class = PageNumberPaginationThreeThousand
+    stream_fields = ('pk', 'unit_type', 'unit_type__sort', 'floor_type', 'building_unit', 'name',
+                     'key_unit', 'key_unit__contract', 'key_unit__contract__contractor',
+                     'key_unit__contract__contractor__status', 'bldg_line', 'floor_no', 'is_hold', 'hold_reason')
 
 
 class HouseUnitSummaryViewSet(viewsets.ModelViewSet):
@@ -97,6 +105,20 @@ class HouseUnitSummaryViewSet(viewsets.ModelViewSet):
                         'floor_type', 'building_unit', 'is_hold')
 
 
+class UnitGridView(APIView):
+    """
+    동호수 현황 그리드 - 프로젝트 전체 호수를 층 x 동 x 라인 배열로 한 번에 반환
+    """
+    permission_classes = (permissions.IsAuthenticated, IsProjectStaffOrReadOnly)
+
+    @staticmethod
+    def get(request, *args, **kwargs):
+        project = Project.objects.filter(pk=request.query_params.get('project')).first()
+        if project is None:
+            return Response({'detail': '프로젝트를 지정하여야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(UnitGrid(project).to_dict())
+
+
 class OptionItemViewSet(viewsets.ModelViewSet):
     queryset = OptionItem.objects.all()
     serializer_class = OptionItemSerializer
@@ -1,12 +1,16 @@
 from datetime import datetime
 
-from django.db.models import Sum, F
-from django_filters import DateFilter
+from django_filters import DateFilter, NumberFilter
 from django_filters.rest_framework import FilterSet
-from rest_framework import viewsets
+from rest_framework import viewsets, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from cash.models import ProjectCashBook
-from payment.models import SalesPriceByGT, InstallmentPaymentOrder, DownPayment, OverDueRule
+from payment.models import (SalesPriceByGT, InstallmentPaymentOrder, DownPayment, OverDueRule,
+                            ContractPaymentStatus)
+from payment.utils import get_paid_summary, OverdueCalculator
+from project.models import Project
 from .cash import ProjectCashBookViewSet
 from ..pagination import *
 from ..permission import *
@@ -45,15 +49,52 @@ class PaymentSummaryViewSet(viewsets.ModelViewSet):
     filterset_class = PaymentSumFilterSet
 
     def get_queryset(self):
-        return ProjectCashBook.objects.filter(income__isnull=False,
-                                              project_account_d3__in=(1, 4),
-                                              contract__activation=True,
-                                              contract__contractor__status=2) \
-            .order_by('contract__order_group', 'contract__unit_type') \
-            .annotate(order_group=F('contract__order_group')) \
-            .annotate(unit_type=F('contract__unit_type')) \
-            .values('order_group', 'unit_type') \
-            .annotate(paid_sum=Sum('income'))
+        return get_paid_summary()
+
+
+class PaymentStatusFilterSet(FilterSet):
+    unpaid_amount__gt = NumberFilter(field_name='unpaid_amount', lookup_expr='gt', label='미납액 초과')
+    overdue_days__gte = NumberFilter(field_name='overdue_days', lookup_expr='gte', label='연체일수 이상')
+
+    class Meta:
+        model = ContractPaymentStatus
+        fields = ('project', 'contract__order_group', 'contract__unit_type', 'contract__activation',
+                  'contract__contractor__status', 'unpaid_amount__gt', 'overdue_days__gte')
+
+
+class ContractPaymentStatusViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    계약 건별 납부 현황 - 수납/가격 변경 시 갱신되는 ContractPaymentStatus 테이블 조회
+    (예: ?project=1&unpaid_amount__gt=0&ordering=-overdue_days)
+    """
+    queryset = ContractPaymentStatus.objects.select_related('contract__contractor', 'last_paid_order')
+    serializer_class = ContractPaymentStatusSerializer
+    permission_classes = (permissions.IsAuthenticated, IsProjectStaffOrReadOnly)
+    pagination_class = PageNumberPaginationThreeThousand
+    filterset_class = PaymentStatusFilterSet
+    search_fields = ('contract__serial_number', 'contract__contractor__name')
+    ordering_fields = ('overdue_days', 'unpaid_amount', 'due_amount', 'total_paid', 'contract__serial_number')
+
+
+class OverdueStatusView(APIView):
+    """
+    계약 건별 연체/선납 현황 - 기준일(date) 현재 프로젝트 전체 계약 건의 약정금/납부 누계, 연체일수, 가산금/할인금
+    """
+    permission_classes = (permissions.IsAuthenticated, IsProjectStaffOrReadOnly)
+
+    @staticmethod
+    def get(request, *args, **kwargs):
+        project = Project.objects.filter(pk=request.query_params.get('project')).first()
+        if project is None:
+            return Response({'detail': '프로젝트를 지정하여야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+        date = request.query_params.get('date')
+        try:
+            date = datetime.strptime(date, '%Y-%m-%d').date() if date else None
+        except ValueError:
+            return Response({'detail': '기준일(date) 형식이 올바르지 않습니다. (예: 2024-01-31)'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        calculator = OverdueCalculator(project, date)
+        return Response({'date': calculator.date, 'totals': calculator.get_totals(), 'results': calculator.rows})
 
 
 # class ContNumByTypeViewSet(viewsets.ModelViewSet):
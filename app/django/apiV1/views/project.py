@@ -1,11 +1,14 @@
 from datetime import datetime
 
-from django.db.models import Sum, F, Case, When
+from django.db.models import Sum
 from rest_framework import viewsets
 
 from ..pagination import *
 from ..permission import *
 from ..serializers.project import *
+from ..streaming import BulkStreamMixin
+
+from project.utils import get_out_budgets, get_exec_amounts
 
 TODAY = datetime.today().strftime('%Y-%m-%d')
 
@@ -34,6 +37,7 @@ class ProjectOutBudgetViewSet(viewsets.ModelViewSet):
 
 
 class StatusOutBudgetViewSet(ProjectOutBudgetViewSet):
+    queryset = get_out_budgets().prefetch_related('account_d2__pro_d3s')
     serializer_class = StatusOutBudgetSerializer
 
 
@@ -45,25 +49,7 @@ class ExecAmountToBudgetViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         request_date = self.request.query_params.get('date')
-        date = request_date if request_date else TODAY
-        month_first = datetime(datetime.strptime(date, '%Y-%m-%d').year,
-                               datetime.strptime(date, '%Y-%m-%d').month,
-                               1).strftime('%Y-%m-%d')
-
-        queryset = ProjectCashBook.objects.filter(income=None) \
-            .order_by('project_account_d3') \
-            .filter(is_separate=False,  # 상세 분리 기록 = False (중복 방지)
-                    project_account_d3__d2__gte=8,  # 비용 계정 범위 시작
-                    project_account_d3__d2__lte=15,  # 비용 계정 범위 종료
-                    deal_date__lte=date)
-
-        return queryset.annotate(acc_d3=F('project_account_d3')) \
-            .values('acc_d3') \
-            .annotate(all_sum=Sum('outlay'),
-                      month_sum=Sum(Case(
-                          When(deal_date__gte=month_first, then=F('outlay')),
-                          default=0
-                      )))
+        return get_exec_amounts(request_date if request_date else TODAY)
 
 
 class TotalSiteAreaViewSet(viewsets.ModelViewSet):
@@ -116,11 +102,12 @@ class SiteOwnerViewSet(viewsets.ModelViewSet):
         serializer.save(user=self.request.user)
 
 
-class AllOwnerViewSet(SiteOwnerViewSet):
+class AllOwnerViewSet(BulkStreamMixin, SiteOwnerViewSet):
     queryset = SiteOwner.objects.all().order_by('id')
     serializer_class = AllOwnerSerializer
     pagination_class = PageNumberPaginationOneThousand
     filterset_fields = ('project',)
+    stream_fields = ('pk', 'owner')
 
 
 class SiteRelationViewSet(viewsets.ModelViewSet):
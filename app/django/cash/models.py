@@ -70,6 +70,8 @@ class CashBook(models.Model):
 
     class Meta:
         ordering = ['-deal_date', '-id']
+        # 기본 정렬 및 엑셀 내보내기(거래일자, id) 키셋 조회용 - InnoDB 보조 인덱스는 끝에 기본키를 포함한다.
+        indexes = [models.Index(fields=['company', 'deal_date'])]
         verbose_name = '02. 본사 입출금거래'
         verbose_name_plural = '02. 본사 입출금거래'
 
@@ -140,6 +142,9 @@ class ProjectCashBook(models.Model):
 
     class Meta:
         ordering = ['-deal_date', '-id']
+        # 기본 정렬 및 엑셀 내보내기(거래일자, 등록일시) 키셋 조회용
+        indexes = [models.Index(fields=['project', 'deal_date']),
+                   models.Index(fields=['project', 'deal_date', 'created_at'])]
         verbose_name = '04. 프로젝트 입출금거래'
         verbose_name_plural = '04. 프로젝트 입출금거래'
 
@@ -1,3 +1,109 @@
-from django.test import TestCase
+from datetime import date, timedelta
 
-# Create your tests here.
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from cash.models import BankCode, ProjectBankAccount, ProjectCashBook
+from ibs.models import AccountSort, AccountSubD1, ProjectAccountD2, ProjectAccountD3
+from items.models import UnitType, UnitFloorType, KeyUnit, BuildingUnit, HouseUnit
+from payment.models import InstallmentPaymentOrder, ContractPaymentStatus
+from payment.utils import update_payment_status
+from project.testing import create_test_project
+from .models import (OrderGroup, Contract, ContractPrice, Contractor,
+                     ContractorAddress, ContractorContact, ContractFile)
+
+
+class ContractSetQueryTests(APITestCase):
+    """계약 목록(contract-set) 조회 쿼리 수가 계약 건 수와 관계없이 일정한지 확인"""
+
+    # 프로젝트 필터 조회, 페이지 건수 조회, 계약 목록(관계 객체 조인 + 납부 합계 서브쿼리), 납부 목록, 계약 파일 목록
+    page_queries = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, cls.project = user, project = create_test_project()
+
+        sort = AccountSort.objects.create(name='입금')
+        d1 = AccountSubD1.objects.create(code='1', name='분양수입', description='분양수입')
+        d2 = ProjectAccountD2.objects.create(d1=d1, code='1', name='분양대금')
+        d3s = {pk: ProjectAccountD3.objects.create(pk=pk, sort=sort, d2=d2, code=str(pk), name=f'계정{pk}')
+               for pk in (1, 2, 4)}
+        bank = ProjectBankAccount.objects.create(project=project, alias_name='분양대금',
+                                                 bankcode=BankCode.objects.create(code='001', name='은행'))
+
+        order_group = OrderGroup.objects.create(project=project, order_number=1, order_group_name='일반분양')
+        unit_type = UnitType.objects.create(project=project, sort='1', name='84A', color='#ffffff',
+                                            num_unit=10, average_price=500000000)
+        floor_type = UnitFloorType.objects.create(project=project, sort='1', start_floor=1, end_floor=30,
+                                                  alias_name='기준층')
+        building = BuildingUnit.objects.create(project=project, name='101')
+        orders = [InstallmentPaymentOrder.objects.create(project=project, pay_sort=pay_sort, pay_code=pay_code,
+                                                         pay_time=1, pay_name=f'{pay_code}회차')
+                  for pay_sort, pay_code in (('1', 1), ('1', 2), ('2', 3), ('3', 4))]
+
+        cls.contracts = []
+        for i in range(12):
+            contract = Contract.objects.create(project=project, order_group=order_group, unit_type=unit_type,
+                                               serial_number=f'TEST-{i:02d}', user=user)
+            contractor = Contractor.objects.create(contract=contract, name=f'계약자{i}', status='2',
+                                                   contract_date=date(2023, 1, 10) + timedelta(days=i))
+            ContractorAddress.objects.create(contractor=contractor, id_zipcode='00000', id_address1='주소',
+                                             dm_zipcode='00000', dm_address1='주소')
+            ContractorContact.objects.create(contractor=contractor, cell_phone='010-0000-0000')
+            ContractPrice.objects.create(contract=contract, price=500000000, down_pay=25000000,
+                                         middle_pay=50000000, remain_pay=400000000)
+            key_unit = KeyUnit.objects.create(project=project, unit_type=unit_type, unit_code=f'{i}',
+                                              contract=contract)
+            HouseUnit.objects.create(unit_type=unit_type, floor_type=floor_type, building_unit=building,
+                                     name=f'{i + 1}01', key_unit=key_unit, bldg_line=1, floor_no=i + 1)
+            ContractFile.objects.create(contract=contract, file_name=f'계약서{i}.pdf', user=user)
+            for k in range(i % 4):  # 계약 건별 0 ~ 3건 납부
+                ProjectCashBook.objects.create(project=project, sort=sort, project_account_d2=d2,
+                                               project_account_d3=d3s[1], contract=contract, bank_account=bank,
+                                               installment_order=orders[k], income=25000000,
+                                               deal_date=date(2023, 2, 1) + timedelta(days=k))
+            ProjectCashBook.objects.create(project=project, sort=sort, project_account_d2=d2,
+                                           project_account_d3=d3s[2], contract=contract, bank_account=bank,
+                                           income=1000000, deal_date=date(2023, 2, 1))  # 분양대금 외 수납
+            cls.contracts.append(contract)
+
+        # 납부 현황은 커밋 후 갱신되므로(테스트 트랜잭션은 커밋되지 않음) 직접 재계산
+        update_payment_status(contract.pk for contract in cls.contracts)
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+
+    def get_page(self, page_size):
+        url = reverse('api:cont-set-list')
+        return self.client.get(url, {'project': self.project.pk, 'limit': page_size})
+
+    def test_fixed_query_count(self):
+        for page_size in (1, 5, 12):
+            with self.subTest(page_size=page_size), self.assertNumQueries(self.page_queries):
+                response = self.get_page(page_size)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data['results']), page_size)
+
+    def test_payment_fields(self):
+        results = {row['serial_number']: row for row in self.get_page(12).data['results']}
+        for i, contract in enumerate(self.contracts):
+            with self.subTest(contract=contract.serial_number):
+                row = results[contract.serial_number]
+                self.assertEqual(row['total_paid'], 25000000 * (i % 4))
+                self.assertEqual([payment['income'] for payment in row['payments']], [25000000] * (i % 4))
+                paid_order = row['last_paid_order']
+                self.assertEqual(paid_order['pay_name'] if paid_order else None,
+                                 (None, '1회차', '2회차', '2회차')[i % 4])  # 3건 납부 시 3회차(중도금) 약정액 미달
+                self.assertEqual(row['keyunit']['houseunit']['__str__'], f'101-{i + 1}01')
+                self.assertEqual(row['contractor']['contractorcontact']['cell_phone'], '010-0000-0000')
+                self.assertEqual(len(row['contract_files']), 1)
+
+    def test_last_paid_order_without_status(self):
+        # 납부 현황 행이 아직 없는 계약 건은 납부 합계와 회차별 약정액으로 완납 회차를 계산한다.
+        ContractPaymentStatus.objects.filter(contract__in=self.contracts).delete()
+        results = {row['serial_number']: row for row in self.get_page(12).data['results']}
+        for i, contract in enumerate(self.contracts):
+            with self.subTest(contract=contract.serial_number):
+                paid_order = results[contract.serial_number]['last_paid_order']
+                self.assertEqual(paid_order['pay_name'] if paid_order else None,
+                                 (None, '1회차', '2회차', '2회차')[i % 4])
@@ -0,0 +1,64 @@
+from .models import HouseUnit
+
+
+class UnitGrid:
+    """
+    프로젝트 동호수 배치 그리드
+    - 프로젝트의 모든 호수를 계약/계약자 상태와 함께 한 번의 쿼리로 가져와
+      (동, 층, 라인) 키로 배치하여 동호수 현황표(엑셀)와 API 가 같은 데이터를 사용한다.
+    """
+    fields = ('pk', 'building_unit', 'building_unit__name', 'floor_no', 'bldg_line', 'name', 'is_hold',
+              'unit_type', 'unit_type__name', 'unit_type__color', 'key_unit__contract',
+              'key_unit__contract__contractor__status', 'key_unit__contract__contractor__name')
+
+    def __init__(self, project):
+        units = HouseUnit.objects.filter(building_unit__project=project) \
+            .order_by('building_unit', '-floor_no', 'bldg_line') \
+            .values_list(*self.fields)
+
+        self.units = {}  # (building pk, floor_no, bldg_line) -> unit dict
+        buildings = {}  # building pk -> {'pk', 'name', 'lines'}
+        self.max_floor = 1  # 프로젝트 최고 층수
+        for (pk, bldg, bldg_name, floor, line, name, is_hold,
+             unit_type, type_name, color, contract, status, contractor) in units:
+            building = buildings.setdefault(bldg, {'pk': bldg, 'name': bldg_name, 'lines': set()})
+            building['lines'].add(line)
+            self.max_floor = max(self.max_floor, floor)
+            self.units[(bldg, floor, line)] = {
+                'pk': pk,
+                'name': name,
+                'unit_type': unit_type,
+                'type_name': type_name,
+                'color': color,
+                'is_hold': is_hold,
+                'contract': contract,
+                'status': status,  # 계약자 상태 (계약 유닛 미지정 시 None)
+                'contractor': contractor,
+            }
+
+        self.buildings = [dict(b, lines=sorted(b['lines'])) for _, b in sorted(buildings.items())]
+
+    @property
+    def floors(self):
+        """최고층부터 1층까지 층 번호"""
+        return range(self.max_floor, 0, -1)
+
+    def get_unit(self, building, floor, line):
+        """해당 위치의 호수 정보 (없으면 None)"""
+        return self.units.get((building, floor, line))
+
+    def get_rows(self):
+        """
+        층 단위 밀집 배열
+        :return: [{'floor': 층, 'units': [[동별 라인 순 호수 정보 | None, ...], ...]}, ...]
+        """
+        return [{'floor': floor,
+                 'units': [[self.get_unit(b['pk'], floor, line) for line in b['lines']] for b in self.buildings]}
+                for floor in self.floors]
+
+    def to_dict(self):
+        return {
+            'max_floor': self.max_floor,
+            'buildings': self.buildings,
+            'rows': self.get_rows(),
+        }
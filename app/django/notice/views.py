@@ -1,5 +1,4 @@
 from django.db import transaction
-from django.db.models import Sum
 from django.shortcuts import redirect, render
 from django.urls import reverse_lazy
 from datetime import datetime
@@ -10,10 +9,9 @@ from django.views.generic import ListView, FormView
 from .models import SalesBillIssue
 from .forms import SalesBillIssueForm
 from project.models import Project
-from items.models import UnitType, BuildingUnit, HouseUnit
+from items.models import UnitType, BuildingUnit
 from contract.models import OrderGroup, Contractor
-from cash.models import ProjectCashBook
-from payment.models import SalesPriceByGT, InstallmentPaymentOrder, DownPayment
+from payment.models import SalesPriceByGT, InstallmentPaymentOrder, DownPayment, ContractPaymentStatus
 
 TODAY = datetime.today().strftime('%Y-%m-%d')
 
@@ -115,14 +113,18 @@ class BillManageView(LoginRequiredMixin, ListView, FormView):
         # 계약자별 납부상태 구하기 + 계약자별 현 회차 상태(완납회차 계산)
         now_pay_code = self.get_bill_issue().now_payment_order.pay_code if self.get_bill_issue() else 2  # 현재 납부해야 하는 회차
 
+        # 계약 건별 총 납입액 및 완납 회차 - 납부 현황 테이블 조회
+        statuses = ContractPaymentStatus.objects.filter(
+            contract__in=[contractor.contract_id for contractor in paginate_queryset]).select_related('last_paid_order')
+        statuses = {status.contract_id: status for status in statuses}
+
         total_pay_by_contract = []
         amounts = []
         paid_order = []
         for contractor in paginate_queryset:
             contract = contractor.contract
-            payment_by_cont = ProjectCashBook.objects.filter(income__isnull=False,
-                                                             project_account_d3__in=(1, 4),
-                                                             contract=contract).aggregate(Sum('income'))['income__sum']
+            status = statuses.get(contract.pk)
+            payment_by_cont = status.total_paid if status else None
             total_pay_by_contract.append(payment_by_cont)  # 계약자별 총 납입액 배열화
             try:  # 동호수 지정여부
                 unit_set = contract.keyunit.houseunit
@@ -148,7 +150,6 @@ class BillManageView(LoginRequiredMixin, ListView, FormView):
 
             pay_by_order = 0  # 회차별 납입액 합계
             payid_by = payment_by_cont if payment_by_cont else 0  # 해당 계약건 총 기납입액
-            pbo_string = '계약금미납'
             balance_order = all_pay_order.filter(pay_sort='3')
             for apo in all_pay_order:
 
@@ -165,9 +166,7 @@ class BillManageView(LoginRequiredMixin, ListView, FormView):
                     if apo.pay_code <= now_pay_code:
                         now_pay += down_payment
                     pay_by_order += down_payment  # 회차별 납입액 가산
-                    if payid_by >= pay_by_order:
-                        pbo_string = apo.pay_name
-                    else:
+                    if payid_by < pay_by_order:
                         break
 
                 if apo.pay_sort == '2':  # 중도금일때
@@ -175,9 +174,7 @@ class BillManageView(LoginRequiredMixin, ListView, FormView):
                     pay_by_order += medium_amount  # 회차별 납입액 가산
                     if apo.pay_code <= now_pay_code:
                         now_pay += down_payment
-                    if payid_by >= pay_by_order:
-                        pbo_string = apo.pay_name
-                    else:
+                    if payid_by < pay_by_order:
                         break
 
                 if apo.pay_sort == '3':  # 잔금일때
@@ -185,12 +182,11 @@ class BillManageView(LoginRequiredMixin, ListView, FormView):
                     pay_by_order += balance_amount  # 회차별 납입액 가산
                     if apo.pay_code <= now_pay_code:
                         now_pay += down_payment
-                    if payid_by >= pay_by_order:
-                        pbo_string = apo.pay_name
-                    else:
+                    if payid_by < pay_by_order:
                         break
 
-            paid_order.append(pbo_string)
+            last_paid_order = status.last_paid_order if status else None
+            paid_order.append(last_paid_order.pay_name if last_paid_order else '계약금미납')
             amounts.append(now_pay)
         context['total_pay_by_contract'] = list(reversed(total_pay_by_contract))
         context['amounts'] = list(reversed(amounts))
@@ -5,3 +5,6 @@ class PaymentConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'payment'
     verbose_name = '수납 관련 정보 설정'
+
+    def ready(self):
+        import payment.signals
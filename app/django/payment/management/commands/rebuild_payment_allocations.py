@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from contract.models import Contract
+from payment.utils import rebuild_allocations, refresh_payment_status
+
+
+class Command(BaseCommand):
+    help = '수납 회차 배분 내역(PaymentAllocation) 및 계약 건별 납부 현황(ContractPaymentStatus) 일괄 재생성'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--project', type=int, nargs='*', help='재생성할 프로젝트 pk (없으면 전체)')
+        parser.add_argument('--chunk-size', type=int, default=500, help='한 번에 재생성할 계약 건 수')
+
+    def handle(self, *args, **options):
+        contracts = Contract.objects.order_by('pk')
+        if options['project']:
+            contracts = contracts.filter(project__in=options['project'])
+        contract_ids = list(contracts.values_list('pk', flat=True))
+
+        chunk_size = options['chunk_size']
+        created = 0
+        for start in range(0, len(contract_ids), chunk_size):
+            chunk = contract_ids[start:start + chunk_size]
+            created += rebuild_allocations(chunk)
+            refresh_payment_status(chunk)
+        self.stdout.write(f'rebuilt {created} allocations for {len(contract_ids)} contracts')
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+
+from contract.models import Contract
+from payment.utils import refresh_payment_status, run_payment_rebuilds
+
+
+class Command(BaseCommand):
+    help = ('계약 건별 납부 현황(ContractPaymentStatus) 기준일 갱신 - 약정액/미납액/연체일수 반영을 위해 매일 실행\n'
+            '대기 중인 프로젝트 재계산(PaymentStatusRebuild)을 먼저 처리한다.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--project', type=int, nargs='*', help='갱신할 프로젝트 pk (없으면 전체)')
+        parser.add_argument('--date', help='기준일 (YYYY-MM-DD, 없으면 오늘)')
+
+    def handle(self, *args, **options):
+        rebuilt = run_payment_rebuilds()
+        if rebuilt:
+            self.stdout.write(f'rebuilt payment status of {rebuilt} projects')
+
+        date = datetime.strptime(options['date'], '%Y-%m-%d').date() if options['date'] else None
+        contracts = Contract.objects.all()
+        if options['project']:
+            contracts = contracts.filter(project__in=options['project'])
+
+        updated = 0
+        for project in contracts.order_by().values_list('project', flat=True).distinct():
+            updated += refresh_payment_status(contracts.filter(project=project).values_list('pk', flat=True), date)
+        self.stdout.write(f'refreshed payment status of {updated} contracts')
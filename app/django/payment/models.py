@@ -141,3 +141,61 @@ class SpecialOverDueRule(models.Model):  # 가산금 / 할인액 계산을 위
         ordering = ('-project', 'term_start', 'term_end')
         verbose_name = '07. 특별 선납할인/연체이율'
         verbose_name_plural = '07. 특별 선납할인/연체이율'
+
+
+class PaymentAllocation(models.Model):  # 수납 건별 납입회차 배분 내역 (payment.utils.rebuild_allocations 로 유지)
+    contract = models.ForeignKey('contract.Contract', on_delete=models.CASCADE, related_name='allocations',
+                                 verbose_name='계약')
+    payment = models.ForeignKey('cash.ProjectCashBook', on_delete=models.CASCADE, related_name='allocations',
+                                verbose_name='수납 건')
+    installment_order = models.ForeignKey(InstallmentPaymentOrder, on_delete=models.CASCADE, null=True, blank=True,
+                                          verbose_name='납입회차', help_text='비어 있을 경우 총 약정액을 초과한 납부액')
+    amount = models.PositiveBigIntegerField('배분 금액')
+    is_settled = models.BooleanField('회차 완납 여부', default=False,
+                                     help_text='이 배분으로 해당 회차의 약정액이 모두 납부된 경우')
+
+    def __str__(self):
+        return f'{self.payment_id} -> {self.installment_order_id} : {self.amount}'
+
+    class Meta:
+        ordering = ('contract', 'id')
+        indexes = [models.Index(fields=['contract', 'is_settled'])]
+        verbose_name = '08. 수납 회차 배분 내역'
+        verbose_name_plural = '08. 수납 회차 배분 내역'
+
+
+class ContractPaymentStatus(models.Model):  # 계약 건별 납부 현황 (payment.utils.refresh_payment_status 로 유지)
+    contract = models.OneToOneField('contract.Contract', on_delete=models.CASCADE, related_name='payment_status',
+                                    verbose_name='계약')
+    project = models.ForeignKey('project.Project', on_delete=models.CASCADE, verbose_name='프로젝트')
+    total_paid = models.PositiveBigIntegerField('총 납부액', default=0)
+    last_paid_order = models.ForeignKey(InstallmentPaymentOrder, on_delete=models.SET_NULL, null=True, blank=True,
+                                        related_name='+', verbose_name='완납 회차')
+    due_amount = models.PositiveBigIntegerField('약정액', default=0, help_text='기준일까지 납부기한이 도래한 회차 약정액 합계')
+    unpaid_amount = models.PositiveBigIntegerField('미납액', default=0)
+    overdue_days = models.PositiveIntegerField('연체일수', default=0, help_text='최초 미납 회차 납부기한 경과일수')
+    as_of = models.DateField('기준일')
+
+    def __str__(self):
+        return f'{self.contract_id} : {self.unpaid_amount}'
+
+    class Meta:
+        ordering = ('contract',)
+        indexes = [models.Index(fields=['project', 'overdue_days']),
+                   models.Index(fields=['project', 'unpaid_amount'])]
+        verbose_name = '09. 계약 건별 납부 현황'
+        verbose_name_plural = '09. 계약 건별 납부 현황'
+
+
+class PaymentStatusRebuild(models.Model):  # 프로젝트 납부 현황 재계산 대기열 (payment.utils.run_payment_rebuilds 로 처리)
+    project = models.OneToOneField('project.Project', on_delete=models.CASCADE, related_name='+',
+                                   verbose_name='프로젝트')
+    requested_at = models.DateTimeField('요청일시', auto_now_add=True)
+
+    def __str__(self):
+        return f'{self.project_id} : {self.requested_at}'
+
+    class Meta:
+        ordering = ('requested_at',)
+        verbose_name = '10. 납부 현황 재계산 대기'
+        verbose_name_plural = '10. 납부 현황 재계산 대기'
@@ -0,0 +1,63 @@
+from functools import partial
+
+from django.db import transaction
+from django.dispatch import receiver
+from django.db.models.signals import post_save, post_delete
+
+from cash.models import ProjectCashBook
+from contract.models import Contract, ContractPrice, Contractor
+from project.models import Project
+
+from .models import InstallmentPaymentOrder, PaymentAllocation
+from .utils import PaymentChanges, queue_payment_rebuild, refresh_payment_status
+
+
+def is_cascade(sender, kwargs):
+    """
+    프로젝트 또는 계약 삭제에 따른 연쇄 삭제 여부 - 배분 내역과 납부 현황도 함께 삭제되므로 갱신하지 않는다.
+    (그 밖의 상위 객체 삭제에 따른 연쇄 삭제는 남아 있는 계약 건의 납부 현황을 갱신해야 한다.)
+    """
+    origin = kwargs.get('origin')
+    return origin is not None and getattr(origin, 'model', type(origin)) in (Project, Contract)
+
+
+@receiver(post_save, sender=ProjectCashBook)
+@receiver(post_delete, sender=ProjectCashBook)
+def payment_changed(sender, instance, **kwargs):
+    """수납 건 변경 - 커밋 후 해당 계약 건의 배분 내역과 납부 현황 갱신 (여러 건 변경 시 프로젝트 재계산 대기열)"""
+    if is_cascade(sender, kwargs):
+        return
+    contract_ids = {instance.contract_id}
+    if kwargs.get('created') is False:  # 수정 - 계약 건이 바뀐 경우 이전 계약 건도 재배분
+        contract_ids.update(PaymentAllocation.objects.filter(payment=instance).values_list('contract', flat=True))
+    contract_ids.discard(None)
+    if contract_ids:
+        PaymentChanges.add(instance, instance.project_id, contract_ids)
+
+
+@receiver(post_save, sender=ContractPrice)
+@receiver(post_delete, sender=ContractPrice)
+def contract_price_changed(sender, instance, **kwargs):
+    if instance.contract_id and not is_cascade(sender, kwargs):
+        PaymentChanges.add(instance, instance.contract.project_id, [instance.contract_id])
+
+
+@receiver(post_save, sender=Contract)
+def contract_changed(sender, instance, **kwargs):
+    """계약 등록/수정(해지 여부 등) - 커밋 후 납부 현황 행 생성 또는 갱신"""
+    transaction.on_commit(partial(refresh_payment_status, [instance.pk]))
+
+
+@receiver(post_save, sender=Contractor)
+def contractor_changed(sender, instance, **kwargs):
+    """계약자 상태/계약일 변경 - 커밋 후 납부 현황 갱신"""
+    if instance.contract_id:
+        transaction.on_commit(partial(refresh_payment_status, [instance.contract_id]))
+
+
+@receiver(post_save, sender=InstallmentPaymentOrder)
+@receiver(post_delete, sender=InstallmentPaymentOrder)
+def installment_order_changed(sender, instance, **kwargs):
+    """납입회차 변경 - 커밋 후 프로젝트 전체 계약 건 재계산 요청 (작업자가 처리)"""
+    if not is_cascade(sender, kwargs):
+        transaction.on_commit(partial(queue_payment_rebuild, instance.project_id))
@@ -1,3 +1,227 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.db import connection
 from django.test import TestCase
 
-# Create your tests here.
+from _pdf.views import TODAY, get_simple_orders, get_due_amount, get_paid
+from cash.models import BankCode, ProjectBankAccount, ProjectCashBook
+from contract.models import OrderGroup, Contract, Contractor, ContractPrice
+from ibs.models import AccountSort, AccountSubD1, ProjectAccountD2, ProjectAccountD3
+from items.models import UnitType
+from project.testing import create_test_project
+from .models import InstallmentPaymentOrder, OverDueRule, ContractPaymentStatus, PaymentStatusRebuild
+from .utils import (InstallmentSchedule, LateFeeSchedule, OverdueCalculator, lock_payment_statuses,
+                    refresh_payment_status, run_payment_rebuilds)
+
+
+class PaymentTestCase(TestCase):
+    """납입회차/연체이율/계약/수납 테스트 데이터"""
+
+    @classmethod
+    def setUpTestData(cls):
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.create_test_data()
+        run_payment_rebuilds()  # 여러 건 등록 - 프로젝트 재계산 대기열로 처리
+
+    @classmethod
+    def create_test_data(cls):
+        cls.project = project = create_test_project()[1]
+
+        sort = AccountSort.objects.create(name='입금')
+        d1 = AccountSubD1.objects.create(code='1', name='분양수입', description='분양수입')
+        d2 = ProjectAccountD2.objects.create(d1=d1, code='1', name='분양대금')
+        d3s = {pk: ProjectAccountD3.objects.create(pk=pk, sort=sort, d2=d2, code=str(pk), name=f'계정{pk}')
+               for pk in (1, 2, 4)}
+        bank = ProjectBankAccount.objects.create(project=project, alias_name='분양대금',
+                                                 bankcode=BankCode.objects.create(code='001', name='은행'))
+
+        order_group = OrderGroup.objects.create(project=project, order_number=1, order_group_name='일반분양')
+        unit_type = UnitType.objects.create(project=project, sort='1', name='84A', color='#ffffff',
+                                            num_unit=10, average_price=500000000)
+
+        for pay_sort, pay_code, days, due, extra in (('1', 1, None, None, None),
+                                                     ('1', 2, 30, None, None),
+                                                     ('2', 3, 60, date(2023, 5, 1), None),
+                                                     ('2', 4, 60, date(2023, 9, 1), date(2023, 10, 1)),
+                                                     ('3', 5, None, date(2099, 1, 1), None)):
+            InstallmentPaymentOrder.objects.create(project=project, pay_sort=pay_sort, pay_code=pay_code,
+                                                   pay_time=1, pay_name=f'{pay_code}회차', days_since_prev=days,
+                                                   pay_due_date=due, extra_due_date=extra,
+                                                   is_calc_start=pay_code == 2)
+        for start, end, rate in ((None, 0, '3.00'), (1, 30, '6.00'), (31, 90, '8.00'), (91, None, '10.00')):
+            OverDueRule.objects.create(project=project, term_start=start, term_end=end, rate_year=Decimal(rate))
+
+        down, middle = 25000000, 50000000
+        first, second = timedelta(0), timedelta(days=30)
+        payments = (
+            # 정상 납부
+            ((first, down, 1), (second, down, 4), (date(2023, 5, 1), middle, 1), (date(2023, 10, 1), middle, 1)),
+            # 계약금 1회차 이후 미납
+            ((first, down, 1),),
+            # 납부 지연
+            ((first, down, 1), (timedelta(days=50), down, 1), (date(2023, 6, 15), middle, 4)),
+            # 중도금 선납
+            ((first, down, 1), (timedelta(days=5), down + middle * 2, 1)),
+            # 분할 납부
+            ((first, down, 1), (second, 10000000, 1), (timedelta(days=45), 15000000, 4),
+             (date(2023, 5, 20), 20000000, 1), (date(2023, 7, 1), 20000000, 1), (date(2023, 8, 1), 100000000, 1)),
+            # 납부 내역 없음
+            (),
+        )
+        for i, paid_list in enumerate(payments):
+            contract = Contract.objects.create(project=project, order_group=order_group, unit_type=unit_type,
+                                               serial_number=f'TEST-{i}')
+            contract_date = date(2023, 1, 10) + timedelta(days=i)
+            Contractor.objects.create(contract=contract, name=f'계약자{i}', status='2', contract_date=contract_date)
+            ContractPrice.objects.create(contract=contract, price=500000000, down_pay=down, middle_pay=middle,
+                                         remain_pay=400000000)
+            for deal_date, income, d3 in paid_list:
+                deal_date = contract_date + deal_date if isinstance(deal_date, timedelta) else deal_date
+                ProjectCashBook.objects.create(project=project, sort=sort, project_account_d2=d2,
+                                               project_account_d3=d3s[d3], contract=contract, bank_account=bank,
+                                               income=income, deal_date=deal_date)
+
+        # 계산 제외 - 해지 계약 및 분양대금 외 수납 계정
+        released = Contract.objects.create(project=project, order_group=order_group, unit_type=unit_type,
+                                           serial_number='TEST-RELEASED', activation=False)
+        Contractor.objects.create(contract=released, name='해지자', status='4', contract_date=date(2023, 1, 10))
+        ProjectCashBook.objects.create(project=project, sort=sort, project_account_d2=d2, project_account_d3=d3s[2],
+                                       contract=Contract.objects.get(serial_number='TEST-1'), bank_account=bank,
+                                       income=1000000, deal_date=date(2023, 2, 1))
+
+
+class OverdueCalculatorTests(PaymentTestCase):
+    """일괄 연체/선납 계산 결과가 계약 건별 납부 확인서 계산(get_paid)과 같은지 확인"""
+
+    def get_expected(self, contract):
+        price = contract.contractprice
+        amount = {'1': price.down_pay, '2': price.middle_pay, '3': price.remain_pay}
+        installments = InstallmentSchedule.for_project(self.project)
+        simple_orders = get_simple_orders(installments, contract, amount)
+        _, paid_sum_total, calc_sums = get_paid(contract, simple_orders, TODAY, is_calc=True,
+                                                schedule=LateFeeSchedule.for_project(self.project))
+        return {
+            'due_sum': get_due_amount(installments, contract, amount),
+            'paid_sum': paid_sum_total,
+            'penalty': calc_sums[0],
+            'discount': calc_sums[1],
+        }
+
+    def test_matches_get_paid(self):
+        calculator = OverdueCalculator(self.project, TODAY)
+        contracts = Contract.objects.filter(project=self.project, activation=True).order_by('serial_number')
+        self.assertEqual([row['contract'] for row in calculator.rows], [contract.pk for contract in contracts])
+
+        for row, contract in zip(calculator.rows, contracts):
+            with self.subTest(contract=contract.serial_number):
+                expected = self.get_expected(contract)
+                self.assertEqual({key: row[key] for key in expected}, expected)
+                self.assertEqual(row['late_fee'], expected['penalty'] + expected['discount'])
+
+        self.assertTrue(any(row['penalty'] for row in calculator.rows))
+        self.assertTrue(any(row['discount'] for row in calculator.rows))
+
+    def test_overdue_days(self):
+        rows = {row['serial_number']: row for row in OverdueCalculator(self.project, date(2023, 6, 1)).rows}
+        self.assertEqual(rows['TEST-0']['overdue_days'], 0)  # 3회차까지 완납
+        self.assertEqual(rows['TEST-1']['unpaid_sum'], 25000000 + 50000000)
+        self.assertEqual(rows['TEST-1']['overdue_days'], (date(2023, 6, 1) - date(2023, 2, 10)).days)  # 2회차 기한
+        self.assertEqual(rows['TEST-2']['overdue_days'], (date(2023, 6, 1) - date(2023, 5, 1)).days)  # 3회차 기한
+        self.assertEqual(rows['TEST-5']['paid_sum'], 0)
+
+
+class PaymentStatusTests(PaymentTestCase):
+    """수납 건 변경 시 계약 건별 납부 현황(ContractPaymentStatus) 갱신 확인"""
+
+    def test_refresh_without_upsert_target(self):
+        # MySQL/MariaDB 와 같이 충돌 대상 지정 upsert 를 지원하지 않는 백엔드에서도 수납 건 저장이 가능해야 한다.
+        contract = Contract.objects.get(serial_number='TEST-1')
+        payment = contract.payments.get(project_account_d3=1)
+        status_pk = contract.payment_status.pk
+        with mock.patch.object(connection.features, 'supports_update_conflicts', False), \
+                mock.patch.object(connection.features, 'supports_update_conflicts_with_target', False):
+            payment.income += 25000000
+            with self.captureOnCommitCallbacks(execute=True):
+                payment.save()
+
+        status = ContractPaymentStatus.objects.get(contract=contract)
+        self.assertEqual(status.pk, status_pk)  # 기존 행 수정 - 납부 현황 pk 유지
+        self.assertEqual(status.total_paid, 50000000)
+        self.assertEqual(status.last_paid_order.pay_code, 2)
+        self.assertEqual(ContractPaymentStatus.objects.filter(contract=contract).count(), 1)
+        self.assertEqual(ContractPaymentStatus.objects.count(), Contract.objects.count())
+
+    def test_concurrent_first_refresh(self):
+        # 동시에 처음 갱신한 다른 요청이 잠금 조회 이후 행을 먼저 생성한 경우 생성 대신 그 행을 수정한다.
+        contract = Contract.objects.get(serial_number='TEST-1')
+        status_pk = contract.payment_status.pk
+        calls = []
+
+        def lock(contract_ids):
+            calls.append(contract_ids)
+            return {} if len(calls) == 1 else lock_payment_statuses(contract_ids)
+
+        with mock.patch('payment.utils.lock_payment_statuses', side_effect=lock):
+            refresh_payment_status([contract.pk])
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(ContractPaymentStatus.objects.get(contract=contract).pk, status_pk)
+        self.assertEqual(ContractPaymentStatus.objects.filter(contract=contract).count(), 1)
+
+    def test_cascade_from_other_parent(self):
+        # 프로젝트/계약 외 상위 객체(분리 전 수납 건) 삭제에 따른 연쇄 삭제도 납부 현황에 반영한다.
+        contract = Contract.objects.get(serial_number='TEST-1')
+        payment = contract.payments.get(project_account_d3=1)
+        parent = ProjectCashBook.objects.create(project=self.project, sort=payment.sort,
+                                                project_account_d2=payment.project_account_d2,
+                                                bank_account=payment.bank_account, income=10000000,
+                                                deal_date=date(2023, 2, 10))
+        with self.captureOnCommitCallbacks(execute=True):
+            ProjectCashBook.objects.create(project=self.project, sort=payment.sort,
+                                           project_account_d2=payment.project_account_d2,
+                                           project_account_d3=payment.project_account_d3, contract=contract,
+                                           bank_account=payment.bank_account, income=10000000,
+                                           deal_date=date(2023, 2, 10), separated=parent)
+        self.assertEqual(ContractPaymentStatus.objects.get(contract=contract).total_paid, 35000000)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            parent.delete()
+        self.assertEqual(ContractPaymentStatus.objects.get(contract=contract).total_paid, 25000000)
+
+    def test_updated_after_commit(self):
+        contract = Contract.objects.get(serial_number='TEST-1')
+        payment = contract.payments.get(project_account_d3=1)
+        with self.captureOnCommitCallbacks() as callbacks:
+            payment.income += 25000000
+            payment.save()
+            payment.save()  # 같은 행을 다시 저장해도 단건 수정
+            self.assertEqual(ContractPaymentStatus.objects.get(contract=contract).total_paid, 25000000)
+        callbacks[-1]()
+        self.assertEqual(ContractPaymentStatus.objects.get(contract=contract).total_paid, 50000000)
+        self.assertFalse(PaymentStatusRebuild.objects.exists())
+
+    def test_bulk_changes_queued(self):
+        # 한 트랜잭션에서 여러 건이 바뀌면 커밋 후 프로젝트 재계산 대기열에 한 번만 넣는다.
+        contract = Contract.objects.get(serial_number='TEST-1')
+        payment = contract.payments.get(project_account_d3=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(3):
+                payment.pk = None
+                payment.save()
+        self.assertEqual(ContractPaymentStatus.objects.get(contract=contract).total_paid, 25000000)
+        self.assertEqual(list(PaymentStatusRebuild.objects.values_list('project', flat=True)), [self.project.pk])
+
+        self.assertEqual(run_payment_rebuilds(), 1)
+        self.assertEqual(ContractPaymentStatus.objects.get(contract=contract).total_paid, 100000000)
+        self.assertFalse(PaymentStatusRebuild.objects.exists())
+
+    def test_installment_order_change_queued(self):
+        order = InstallmentPaymentOrder.objects.get(project=self.project, pay_code=2)
+        with self.captureOnCommitCallbacks(execute=True):
+            order.days_since_prev = 40
+            order.save()
+            order.pay_name = '2회차 계약금'
+            order.save()
+        self.assertEqual(PaymentStatusRebuild.objects.filter(project=self.project).count(), 1)
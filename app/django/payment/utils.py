@@ -0,0 +1,804 @@
+import threading
+import weakref
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import date as date_cls, timedelta
+from itertools import accumulate
+
+import numpy as np
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction, IntegrityError
+from django.db.models import Sum, Max, Count, F
+
+from cash.models import ProjectCashBook
+from contract.models import OrderGroup, Contract
+from items.models import UnitType
+from project.models import ProjectIncBudget
+from .models import (SalesPriceByGT, DownPayment, InstallmentPaymentOrder, OverDueRule,
+                     SpecialPaymentOrder, SpecialOverDueRule, PaymentAllocation, ContractPaymentStatus,
+                     PaymentStatusRebuild)
+
+
+class PaymentIndex:
+    """
+    프로젝트 계약자 분양대금 납부 인덱스
+    - (계약, 납부회차) 단위로 납부 합계와 최종 납부일을 한 번의 그룹 쿼리로 집계하여
+      계약 행마다 납부 목록을 다시 훑지 않고 dict 조회로 사용한다.
+    """
+
+    def __init__(self, project, date=None):
+        """
+        :param project: 프로젝트
+        :param date: 기준일 - 해당 일자까지의 납부 건만 집계 (없으면 전체)
+        """
+        queryset = ProjectCashBook.objects.filter(project=project,
+                                                  income__isnull=False,
+                                                  project_account_d3__in=(1, 4),  # 분양대금 수납 계정
+                                                  contract__isnull=False)
+        queryset = queryset.filter(deal_date__lte=date) if date else queryset
+
+        rows = queryset.order_by() \
+            .values('contract', 'installment_order') \
+            .annotate(paid_sum=Sum('income'), paid_date=Max('deal_date')) \
+            .values_list('contract', 'installment_order', 'paid_sum', 'paid_date')
+
+        self.orders = {}  # (contract_id, order_id) -> (paid_sum, paid_date)
+        self.totals = defaultdict(int)  # contract_id -> paid_sum
+        for contract, order, paid_sum, paid_date in rows:
+            self.orders[(contract, order)] = (paid_sum, paid_date)
+            self.totals[contract] += paid_sum
+
+    def get_paid_sum(self, contract):
+        """계약 건별 납부 총액"""
+        return self.totals.get(contract, 0)
+
+    def get_order_paid(self, contract, order):
+        """
+        계약 건의 회차별 납부 정보
+        :return: (납부 합계, 최종 납부일) - 납부 내역이 없으면 (0, None)
+        """
+        return self.orders.get((contract, order), (0, None))
+
+
+class PricingContext:
+    """
+    프로젝트 분양가 산정 컨텍스트
+    - 차수/타입/층별 분양가, 수입 예산 평균가, 타입 평균가, 계약금 약정액을 프로젝트당 한 번 로드하여
+      계약 건마다 개별 조회하지 않고 dict 조회로 분양가를 산정한다.
+    """
+
+    def __init__(self, project):
+        prices = SalesPriceByGT.objects.filter(project=project) \
+            .values_list('order_group', 'unit_type', 'unit_floor_type', 'price')
+        self.prices = {(og, ut, ft): price for og, ut, ft, price in prices}
+
+        budgets = ProjectIncBudget.objects.filter(project=project) \
+            .values_list('order_group', 'unit_type', 'average_price')
+        self.budget_prices = {(og, ut): price for og, ut, price in budgets}
+
+        self.type_prices = dict(UnitType.objects.filter(project=project).values_list('pk', 'average_price'))
+
+        down_pays = DownPayment.objects.filter(project=project) \
+            .values_list('order_group', 'unit_type', 'payment_amount')
+        self.down_pays = {(og, ut): amount for og, ut, amount in down_pays}
+
+    def get_price(self, order_group, unit_type, floor_type=None):
+        """
+        분양가 - 층별 분양가 > 수입 예산 평균가 > 타입 평균가 순으로 적용
+        :param order_group: 차수 pk
+        :param unit_type: 타입 pk
+        :param floor_type: 층별 타입 pk (동호 미지정 시 None)
+        :return: 분양가 (정보가 없으면 0)
+        """
+        price = self.prices.get((order_group, unit_type, floor_type))
+        if price is None:
+            price = self.budget_prices.get((order_group, unit_type))
+        if price is None:
+            price = self.type_prices.get(unit_type)
+        return price if price else 0
+
+    def get_down_pay(self, order_group, unit_type):
+        """차수 및 타입별 회당 계약금 약정액 (등록되지 않은 경우 None)"""
+        return self.down_pays.get((order_group, unit_type))
+
+
+class InstallmentSchedule:
+    """
+    프로젝트 납부 회차별 납부기한 계산표
+    - 납부 회차를 한 번 조회하여 회차 코드별 이전 회차 경과일수(days_since_prev) 누계를 미리 구해 두고
+      계약 건별 납부기한은 계약일로부터 추가 쿼리 없이 계산한다.
+    """
+
+    def __init__(self, orders):
+        """
+        :param orders: 납부 회차 목록 (InstallmentPaymentOrder / SpecialPaymentOrder, 회차 코드 순)
+        """
+        self.orders = list(orders)
+        # 지연 가산금 계산 시작 회차 코드 (지정 회차가 없으면 None)
+        self.calc_start = next((order.pay_code for order in self.orders if order.is_calc_start), None)
+
+        days_per_code = defaultdict(int)  # 회차 코드 -> 경과일수 합계
+        for order in self.orders:
+            days_per_code[order.pay_code] += order.days_since_prev or 0
+        self.prev_days = {}  # 회차 코드 -> 이전 회차(코드 미만) 경과일수 누계
+        total = 0
+        for pay_code in sorted(days_per_code):
+            self.prev_days[pay_code] = total
+            total += days_per_code[pay_code]
+
+    @classmethod
+    def for_project(cls, project, is_past=False):
+        """
+        :param project: 프로젝트
+        :param is_past: True 이면 종전 선납/연체 계산용 회차(SpecialPaymentOrder)
+        """
+        model = SpecialPaymentOrder if is_past else InstallmentPaymentOrder
+        return cls(model.objects.filter(project=project))
+
+    def get_due_date(self, cont_date, order):
+        """
+        :: 회차별 약정 납부기한
+        - 1회차: 계약일 / 2회차: 계약일 + 경과일수 또는 지정 납부기한(납부유예일 우선)
+        - 3회차 이후: 지정 납부기한(납부유예일 우선)과 계약일 + 이전 회차 경과일수 누계 중 늦은 날 (지정 기한이 없으면 None)
+        :param cont_date: 계약일
+        :param order: 납부 회차
+        :return: date - 납부기한
+        """
+        if order.pay_code < 2:
+            return cont_date
+
+        due = order.extra_due_date or order.pay_due_date
+        if order.pay_code == 2:
+            return cont_date + timedelta(days=order.days_since_prev) if order.days_since_prev else due
+        if not due:
+            return None
+
+        prev_days = self.prev_days.get(order.pay_code, 0)
+        si_due = cont_date + timedelta(days=prev_days) if prev_days else cont_date
+        return due if due > si_due else si_due
+
+
+class LateFeeSchedule:
+    """
+    지연 가산금(선납 할인금) 계산표
+    - 연체(선납) 구간별 가산율 규정을 한 번 조회하여 구간 경계, 구간 시작 전까지의 (일수 x 이율) 누계,
+      구간 이율로 미리 정리해 두고 금액/일수별 가산금은 구간 검색(이진 탐색)과 산술 계산만으로 구한다.
+    - 구간 적용 규칙은 규정 정렬 순서대로 처음 해당하는 구간을 적용하는 기존 계산 방식과 같다.
+      (단일 가산율, 선납 구간, 1일부터 시작하는 구간은 누계 없이 전체 일수에 해당 이율을 적용)
+    """
+
+    def __init__(self, rules):
+        """
+        :param rules: 가산율 규정 목록 (OverDueRule / SpecialOverDueRule, 기본 정렬 순)
+        """
+        limits = []  # 규정별 적용 최대 일수 (None: 제한 없음)
+        self.segments = []  # 규정별 (구간 시작 전 누계 일수, 누계 일수 x 이율, 이율)
+        calc_days = 0  # 앞 구간까지 계산된 일수
+        calc_rate = 0  # 앞 구간까지의 일수 x 이율 누계
+        for rule in rules:
+            start, end = rule.term_start, rule.term_end
+            rate = rule.rate_year / 100
+
+            if start is None and end is None:  # 단일 가산율 - 모든 일수에 적용
+                limits.append(None)
+                self.segments.append((0, 0, rate))
+            elif start is None:  # 선납 할인율 - 선납(0일 이하)인 경우만 적용
+                limits.append(0)
+                self.segments.append((0, 0, rate))
+            elif end is None:  # 특정 기간 이상 연체 - 이후 모든 일수에 적용
+                limits.append(None)
+                self.segments.append((calc_days, calc_rate, rate))
+            elif start == 1:  # 연체 시작 구간 - 구간 내 일수는 누계 없이 적용
+                limits.append(end)
+                self.segments.append((0, 0, rate))
+                calc_rate += end * rate
+                calc_days = end
+            else:  # 연체 진행 구간
+                limits.append(end)
+                self.segments.append((calc_days, calc_rate, rate))
+                calc_rate += (end - calc_days) * rate
+                calc_days = end
+
+        # 규정 순서대로 처음 해당하는 구간을 찾기 위한 적용 최대 일수의 누적 최대값 (이진 탐색용)
+        self.bounds = list(accumulate((float('inf') if limit is None else limit for limit in limits), max))
+
+    @classmethod
+    def for_project(cls, project, is_past=False):
+        """
+        :param project: 프로젝트
+        :param is_past: True 이면 종전 선납/연체 계산용 규정(SpecialOverDueRule)
+        """
+        model = SpecialOverDueRule if is_past else OverDueRule
+        return cls(list(model.objects.filter(project=project)))
+
+    def get_fee(self, late_amt, days):
+        """
+        :: 지연 가산금(선납 시 음수 할인금) 계산
+        :param late_amt: 지연(선납)금액
+        :param days: 지연일수 (선납인 경우 0 이하)
+        :return: int 가산금 - 적용할 규정이 없으면 None
+        """
+        i = bisect_left(self.bounds, days)
+        if i == len(self.bounds):
+            return None
+        calc_days, calc_rate, rate = self.segments[i]
+        return int(late_amt * (calc_rate + (days - calc_days) * rate) / 365)
+
+    def get_fees(self, late_amts, days):
+        """
+        :: 지연 가산금(선납 할인금) 배열 계산 - get_fee 의 벡터 연산 버전
+        - 이율을 만분율 정수로 바꾸어 정수 연산으로 계산하므로 get_fee 와 결과가 같다.
+        :param late_amts: 지연(선납)금액 배열 (int64)
+        :param days: 지연일수 배열 (int64)
+        :return: int64 배열 - 적용할 규정이 없으면 0
+        """
+        if not self.segments:
+            return np.zeros_like(late_amts)
+        calc_days = np.array([seg[0] for seg in self.segments], dtype=np.int64)
+        calc_rates = np.array([int(seg[1] * 10000) for seg in self.segments], dtype=np.int64)
+        rates = np.array([int(seg[2] * 10000) for seg in self.segments], dtype=np.int64)
+
+        i = np.searchsorted(np.array(self.bounds, dtype=float), days, side='left')
+        is_valid = i < len(self.bounds)
+        i = np.minimum(i, len(self.bounds) - 1)
+        fees = late_amts * (calc_rates[i] + (days - calc_days[i]) * rates[i])
+        fees = np.abs(fees) // (365 * 10000) * np.sign(fees)  # 0 방향 절사 (int() 와 동일)
+        return np.where(is_valid, fees, 0)
+
+
+def group_cumsum(values, starts):
+    """
+    그룹(연속 구간)별 누계
+    :param values: 값 배열
+    :param starts: 그룹 첫 위치 True 배열
+    """
+    total = np.cumsum(values)
+    first = np.maximum.accumulate(np.where(starts, np.arange(len(values)), 0))
+    return total - (total - values)[first]
+
+
+def carry_forward(mask, values, starts, initial):
+    """
+    그룹별로 mask 위치의 값을 다음 지정 위치 전까지 전달
+    :return: 위치별 그때까지(해당 위치 포함) 마지막으로 지정된 값 - 그룹 내 지정된 값이 없으면 initial
+    """
+    last = np.maximum.accumulate(np.where(mask | starts, np.arange(len(values)), 0))
+    return np.where(mask[last], values[last], initial)
+
+
+def shift_forward(values, starts, initial):
+    """그룹별 직전 위치의 값 (그룹 첫 위치는 initial)"""
+    return np.where(starts, initial, np.roll(values, 1))
+
+
+class OverdueCalculator:
+    """
+    기준일 현재 프로젝트 전체 계약 건 연체/선납 현황
+    - 계약 건별 회차 약정금/납부기한과 납부 내역을 각각 한 번에 조회하여 NumPy 배열로 만들고
+      약정금 누계, 납부 누계, 미납금, 연체일수, 지연 가산금/선납 할인금을 계약 건 반복 없이 배열 연산으로 계산한다.
+    - 가산금/할인금은 납부 확인서 일반용 계산(_pdf.views.get_paid - is_calc=True)과 같은 규칙으로
+      납부 건과 납부기한이 도래한 회차를 날짜 순으로 합친 이벤트 단위로 산출한다.
+    """
+    prepay_buffer_days = 30  # 납부기한 30일 이내 납부는 선납 할인 적용하지 않음
+
+    def __init__(self, project, date=None, contracts=None):
+        """
+        :param project: 프로젝트
+        :param date: 기준일 (date) - 해당 일자까지의 납부 건과 납부기한이 도래한 회차로 계산 (없으면 오늘)
+        :param contracts: 계약 pk 목록 - 해당 계약 건만 계산 (없으면 프로젝트 전체)
+        """
+        self.date = date or date_cls.today()
+        self.installments = InstallmentSchedule.for_project(project)
+        self.late_fee = LateFeeSchedule.for_project(project)
+        self.calc_start = self.installments.calc_start or 3  # 연체/가산 적용 시작 회차 코드
+
+        queryset = Contract.objects.filter(project=project,
+                                           activation=True,
+                                           contractor__status='2',
+                                           contractor__contract_date__lte=self.date)
+        if contracts is not None:
+            queryset = queryset.filter(pk__in=contracts)
+        self.contracts = list(queryset.order_by('serial_number')
+                              .values_list('pk', 'serial_number', 'contractor__name',
+                                           'order_group__order_group_name', 'unit_type__name',
+                                           'contractor__contract_date', 'contractprice__down_pay',
+                                           'contractprice__middle_pay', 'contractprice__remain_pay'))
+        payments = ProjectCashBook.objects.filter(income__isnull=False,
+                                                  project_account_d3__in=(1, 4),  # 분(부)담금 or 분양수입금
+                                                  contract__in=queryset.values('pk'),
+                                                  deal_date__lte=self.date) \
+            .order_by('contract', 'deal_date', 'id') \
+            .values_list('contract', 'deal_date', 'income')
+
+        index = {row[0]: i for i, row in enumerate(self.contracts)}
+        pay_conts, pay_dates, pay_amts = [], [], []
+        for contract, deal_date, income in payments:
+            pay_conts.append(index[contract])
+            pay_dates.append(deal_date.toordinal())
+            pay_amts.append(income)
+
+        self.rows = self.calculate(np.array(pay_conts, dtype=np.int64),
+                                   np.array(pay_dates, dtype=np.int64),
+                                   np.array(pay_amts, dtype=np.int64))
+
+    def get_due_dates(self, cont_dates):
+        """
+        :: (계약, 회차) 납부기한 배열 - InstallmentSchedule.get_due_date 와 같은 규칙
+        :param cont_dates: 계약일 date ordinal 배열
+        :return: date ordinal 배열 - 납부기한이 없으면 0
+        """
+        columns = []
+        for order in self.installments.orders:
+            due = order.extra_due_date or order.pay_due_date
+            due = due.toordinal() if due else 0
+            if order.pay_code < 2:
+                column = cont_dates
+            elif order.pay_code == 2:
+                column = cont_dates + order.days_since_prev if order.days_since_prev \
+                    else np.full_like(cont_dates, due)
+            elif not due:
+                column = np.zeros_like(cont_dates)
+            else:
+                column = np.maximum(due, cont_dates + self.installments.prev_days.get(order.pay_code, 0))
+            columns.append(column)
+        return np.stack(columns, axis=1) if columns else np.zeros((len(cont_dates), 0), dtype=np.int64)
+
+    def calculate(self, pay_conts, pay_dates, pay_amts):
+        """
+        :: 계약 건별 연체/선납 현황 계산
+        :param pay_conts: 납부 건별 계약 행 번호 배열 (계약, 거래일자, id 순)
+        :param pay_dates: 납부 건별 거래일자 date ordinal 배열
+        :param pay_amts: 납부 건별 입금액 배열
+        :return: 계약 건별 현황 dict 리스트
+        """
+        day = self.date.toordinal()
+        calc_start = self.calc_start
+        count = len(self.contracts)
+        cont_dates = np.array([row[5].toordinal() for row in self.contracts], dtype=np.int64)
+        prices = np.array([[row[6] or 0, row[7] or 0, row[8] or 0] for row in self.contracts],
+                          dtype=np.int64).reshape(count, 3)  # 계약금, 중도금, 잔금 (회당 약정액)
+
+        # (계약, 회차) 배열 - 0번 열은 '해당 회차 없음' (약정금 누계 0, 납부기한 없음)
+        orders = self.installments.orders
+        codes = np.array([0] + [o.pay_code for o in orders], dtype=np.int64)
+        sorts = np.array([int(o.pay_sort) - 1 for o in orders], dtype=np.intp)
+        blank = np.zeros((count, 1), dtype=np.int64)
+        amounts = np.hstack((blank, prices[:, sorts]))  # 회차별 약정금
+        amount_totals = np.cumsum(amounts, axis=1)  # 회차별 약정금 누계
+        due_dates = np.hstack((blank, self.get_due_dates(cont_dates)))  # 회차별 납부기한
+        is_due = (due_dates > 0) & (due_dates <= day)  # 기도래 회차
+
+        # 1. 이벤트 - 납부 건 + 가산금 계산 시작 회차 이후 기도래 회차를 계약별 날짜 순으로 정렬
+        #    (같은 날짜는 납부 건 먼저, 납부 건은 거래일자/id 순, 회차는 회차 순)
+        inst_conts, inst_cols = np.nonzero(is_due & (codes >= calc_start))
+        conts = np.concatenate((pay_conts, inst_conts))
+        dates = np.concatenate((pay_dates, due_dates[inst_conts, inst_cols]))
+        is_inst = np.concatenate((np.zeros(len(pay_conts), dtype=bool), np.ones(len(inst_conts), dtype=bool)))
+        seqs = np.concatenate((np.arange(len(pay_conts)), inst_cols))
+        cols = np.concatenate((np.zeros(len(pay_conts), dtype=np.int64), inst_cols))  # 회차 열 (납부 건은 0)
+        incomes = np.concatenate((pay_amts, np.zeros(len(inst_conts), dtype=np.int64)))
+
+        order = np.lexsort((seqs, is_inst, dates, conts))
+        conts, dates, is_inst, cols, incomes = (conts[order], dates[order], is_inst[order],
+                                                cols[order], incomes[order])
+        is_paid = ~is_inst
+        events = len(conts)
+        starts = np.ones(events, dtype=bool)  # 계약별 첫 이벤트
+        starts[1:] = conts[1:] != conts[:-1]
+        ends = np.ones(events, dtype=bool)  # 계약별 마지막 이벤트
+        ends[:-1] = starts[1:]
+
+        # 2. 이벤트 시점 상태
+        paid_totals = group_cumsum(incomes, starts)  # 납부 금액 누계
+        paid_cols = (amount_totals[conts, 1:] <= paid_totals[:, None]).sum(axis=1)  # 완납 회차 열
+        paid_codes = codes[paid_cols]  # 완납 회차 코드
+        inst_amt_totals = amount_totals[conts, cols]  # 회차 이벤트 약정금 누계
+
+        # 약정 금액 합계 - 회차 이벤트에서 해당 회차 누계로 바뀌고, 0 인 동안은 시작 회차 이후 완납 납부 건의 완납 회차 누계 적용
+        is_calc_paid = is_paid & (paid_codes >= calc_start)
+        values = np.where(is_inst, inst_amt_totals, np.where(is_calc_paid, amount_totals[conts, paid_cols], 0))
+        segments = starts | is_inst
+        is_first_value = (values != 0) & (group_cumsum((values != 0).astype(np.int64), segments) == 1)
+        curr_amt_totals = carry_forward(is_first_value, values, segments, 0)
+
+        is_prepaid = is_paid & (paid_totals > curr_amt_totals)  # 선납 (납부 총액 > 약정 총액)
+        # 최초 선납 여부 - 회차 이벤트 및 시작 회차 이후 미납 시 초기화, 시작 회차 이후 선납 시 해제
+        is_first_pre = shift_forward(carry_forward(is_inst | is_calc_paid, ~is_prepaid, starts, True), starts, True)
+        curr_pay_codes = carry_forward(is_inst, codes[cols], starts, 0)  # 현재 약정 회차 코드
+        has_inst = group_cumsum(is_inst.astype(np.int64), starts) > 0  # 앞선 회차 이벤트 존재 여부
+
+        next_dates = np.where(ends, day, np.roll(dates, -1))  # 다음 이벤트 일자 (마지막은 기준일)
+
+        # 3. 납부 건 - 선납 시
+        diffs = np.where((paid_codes >= calc_start) & (dates > cont_dates[conts]), curr_amt_totals - paid_totals, 0)
+        diffs = np.where(is_first_pre, diffs, -incomes)  # 최초 선납이 아니면 입금액 전체
+        next_codes = np.where(curr_pay_codes == 0, calc_start, curr_pay_codes + 1)
+        next_cols = np.searchsorted(codes[1:], next_codes)
+        next_cols = np.where(np.append(codes[1:], -1)[next_cols] == next_codes, next_cols + 1, len(orders))
+        next_due_dates = due_dates[conts, next_cols]  # 다음 회차 납부기한 (없으면 마지막 회차)
+        prepay_days = dates - next_due_dates
+        diffs = np.where((next_due_dates > 0) & (prepay_days < -self.prepay_buffer_days), diffs, 0)
+
+        # 납부 건 - 미납 시
+        unpaid_diffs = curr_amt_totals - paid_totals
+        delay_days = np.where(has_inst & (unpaid_diffs != 0), next_dates - dates, 0)
+
+        paid_diffs = np.where(is_prepaid, diffs, unpaid_diffs)
+        paid_days = np.where(is_prepaid, prepay_days, delay_days)  # 선납 시 차액은 0 이하
+
+        # 4. 회차 이벤트 - 최초 선납 상태이면 약정 총액 - 납부 총액
+        inst_diffs = np.where(is_first_pre, inst_amt_totals - paid_totals, 0)
+        inst_days = np.where(inst_diffs > 0, next_dates - dates, dates - next_dates)
+
+        diffs = np.where(is_inst, inst_diffs, paid_diffs)
+        days = np.where(diffs != 0, np.where(is_inst, inst_days, paid_days), 0)
+        fees = self.late_fee.get_fees(diffs, days)
+
+        penalties = np.zeros(count, dtype=np.int64)
+        discounts = np.zeros(count, dtype=np.int64)
+        np.add.at(penalties, conts, np.where(diffs > 0, fees, 0))
+        np.add.at(discounts, conts, np.where(diffs < 0, fees, 0))
+
+        # 5. 계약 건별 집계
+        paid_sums = np.zeros(count, dtype=np.int64)
+        np.add.at(paid_sums, pay_conts, pay_amts)
+        due_sums = (amounts * is_due).sum(axis=1)  # 기도래 회차 약정금 누계
+        is_unpaid = is_due & (amount_totals > paid_sums[:, None])  # 기도래 미납 회차
+        unpaid_cols = is_unpaid.argmax(axis=1)  # 최초 미납 회차 열 (없으면 0)
+        overdue_days = np.where(unpaid_cols > 0, day - due_dates[np.arange(count), unpaid_cols], 0)
+
+        rows = []
+        for i, (pk, serial_number, contractor, order_group, unit_type, contract_date, *_) \
+                in enumerate(self.contracts):
+            due_sum, paid_sum = int(due_sums[i]), int(paid_sums[i])
+            penalty, discount = int(penalties[i]), int(discounts[i])
+            rows.append({
+                'contract': pk,
+                'serial_number': serial_number,
+                'contractor': contractor,
+                'order_group': order_group,
+                'unit_type': unit_type,
+                'contract_date': contract_date,
+                'due_sum': due_sum,  # 약정금 누계
+                'paid_sum': paid_sum,  # 납부 누계
+                'unpaid_sum': due_sum - paid_sum if due_sum > paid_sum else 0,  # 미납금
+                'overdue_days': int(overdue_days[i]),  # 연체일수 (최초 미납 회차 납부기한 경과일수)
+                'penalty': penalty,  # 지연 가산금
+                'discount': discount,  # 선납 할인금 (음수)
+                'late_fee': penalty + discount,  # 가산금 - 할인금
+            })
+        return rows
+
+    def get_totals(self):
+        totals = {key: sum(row[key] for row in self.rows)
+                  for key in ('due_sum', 'paid_sum', 'unpaid_sum', 'penalty', 'discount', 'late_fee')}
+        totals['overdue_num'] = sum(1 for row in self.rows if row['unpaid_sum'])  # 미납 계약 건수
+        return totals
+
+
+ALLOCATION_BATCH_SIZE = 1000  # 배분 내역 일괄 생성 단위
+STATUS_FIELDS = ('project', 'total_paid', 'last_paid_order', 'due_amount', 'unpaid_amount', 'overdue_days',
+                 'as_of')  # 납부 현황 갱신 필드
+
+
+def get_allocations(contract, orders, payments):
+    """
+    :: 계약 건의 수납 건별 납입회차 배분 - 납부일 순으로 앞 회차의 약정액부터 채운다.
+    - 회차 완납 기준은 누적 납부액 >= 해당 회차까지의 누적 약정액 (완납 회차 계산과 같은 기준)
+    - 약정액이 없는 회차는 건너뛰고, 총 약정액을 초과한 납부액은 회차 없이 배분한다.
+    :param contract: 계약 (contractprice 미리 로드)
+    :param orders: 프로젝트 납입회차 목록 (pay_code 순)
+    :param payments: 계약 건의 분양대금 수납 건 (pk, 입금액) 목록 (납부일 순)
+    :return: 저장 전 PaymentAllocation 목록
+    """
+    try:
+        price = contract.contractprice
+        amount = {'1': price.down_pay, '2': price.middle_pay, '3': price.remain_pay}
+    except ObjectDoesNotExist:
+        amount = {}
+    dues = [(order, amount.get(order.pay_sort) or 0) for order in orders]
+    dues = [(order, due) for order, due in dues if due]
+
+    allocations = []
+    index = 0
+    remain = dues[0][1] if dues else 0  # 현재 회차 잔여 약정액
+    for payment_id, income in payments:
+        while income and index < len(dues):
+            part = min(income, remain)
+            income -= part
+            remain -= part
+            allocations.append(PaymentAllocation(contract_id=contract.pk, payment_id=payment_id,
+                                                 installment_order=dues[index][0], amount=part,
+                                                 is_settled=not remain))
+            if not remain:
+                index += 1
+                remain = dues[index][1] if index < len(dues) else 0
+        if income:  # 초과 납부액
+            allocations.append(PaymentAllocation(contract_id=contract.pk, payment_id=payment_id, amount=income))
+    return allocations
+
+
+def rebuild_allocations(contract_ids):
+    """
+    :: 계약 건들의 수납 회차 배분 내역 재생성 - 기존 내역 삭제 후 일괄 생성
+    - 계약 건 수와 관계없이 계약/납입회차/수납 건을 각 한 번의 쿼리로 불러와 메모리에서 배분한다.
+    :param contract_ids: 계약 pk 목록 (삭제된 계약은 기존 내역만 삭제)
+    :return: 생성한 배분 내역 수
+    """
+    contract_ids = list(contract_ids)
+    contracts = Contract.objects.filter(pk__in=contract_ids).select_related('contractprice')
+
+    orders = defaultdict(list)  # 프로젝트 pk -> 납입회차 목록
+    for order in InstallmentPaymentOrder.objects.filter(project__in=contracts.values('project')) \
+            .order_by('pay_code', 'id'):
+        orders[order.project_id].append(order)
+
+    payments = defaultdict(list)  # 계약 pk -> (수납 건 pk, 입금액) 목록
+    for contract, payment_id, income in ProjectCashBook.objects.filter(contract__in=contract_ids,
+                                                                        income__isnull=False,
+                                                                        project_account_d3__in=(1, 4)) \
+            .order_by('deal_date', 'id').values_list('contract', 'id', 'income'):
+        payments[contract].append((payment_id, income))
+
+    allocations = [allocation for contract in contracts
+                   for allocation in get_allocations(contract, orders[contract.project_id], payments[contract.pk])]
+    with transaction.atomic():
+        PaymentAllocation.objects.filter(contract__in=contract_ids).delete()
+        PaymentAllocation.objects.bulk_create(allocations, batch_size=ALLOCATION_BATCH_SIZE)
+    return len(allocations)
+
+
+def get_last_paid_orders(contracts):
+    """
+    :: 계약 건별 완납 회차 - 수납 회차 배분 내역에서 한 번의 쿼리로 조회
+    :param contracts: 계약 pk 목록 또는 쿼리셋
+    :return: {계약 pk: 마지막 완납 납입회차} (완납 회차가 없는 계약은 제외)
+    """
+    allocations = PaymentAllocation.objects.filter(contract__in=contracts, is_settled=True) \
+        .select_related('installment_order').order_by('installment_order__pay_code', 'installment_order_id')
+    return {allocation.contract_id: allocation.installment_order for allocation in allocations}
+
+
+def refresh_payment_status(contract_ids, date=None):
+    """
+    :: 계약 건별 납부 현황(ContractPaymentStatus) 갱신 - 기존 행은 수정하고 없는 계약 건만 생성
+    - 총 납부액과 완납 회차는 전체 수납 건과 수납 회차 배분 내역 기준
+    - 약정액/미납액/연체일수는 기준일 현재 OverdueCalculator 계산 값 (정상 계약이 아닌 계약 건은 0)
+    - 약정액과 연체일수는 날짜가 지나면 바뀌므로 매일 refresh_payment_status 명령으로 전체 갱신한다.
+      (배포 환경에서는 web 차트의 CronJob 이 실행 - deploy/helm/charts/web/templates/payment-status-cronjob.yaml)
+    :param contract_ids: 계약 pk 목록 (수납 회차 배분 내역이 먼저 갱신되어 있어야 한다.)
+    :param date: 기준일 (없으면 오늘)
+    :return: 갱신한 계약 건 수
+    """
+    date = date or date_cls.today()
+    contract_ids = list(contract_ids)
+
+    projects = defaultdict(list)  # 프로젝트 pk -> 계약 pk 목록
+    for pk, project in Contract.objects.filter(pk__in=contract_ids).values_list('pk', 'project'):
+        projects[project].append(pk)
+    paids = dict(ProjectCashBook.objects.filter(contract__in=contract_ids,
+                                                income__isnull=False,
+                                                project_account_d3__in=(1, 4))
+                 .order_by().values('contract').annotate(paid_sum=Sum('income'))
+                 .values_list('contract', 'paid_sum'))
+    paid_orders = get_last_paid_orders(contract_ids)
+
+    statuses = []
+    for project, pks in projects.items():
+        rows = {row['contract']: row for row in OverdueCalculator(project, date, contracts=pks).rows}
+        for pk in pks:
+            row = rows.get(pk, {})
+            statuses.append(ContractPaymentStatus(contract_id=pk, project_id=project,
+                                                  total_paid=paids.get(pk) or 0,
+                                                  last_paid_order=paid_orders.get(pk),
+                                                  due_amount=row.get('due_sum', 0),
+                                                  unpaid_amount=row.get('unpaid_sum', 0),
+                                                  overdue_days=row.get('overdue_days', 0),
+                                                  as_of=date))
+    save_payment_statuses(statuses)
+    return len(statuses)
+
+
+def lock_payment_statuses(contract_ids):
+    """계약 건별 기존 납부 현황 행 잠금 - {계약 pk: 납부 현황 pk}"""
+    return dict(ContractPaymentStatus.objects.select_for_update()
+                .filter(contract__in=contract_ids).values_list('contract', 'pk'))
+
+
+def save_payment_statuses(statuses):
+    """
+    :: 납부 현황 행 저장 - 기존 행은 일괄 수정, 없는 행만 생성
+    - 충돌 대상 지정 upsert(unique_fields)는 MySQL/MariaDB 에서 지원되지 않으므로 수정과 생성을 나누어 처리한다.
+    - 아직 없는 행은 잠글 수 없으므로 같은 계약 건을 동시에 처음 갱신하면 나중 요청의 생성이 중복(OneToOne)으로 실패한다.
+      이 경우 먼저 생성된 행을 다시 잠가 수정한다.
+    :param statuses: 저장할 ContractPaymentStatus 목록 (pk 미지정)
+    """
+    with transaction.atomic():
+        pending = statuses
+        for retry in (False, True):
+            existing = lock_payment_statuses([status.contract_id for status in pending])
+            for status in pending:
+                status.pk = existing.get(status.contract_id)
+            ContractPaymentStatus.objects.bulk_update([status for status in pending if status.pk], STATUS_FIELDS,
+                                                      batch_size=ALLOCATION_BATCH_SIZE)
+            pending = [status for status in pending if not status.pk]
+            try:
+                with transaction.atomic():  # 생성 실패 시 이 저장점까지만 되돌린다.
+                    ContractPaymentStatus.objects.bulk_create(pending, batch_size=ALLOCATION_BATCH_SIZE)
+                return
+            except IntegrityError:
+                if retry:
+                    raise
+
+
+def update_payment_status(contract_ids):
+    """
+    :: 수납 회차 배분 내역과 납부 현황을 한 트랜잭션에서 함께 갱신
+    :param contract_ids: 계약 pk 목록
+    """
+    contract_ids = list(contract_ids)
+    with transaction.atomic():
+        rebuild_allocations(contract_ids)
+        refresh_payment_status(contract_ids)
+
+
+def queue_payment_rebuild(project_id):
+    """
+    :: 프로젝트 전체 계약 건 납부 현황 재계산 요청 - 이미 대기 중이면 하나로 합친다.
+    - 대기열은 내보내기 작업자(export_worker)와 refresh_payment_status 명령이 처리한다.
+    """
+    try:
+        with transaction.atomic():
+            PaymentStatusRebuild.objects.get_or_create(project_id=project_id)
+    except IntegrityError:  # 동시에 같은 프로젝트를 요청한 경우
+        pass
+
+
+def run_payment_rebuilds():
+    """
+    :: 대기 중인 프로젝트 납부 현황 재계산 후 처리한 프로젝트 수 반환
+    - 대기 행을 먼저 삭제(선점)한 작업자만 처리하며, 처리 중 새로 들어온 요청은 다음 차례에 다시 처리한다.
+    """
+    done = 0
+    for rebuild in PaymentStatusRebuild.objects.all():
+        if not PaymentStatusRebuild.objects.filter(pk=rebuild.pk).delete()[0]:
+            continue  # 다른 작업자가 선점
+        try:
+            update_payment_status(Contract.objects.filter(project_id=rebuild.project_id).values_list('pk', flat=True))
+        except Exception:
+            queue_payment_rebuild(rebuild.project_id)
+            raise
+        done += 1
+    return done
+
+
+class PaymentChanges:
+    """
+    한 트랜잭션의 수납 건(계약 금액 포함) 변경을 모아 커밋 후 한 번에 반영
+    - 프로젝트별로 1개 행만 바뀐 경우(단건 수정)는 해당 계약 건을 바로 갱신하고,
+      여러 행이 바뀐 경우(일괄 등록 등)는 프로젝트 재계산 대기열에 넣는다. (같은 행을 여러 번 저장해도 1개 행)
+    - 트랜잭션(저장점)이 롤백되면 on_commit 콜백과 함께 버려지도록 스레드에는 약한 참조만 둔다.
+    """
+    _current = threading.local()
+
+    def __init__(self):
+        self.rows = defaultdict(set)
+        self.contracts = defaultdict(set)
+
+    @classmethod
+    def add(cls, instance, project_id, contract_ids):
+        """
+        :param instance: 변경된 행 (수납 건 또는 계약 금액)
+        :param project_id: 프로젝트 pk
+        :param contract_ids: 다시 계산할 계약 pk 목록
+        """
+        changes = getattr(cls._current, 'ref', lambda: None)()
+        if changes is None:
+            changes = cls()
+            cls._current.ref = weakref.ref(changes)
+        changes.rows[project_id].add((type(instance), instance.pk))
+        changes.contracts[project_id].update(contract_ids)
+        transaction.on_commit(changes.flush)  # 트랜잭션 밖(autocommit)이면 바로 실행
+
+    def flush(self):
+        rows, contracts = self.rows, self.contracts
+        self.rows, self.contracts = defaultdict(set), defaultdict(set)
+        for project_id, changed in rows.items():
+            if len(changed) > 1:
+                queue_payment_rebuild(project_id)
+            else:
+                update_payment_status(contracts[project_id])
+
+
+def get_cont_summary():
+    """차수 및 타입별 유효 계약 세대수(conts_num)와 계약 금액(price_sum) 그룹 쿼리셋"""
+    return Contract.objects.filter(activation=True, contractor__status=2) \
+        .values('order_group', 'unit_type') \
+        .annotate(conts_num=Count('order_group')) \
+        .annotate(price_sum=Sum('contractprice__price'))
+
+
+def get_paid_summary():
+    """차수 및 타입별 유효 계약자 분양대금 실수납 금액(paid_sum) 그룹 쿼리셋"""
+    return ProjectCashBook.objects.filter(income__isnull=False,
+                                          project_account_d3__in=(1, 4),
+                                          contract__activation=True,
+                                          contract__contractor__status=2) \
+        .order_by('contract__order_group', 'contract__unit_type') \
+        .annotate(order_group=F('contract__order_group')) \
+        .annotate(unit_type=F('contract__unit_type')) \
+        .values('order_group', 'unit_type') \
+        .annotate(paid_sum=Sum('income'))
+
+
+class PaymentStatusPivot:
+    """
+    차수 x 타입별 수납 현황 피벗
+    - 수입 예산, 계약 세대수/금액, 실수납 금액을 각각 한 번의 그룹 쿼리로 가져와
+      (차수, 타입) 키 dict 로 결합한다.
+    """
+
+    def __init__(self, project, date=None):
+        """
+        :param project: 프로젝트
+        :param date: 기준일 - 해당 일자까지의 계약 및 수납 건만 집계 (없으면 전체)
+        """
+        self.og_names = dict(OrderGroup.objects.filter(project=project).values_list('pk', 'order_group_name'))
+        self.ut_names = dict(UnitType.objects.filter(project=project).values_list('pk', 'name'))
+
+        conts = get_cont_summary().filter(project=project)
+        paids = get_paid_summary().filter(project=project)
+        if date:
+            conts = conts.filter(contractor__contract_date__lte=date)
+            paids = paids.filter(deal_date__lte=date)
+
+        self.conts = {(c['order_group'], c['unit_type']): (c['conts_num'], c['price_sum'] or 0) for c in conts}
+        self.paids = {(p['order_group'], p['unit_type']): p['paid_sum'] or 0 for p in paids}
+
+        budgets = ProjectIncBudget.objects.filter(project=project) \
+            .order_by('order_group', 'unit_type') \
+            .values_list('order_group', 'unit_type', 'average_price', 'quantity', 'budget')
+        self.rows = [self.get_row(*budget) for budget in budgets]
+
+        og_counts = defaultdict(int)
+        for row in self.rows:
+            og_counts[row['order_group']] += 1
+        for i, row in enumerate(self.rows):
+            is_first = i == 0 or self.rows[i - 1]['order_group'] != row['order_group']
+            row['og_span'] = og_counts[row['order_group']] if is_first else 0  # 차수 셀 병합 행 수 (첫 행 외 0)
+
+    def get_row(self, order_group, unit_type, average_price, quantity, budget):
+        conts_num, price_sum = self.conts.get((order_group, unit_type), (0, 0))
+        paid_sum = self.paids.get((order_group, unit_type), 0)
+        budget = budget or 0
+        return {
+            'order_group': order_group,
+            'og_name': self.og_names.get(order_group),
+            'unit_type': unit_type,
+            'ut_name': self.ut_names.get(unit_type),
+            'average_price': average_price,
+            'quantity': quantity,
+            'conts_num': conts_num,  # 계약 세대수
+            'price_sum': price_sum,  # 계약 금액
+            'paid_sum': paid_sum,  # 실수납 금액
+            'unpaid_sum': price_sum - paid_sum,  # 미수 금액
+            'non_cont_sum': budget - price_sum,  # 미계약 금액
+            'budget': budget,  # 합계
+        }
+
+    def get_totals(self):
+        """
+        합계 행 - 계약 세대수와 실수납 금액은 예산에 없는 차수/타입을 포함한 전체 집계 기준
+        """
+        price_sum = sum(row['price_sum'] for row in self.rows)
+        paid_sum = sum(self.paids.values())
+        budget = sum(row['budget'] for row in self.rows)
+        return {
+            'quantity': sum(row['quantity'] or 0 for row in self.rows),
+            'conts_num': sum(num for num, _ in self.conts.values()),
+            'price_sum': price_sum,
+            'paid_sum': paid_sum,
+            'unpaid_sum': price_sum - paid_sum,
+            'non_cont_sum': budget - price_sum,
+            'budget': budget,
+        }
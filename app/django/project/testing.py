@@ -0,0 +1,16 @@
+from accounts.models import User
+from company.models import Company
+from project.models import Project
+from work.models import IssueProject
+
+
+def create_test_project():
+    """
+    테스트 공통 데이터 - 사용자, 회사, 업무 프로젝트 및 현장(프로젝트) 생성
+    :return: (사용자, 프로젝트)
+    """
+    user = User.objects.create_user(email='test@test.com', username='test', password='password')
+    company = Company.objects.create(name='테스트', tax_number='1', ceo='대표', org_number='1')
+    issue_project = IssueProject.objects.create(company=company, name='테스트', slug='test', user=user)
+    project = Project.objects.create(issue_project=issue_project, name='테스트 현장', kind='1', start_year='2023')
+    return user, project
@@ -0,0 +1,94 @@
+from datetime import date as date_cls, datetime
+
+from django.db.models import Sum, F, Case, When
+
+from cash.models import ProjectCashBook
+from .models import ProjectOutBudget
+
+
+def get_month_first(date):
+    """기준일이 속한 월의 1일 ('YYYY-MM-DD')"""
+    base = datetime.strptime(date, '%Y-%m-%d')
+    return date_cls(base.year, base.month, 1).strftime('%Y-%m-%d')
+
+
+def get_out_budgets():
+    """지출 예산 쿼리셋 - 대/소분류 계정을 함께 조회"""
+    return ProjectOutBudget.objects.select_related('account_d2', 'account_d3')
+
+
+def get_exec_amounts(date):
+    """
+    비용 계정(소분류)별 예산 집행 금액 그룹 쿼리셋 - 한 번의 조건부 집계 쿼리
+    - acc_d3: 소분류 pk, all_sum: 기준일까지 인출 누계, month_sum: 기준일 당월 인출 금액
+    :param date: 기준일 ('YYYY-MM-DD')
+    """
+    return ProjectCashBook.objects.filter(income=None) \
+        .order_by('project_account_d3') \
+        .filter(is_separate=False,  # 상세 분리 기록 = False (중복 방지)
+                project_account_d3__d2__gte=8,  # 비용 계정 범위 시작
+                project_account_d3__d2__lte=15,  # 비용 계정 범위 종료
+                deal_date__lte=date) \
+        .annotate(acc_d3=F('project_account_d3')) \
+        .values('acc_d3') \
+        .annotate(all_sum=Sum('outlay'),
+                  month_sum=Sum(Case(
+                      When(deal_date__gte=get_month_first(date), then=F('outlay')),
+                      default=0
+                  )))
+
+
+class BudgetExecution:
+    """
+    프로젝트 예산 집행 현황
+    - 지출 예산 목록과 소분류별 집행 금액을 각각 한 번에 조회하여 행 단위 데이터로 결합한다.
+    """
+
+    def __init__(self, project, date, is_revised=False):
+        """
+        :param project: 프로젝트
+        :param date: 기준일 ('YYYY-MM-DD')
+        :param is_revised: True 이면 현황(변경) 예산, False 이면 기초(인준) 예산 기준
+        """
+        self.budgets = list(get_out_budgets().filter(project=project))
+        amounts = get_exec_amounts(date).filter(project=project)
+        self.amounts = {a['acc_d3']: (a['all_sum'] or 0, a['month_sum'] or 0) for a in amounts}
+
+        self.d2_counts = {}  # 대분류 pk -> 예산 항목 수
+        self.opt_d3s = {}  # (대분류 pk, 중분류) -> 소분류 pk 목록 (소분류 순)
+        for budget in self.budgets:
+            self.d2_counts[budget.account_d2_id] = self.d2_counts.get(budget.account_d2_id, 0) + 1
+            if budget.account_opt:
+                self.opt_d3s.setdefault((budget.account_d2_id, budget.account_opt), []).append(budget.account_d3_id)
+        for d3s in self.opt_d3s.values():
+            d3s.sort(key=lambda pk: (pk is None, pk))
+
+        self.rows = [self.get_row(budget, is_revised) for budget in self.budgets]
+
+    def get_row(self, budget, is_revised):
+        all_sum, month_sum = self.amounts.get(budget.account_d3_id, (0, 0))
+        calc_budget = budget.revised_budget or budget.budget if is_revised else budget.budget
+        return {
+            'budget': budget,
+            'calc_budget': calc_budget,  # 기준 예산
+            'prev_sum': all_sum - month_sum,  # 전월 인출 금액 누계
+            'month_sum': month_sum,  # 당월 인출 금액
+            'all_sum': all_sum,  # 인출 금액 합계
+            'available': calc_budget - all_sum,  # 가용 예산
+        }
+
+    def get_opt_d3s(self, budget):
+        """같은 대분류 내 중분류(account_opt) 소분류 pk 목록"""
+        return self.opt_d3s.get((budget.account_d2_id, budget.account_opt), [])
+
+    def get_totals(self):
+        calc_budget = sum(row['calc_budget'] for row in self.rows)
+        all_sum = sum(row['all_sum'] for row in self.rows)
+        month_sum = sum(row['month_sum'] for row in self.rows)
+        return {
+            'calc_budget': calc_budget,
+            'prev_sum': all_sum - month_sum,
+            'month_sum': month_sum,
+            'all_sum': all_sum,
+            'available': calc_budget - all_sum,
+        }
@@ -60,3 +60,11 @@ Create the name of the service account to use
 {{- default "default" .Values.serviceAccount.name }}
 {{- end }}
 {{- end }}
+
+{{/*
+Export worker selector labels - web Service 가 작업자 Pod 를 선택하지 않도록 이름을 구분한다.
+*/}}
+{{- define "web.workerSelectorLabels" -}}
+app.kubernetes.io/name: {{ include "web.name" . }}-worker
+app.kubernetes.io/instance: {{ .Release.Name }}
+{{- end }}